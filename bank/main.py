@@ -1,7 +1,7 @@
 # bank/main.py
 
 from crypto.curve import random_scalar
-from crypto.zkp.mint import verify_minting
+from crypto.zkp.mint import verify_minting, verify_minting_batch
 from crypto.signature import generate_keypair, sign
 from models.token import Token
 import time
@@ -36,13 +36,19 @@ def mint_token(commitment, mint_proof, expiry_seconds: int = 30 * 24 * 60 * 60)
     if not verify_minting(commitment, mint_proof):
         raise ValueError("Mint ZKP verification failed")
 
-    # 2. Generate token serial (scalar)
-    serial = random_scalar()
+    # 2. Issue with an expiry from now
+    return _issue_token(commitment, int(time.time()) + expiry_seconds)
 
-    # 3. Compute expiry timestamp
-    expiry = int(time.time()) + expiry_seconds
 
-    # 4. Construct unsigned token (bank does NOT know v, r, s)
+def _issue_token(commitment, expiry: int) -> Token:
+    """
+    Assign a fresh serial to a verified commitment and sign the token.
+    """
+
+    # 1. Generate token serial (scalar)
+    serial = random_scalar()
+
+    # 2. Construct unsigned token (bank does NOT know v, r, s)
     token = Token(
         serial=serial,
         commitment=commitment,
@@ -53,11 +59,11 @@ def mint_token(commitment, mint_proof, expiry_seconds: int = 30 * 24 * 60 * 60)
         s=serial
     )
 
-    # 5. Sign token
+    # 3. Sign token
     message = token.serialize_for_signature()
     signature = sign(BANK_SK, message)
 
-    # 6. Return signed token
+    # 4. Return signed token
     return Token(
         serial=serial,
         commitment=commitment,
@@ -67,3 +73,27 @@ def mint_token(commitment, mint_proof, expiry_seconds: int = 30 * 24 * 60 * 60)
         r=0,
         s=serial
     )
+
+
+# ------------------------------------------------------------------
+# Batch mint (wallet top-up)
+# ------------------------------------------------------------------
+
+def mint_tokens(requests, expiry_seconds: int = 30 * 24 * 60 * 60):
+    """
+    Mint one token per (commitment, mint_proof) request.
+
+    All mint proofs are checked together with verify_minting_batch();
+    if the batch fails, nothing is minted.
+
+    Returns:
+        list[Token]: Bank-signed tokens, in request order
+    """
+    requests = list(requests)
+
+    if not verify_minting_batch(requests):
+        raise ValueError("Mint ZKP verification failed")
+
+    expiry = int(time.time()) + expiry_seconds
+
+    return [_issue_token(commitment, expiry) for commitment, _ in requests]
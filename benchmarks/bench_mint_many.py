@@ -0,0 +1,44 @@
+# benchmarks/bench_mint_many.py
+#
+# Wallet top-up latency: one mint per note versus mint_many.
+#
+#   python -m benchmarks.bench_mint_many [amount]
+
+import sys
+import time
+
+from bank.main import BANK_PK, mint_token, mint_tokens
+from crypto.commitment import commit
+from crypto.state.proof_state import ProofState
+from wallet.token_lifecycle import TokenLifecycle, split_into_notes
+from wallet.token_store import TokenStore
+
+
+def _wallet():
+    return TokenLifecycle(
+        TokenStore(),
+        ProofState(commit(0, 0), commit(0, 0), 0, 0)
+    )
+
+
+def main(amount: int = 5000):
+    notes = split_into_notes(amount)
+    expiry = int(time.time()) + 3600
+    print(f"Top-up of {amount}: {len(notes)} notes")
+
+    wallet = _wallet()
+    t0 = time.perf_counter()
+    for v in notes:
+        wallet.mint(v, expiry, BANK_PK, mint_token)
+    t1 = time.perf_counter()
+    print(f"sequential mint : {t1 - t0:6.2f} s")
+
+    wallet = _wallet()
+    t0 = time.perf_counter()
+    wallet.mint_many(amount, expiry, BANK_PK, mint_tokens)
+    t1 = time.perf_counter()
+    print(f"mint_many       : {t1 - t0:6.2f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
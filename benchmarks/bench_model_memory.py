@@ -0,0 +1,58 @@
+# benchmarks/bench_model_memory.py
+#
+# Resident size of pending spends as held by a reconciling bank:
+# decoded points versus encodings kept until first use.
+#
+#   python -m benchmarks.bench_model_memory [n]
+
+import sys
+import tracemalloc
+
+from crypto.curve import G, point_from_bytes
+from crypto.hash import serialize_point_fixed
+from crypto.zkp.recursive import RecursiveInvariantProof
+from transport.proof_serializer import (
+    deserialize_recursive_proof,
+    serialize_recursive_proof,
+)
+from wallet.pending_store import PendingSpend
+
+
+def _measure(build):
+    tracemalloc.start()
+    objs = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(objs)
+
+
+def main(n: int = 20_000):
+    P = G
+    rows = []
+    for i in range(n):
+        P = P + G
+        rows.append((
+            serialize_point_fixed(P),
+            serialize_recursive_proof(RecursiveInvariantProof(P, i))
+        ))
+
+    eager = _measure(lambda: [
+        PendingSpend(
+            point_from_bytes(key),
+            deserialize_recursive_proof(proof),
+            0
+        )
+        for key, proof in rows
+    ])
+    lazy = _measure(lambda: [
+        PendingSpend(key, deserialize_recursive_proof(proof, lazy=True), 0)
+        for key, proof in rows
+    ])
+
+    print(f"{n} pending spends")
+    print(f"decoded points : {eager:6.0f} bytes / spend")
+    print(f"lazy encodings : {lazy:6.0f} bytes / spend")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,59 @@
+# benchmarks/bench_peer_transport.py
+#
+# Peer transport goodput (payload bytes delivered per second) against
+# the link limit: a loopback link paced to a fixed rate, per MTU and
+# window, plus the unpaced Unix-socket ceiling (CPU bound).
+#
+#   python -m benchmarks.bench_peer_transport [payload_kb]
+
+import os
+import sys
+import threading
+import time
+
+from transport.peer_transport import (
+    FramedChannel,
+    LoopbackLink,
+    PayloadReceiver,
+    send_payload,
+    unix_socket_pair,
+)
+
+
+def _goodput(a, b, payload: bytes, mtu: int, window: int) -> float:
+    result = {}
+
+    def receive():
+        result["payload"] = PayloadReceiver(window).receive(FramedChannel(b, mtu))
+
+    t = threading.Thread(target=receive)
+    t.start()
+
+    t0 = time.perf_counter()
+    send_payload(FramedChannel(a, mtu), payload, window)
+    t.join()
+    elapsed = time.perf_counter() - t0
+
+    assert result["payload"] == payload
+    a.close()
+    b.close()
+    return len(payload) / elapsed
+
+
+def main(payload_kb: int = 256):
+    payload = os.urandom(payload_kb * 1024)
+    rate = 1_000_000   # bytes per second
+
+    print(f"paced loopback, link limit {rate / 1e3:.0f} kB/s")
+    print(f"{'mtu':>5} {'window':>7} {'kB/s':>8} {'of limit':>9}")
+    for mtu in (64, 244, 512):
+        for window in (4, 32):
+            g = _goodput(*LoopbackLink.pair(rate), payload, mtu, window)
+            print(f"{mtu:>5} {window:>7} {g / 1e3:>8.0f} {g / rate:>8.0%}")
+
+    g = _goodput(*unix_socket_pair(), payload, 244, 32)
+    print(f"unix socket, mtu 244, unpaced: {g / 1e6:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
@@ -0,0 +1,59 @@
+# benchmarks/bench_qr_payloads.py
+#
+# Report: QR version needed per wire format and QR payload encoding
+# (error correction M). Lower versions scan faster.
+#
+#   python -m benchmarks.bench_qr_payloads
+
+import dataclasses
+
+from benchmarks.bench_tx_decode import synthetic_transaction
+from crypto.curve import G
+from transport.fountain import DEFAULT_BLOCK_SIZE, FountainEncoder
+from transport.qr_encoder import QR_BASE45, QR_BASE64, QR_BINARY, qr_version_report
+from transport.transaction_serializer import (
+    WIRE_V1,
+    WIRE_V2,
+    WIRE_V2_CERT_REF,
+    serialize_offline_transaction,
+)
+
+
+def _with_inputs(tx, n: int):
+    return dataclasses.replace(
+        tx,
+        input_serials=[(i + 7) * G for i in range(n)],
+        input_commitments=[(i + 11) * G for i in range(n)],
+    )
+
+
+def main():
+    base = synthetic_transaction(1)
+
+    payloads = []
+    for n_inputs in (1, 4):
+        tx = _with_inputs(base, n_inputs)
+        for name, version in (
+            ("v1", WIRE_V1),
+            ("v2", WIRE_V2),
+            ("v2 cert-ref", WIRE_V2_CERT_REF),
+        ):
+            payloads.append((
+                f"{n_inputs}-in {name}",
+                serialize_offline_transaction(tx, version)
+            ))
+
+    frame = FountainEncoder(payloads[-2][1], DEFAULT_BLOCK_SIZE).frame(0)
+    payloads.append((f"fountain frame ({DEFAULT_BLOCK_SIZE} B)", frame))
+
+    print(f"{'payload':<28} {'bytes':>6} {'base64':>7} {'binary':>7} {'base45':>7}")
+    for label, payload in payloads:
+        report = qr_version_report(payload)
+        print(
+            f"{label:<28} {len(payload):>6} "
+            f"{report[QR_BASE64]:>7} {report[QR_BINARY]:>7} {report[QR_BASE45]:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_qr_render.py
+#
+# QR display latency: time from payload to rendered image, per payload
+# size, for the old file-based path and the in-memory renderer (cold
+# and from the render cache).
+#
+#   python -m benchmarks.bench_qr_render [repeat]
+
+import io
+import os
+import sys
+import time
+
+import qrcode
+
+from transport.qr_render import (
+    FORMAT_MATRIX,
+    FORMAT_PNG,
+    FORMAT_SVG,
+    QRRenderCache,
+    render_qr,
+)
+
+
+def _legacy_png(payload: bytes) -> bytes:
+    """
+    What encode_transaction_to_qr used to do, minus the disk write.
+    """
+    import base64
+
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=8,
+        border=4,
+    )
+    qr.add_data(base64.b64encode(payload).decode())
+    qr.make(fit=True)
+
+    out = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(out)
+    return out.getvalue()
+
+
+def _ms(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e3
+
+
+def main(repeat: int = 3):
+    print(
+        f"{'bytes':>6} {'legacy png':>11} {'matrix':>8} {'png':>8} "
+        f"{'svg':>8} {'cached png':>11}   (ms)"
+    )
+
+    for size in (128, 256, 512, 768, 1024, 1536):
+        payload = os.urandom(size)
+
+        cache = QRRenderCache()
+        cache.render(payload, FORMAT_PNG)
+
+        print(
+            f"{size:>6} "
+            f"{_ms(lambda: _legacy_png(payload), repeat):>11.1f} "
+            f"{_ms(lambda: render_qr(payload, FORMAT_MATRIX), repeat):>8.1f} "
+            f"{_ms(lambda: render_qr(payload, FORMAT_PNG), repeat):>8.1f} "
+            f"{_ms(lambda: render_qr(payload, FORMAT_SVG), repeat):>8.1f} "
+            f"{_ms(lambda: cache.render(payload, FORMAT_PNG), repeat * 100):>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
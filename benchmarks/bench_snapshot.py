@@ -0,0 +1,70 @@
+# benchmarks/bench_snapshot.py
+#
+# Cold-start cost of restoring a large wallet from a snapshot.
+#
+#   python -m benchmarks.bench_snapshot [n_tokens]
+
+import os
+import sys
+import tempfile
+import time
+
+from crypto.curve import G
+from models.token import Token
+from models.token_state import TokenState
+from wallet.snapshot import load_snapshot, write_snapshot
+from wallet.token_store import TokenStore
+
+
+def _synthetic_store(n: int) -> TokenStore:
+    """
+    Tokens with distinct commitments built by repeated addition
+    (one point add each, instead of a scalar multiplication).
+    """
+    entries = []
+    C = G
+    for i in range(n):
+        C = C + G
+        entries.append((
+            Token(
+                serial=i + 1,
+                commitment=C,
+                expiry=10_000 + i,
+                signature=bytes(96),
+                v=(1, 2, 5, 10, 20, 50, 100)[i % 7],
+                r=i,
+                s=i
+            ),
+            TokenState.UNSPENT
+        ))
+
+    store = TokenStore()
+    store.bulk_load(entries)
+    return store
+
+
+def main(n: int = 100_000):
+    print(f"Building {n} synthetic tokens ...")
+    store = _synthetic_store(n)
+
+    with tempfile.TemporaryDirectory() as d:
+        for compressed in (False, True):
+            path = os.path.join(d, f"wallet-{compressed}.snap")
+
+            t0 = time.perf_counter()
+            write_snapshot(path, token_store=store, compressed=compressed)
+            t1 = time.perf_counter()
+            snap = load_snapshot(path)
+            t2 = time.perf_counter()
+
+            assert snap.token_store.count_unspent() == n
+
+            label = "compressed  " if compressed else "uncompressed"
+            print(
+                f"{label}  size {os.path.getsize(path) / 1e6:7.2f} MB  "
+                f"write {t1 - t0:6.2f} s  load {t2 - t1:6.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,68 @@
+# benchmarks/bench_tx_archive.py
+#
+# Transaction archives: write and stream throughput, peak traced memory
+# while streaming (should not grow with the archive), and random access.
+#
+#   python -m benchmarks.bench_tx_archive [n]
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_tx_decode import synthetic_transaction
+from transport.transaction_archive import (
+    TransactionArchive,
+    iter_archive_views,
+    write_transaction_archive,
+)
+
+
+def _stream(path: str) -> int:
+    count = 0
+    with open(path, "rb") as f:
+        for view in iter_archive_views(f):
+            view.input_serial_keys
+            count += 1
+    return count
+
+
+def main(n: int = 20_000):
+    txs = [synthetic_transaction(i) for i in range(50)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (n // 10, n):
+            path = os.path.join(tmp, f"archive-{count}.txa")
+
+            t0 = time.perf_counter()
+            write_transaction_archive(path, (txs[i % 50] for i in range(count)))
+            t1 = time.perf_counter()
+
+            tracemalloc.start()
+            assert _stream(path) == count
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            t2 = time.perf_counter()
+
+            print(
+                f"{count:>7} tx, {os.path.getsize(path) / 1e6:6.1f} MB: "
+                f"write {(t1 - t0) / count * 1e6:5.1f} us/tx, "
+                f"stream {(t2 - t1) / count * 1e6:5.1f} us/tx, "
+                f"peak {peak / 1e6:4.1f} MB"
+            )
+
+        with TransactionArchive(path) as archive:
+            picks = [random.randrange(len(archive)) for _ in range(1000)]
+
+            t0 = time.perf_counter()
+            for i in picks:
+                archive[i].nonce
+            t1 = time.perf_counter()
+
+        print(f"random access: {(t1 - t0) / len(picks) * 1e3:.2f} ms / lookup")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
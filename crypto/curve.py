@@ -32,3 +32,90 @@ def random_scalar(): # the random bilding (r) factor used for the creation of C
     Generate cryptographically secure random scalar mod curve order.
     """
     return secrets.randbelow(ORDER)
+
+def sum_points(points):
+    """
+    Sum many points, accumulating in Jacobian coordinates so the whole
+    sum costs no field inversions (an affine add costs one per point).
+    """
+    from ecdsa.ellipticcurve import PointJacobi, INFINITY
+
+    acc = INFINITY
+    for P in points:
+        if acc is INFINITY:
+            if P is INFINITY or P.x() is None:
+                continue
+            acc = P if isinstance(P, PointJacobi) else PointJacobi.from_affine(P)
+        else:
+            acc = acc + P
+
+    return acc
+
+def point_from_bytes(data: bytes):
+    """
+    Decode a fixed-width 64-byte (x || y) point, the inverse of
+    crypto.hash.serialize_point_fixed(). 64 zero bytes is infinity.
+    """
+    from ecdsa.ellipticcurve import Point, INFINITY
+
+    if len(data) != 64:
+        raise ValueError("Invalid EC point encoding")
+
+    if not any(data):
+        return INFINITY
+
+    x = int.from_bytes(data[:32], "big")
+    y = int.from_bytes(data[32:], "big")
+
+    if not CURVE.curve.contains_point(x, y):
+        raise ValueError("Point is not on the curve")
+
+    return Point(CURVE.curve, x, y)
+
+
+def compress_point(P) -> bytes:
+    """
+    SEC1 compressed encoding: (0x02 | y parity) || x, 33 bytes.
+    The point at infinity encodes as 33 zero bytes.
+    """
+    if P.x() is None:
+        return bytes(33)
+
+    return bytes([2 | (P.y() & 1)]) + P.x().to_bytes(32, "big")
+
+
+def decompress_point(data: bytes):
+    """
+    Decode a 33-byte SEC1 compressed point.
+
+    secp256k1 has p ≡ 3 (mod 4), so the square root is a single
+    exponentiation: y = (x^3 + 7)^((p + 1) / 4) mod p.
+    """
+    from ecdsa.ellipticcurve import Point, INFINITY
+
+    if len(data) != 33:
+        raise ValueError("Invalid compressed point encoding")
+
+    prefix = data[0]
+    if prefix == 0 and not any(data):
+        return INFINITY
+    if prefix not in (2, 3):
+        raise ValueError("Invalid compressed point prefix")
+
+    curve = CURVE.curve
+    p = curve.p()
+
+    x = int.from_bytes(data[1:], "big")
+    if x >= p:
+        raise ValueError("Point is not on the curve")
+
+    y2 = (pow(x, 3, p) + curve.a() * x + curve.b()) % p
+    y = pow(y2, (p + 1) // 4, p)
+
+    if (y * y) % p != y2:
+        raise ValueError("Point is not on the curve")
+
+    if (y & 1) != (prefix & 1):
+        y = p - y
+
+    return Point(curve, x, y)
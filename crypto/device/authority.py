@@ -1,6 +1,6 @@
 # crypto/device/authority.py
 import secrets
-from crypto.hash import sha256_int, serialize_point
+from crypto.hash import sha256_int, serialize_point, serialize_point_fixed
 from crypto.device.certificate import DeviceCertificate
 from crypto.curve import G, ORDER, random_scalar
 
@@ -67,8 +67,9 @@ class BankAuthority:
 
         z = (k + e * self.sk_bank) % ORDER
 
+        # R fixed-width (64) so the signature is always 96 bytes
         signature = (
-            serialize_point(R) +
+            serialize_point_fixed(R) +
             z.to_bytes(32, "big")
         )
 
@@ -47,7 +47,7 @@ def verify_device_certificate(cert: DeviceCertificate, pk_bank) -> bool:
 
     # --------------------------------------------------
     # 3. Parse signature
-    #   signature = serialize_point(R) || z
+    #   signature = serialize_point_fixed(R) || z
     # --------------------------------------------------
     sig = cert.signature
 
@@ -2,7 +2,7 @@
 
 import secrets
 from crypto.curve import G, ORDER
-from crypto.hash import sha256_int, serialize_point
+from crypto.hash import sha256_int, serialize_point, serialize_point_fixed
 
 
 def sign_spend_transcript(
@@ -14,7 +14,7 @@ def sign_spend_transcript(
 
     transcript_hash: 32-byte hash output from build_spend_transcript()
     Returns:
-        device_signature = serialize_point(R) || z
+        device_signature = serialize_point_fixed(R) || z
     """
 
     if len(transcript_hash) != 32:
@@ -43,10 +43,11 @@ def sign_spend_transcript(
 
     # --------------------------------------------------
     # 4. Signature encoding
-    #   signature = R || z
+    #   signature = R || z, R fixed-width (64) so the
+    #   signature is always 96 bytes
     # --------------------------------------------------
     signature = (
-        serialize_point(R) +
+        serialize_point_fixed(R) +
         z.to_bytes(32, "big")
     )
 
@@ -1,5 +1,7 @@
 # crypto/device/verify_spend_auth.py
 
+import time
+
 from crypto.curve import G, ORDER
 from crypto.hash import sha256_int, serialize_point
 from crypto.device.certificate import verify_device_certificate
@@ -9,7 +11,8 @@ def verify_spend_authorization(
     transcript_hash: bytes,
     device_signature: bytes,
     device_certificate,
-    pk_bank
+    pk_bank,
+    certificate_trusted: bool = False
 ) -> bool:
     """
     Verify that a registered device authorized an offline spend.
@@ -17,19 +20,26 @@ def verify_spend_authorization(
     Checks:
     1. Device certificate validity
     2. Device signature correctness
+
+    certificate_trusted=True skips the bank signature on the
+    certificate (already verified, e.g. held in a CertificateCache);
+    its expiry is still checked.
     """
 
     # --------------------------------------------------
     # 1. Verify device certificate (bank trust)
     # --------------------------------------------------
-    if not verify_device_certificate(device_certificate, pk_bank):
+    if certificate_trusted:
+        if int(time.time()) > device_certificate.expires_at:
+            return False
+    elif not verify_device_certificate(device_certificate, pk_bank):
         return False
 
     pk_device = device_certificate.pk_device
 
     # --------------------------------------------------
     # 2. Parse device signature
-    #   signature = serialize_point(R) || z
+    #   signature = serialize_point_fixed(R) || z
     # --------------------------------------------------
     if len(device_signature) != 96:
         return False
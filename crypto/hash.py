@@ -35,3 +35,17 @@ def serialize_point(P) -> bytes:
     x_bytes = serialize_int(P.x())
     y_bytes = serialize_int(P.y())
     return x_bytes + y_bytes
+
+
+def serialize_point_fixed(P) -> bytes:
+    """
+    Serialize an elliptic curve point as fixed-width 64 bytes (x || y).
+    The point at infinity encodes as 64 zero bytes.
+
+    Unlike serialize_point(), the output length never varies, so it is
+    safe to use as a storage / set key.
+    """
+    if P.x() is None:
+        return bytes(64)
+
+    return P.x().to_bytes(32, "big") + P.y().to_bytes(32, "big")
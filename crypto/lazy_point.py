@@ -0,0 +1,62 @@
+# crypto/lazy_point.py
+
+from crypto.curve import compress_point, decompress_point, point_from_bytes
+from crypto.hash import serialize_point_fixed
+
+
+_ENCODED = (bytes, bytearray, memoryview)
+
+
+def _decode(data: bytes):
+    if len(data) == 33:
+        return decompress_point(data)
+    return point_from_bytes(data)
+
+
+class LazyPoint:
+    """
+    Descriptor for an EC point attribute backed by a "_<name>" slot.
+
+    The slot may hold a point or its encoding (64-byte x || y or 33-byte
+    compressed). An encoding is decoded on first access and the point
+    replaces it, so objects that are only stored, counted or re-serialized
+    never pay for point construction.
+    """
+
+    __slots__ = ("slot",)
+
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        value = getattr(obj, self.slot)
+        if isinstance(value, _ENCODED):
+            value = _decode(value)
+            setattr(obj, self.slot, value)
+
+        return value
+
+    def __set__(self, obj, value):
+        if isinstance(value, (bytearray, memoryview)):
+            # Never pin the caller's buffer
+            value = bytes(value)
+        setattr(obj, self.slot, value)
+
+
+def point_encoding(obj, name: str, compressed: bool = False) -> bytes:
+    """
+    64-byte (or, with compressed=True, 33-byte) encoding of a LazyPoint
+    attribute, reusing the stored encoding instead of decoding and
+    re-encoding when it has the requested form.
+    """
+    size = 33 if compressed else 64
+
+    value = getattr(obj, "_" + name)
+    if isinstance(value, bytes) and len(value) == size:
+        return value
+
+    point = getattr(obj, name)
+    return compress_point(point) if compressed else serialize_point_fixed(point)
@@ -16,10 +16,13 @@ def _serialize_point(P) -> bytes:
 class SpentSerialDB:
     """
     Offline database of spent serials (stored as serialized EC points).
+
+    Backed by an in-memory set unless a persistent set-like store
+    (e.g. storage.serial_store.SerialStore) is supplied.
     """
 
-    def __init__(self):
-        self._spent = set()
+    def __init__(self, store=None):
+        self._spent = store if store is not None else set()
 
     def is_spent(self, serial) -> bool:
         return _serialize_point(serial) in self._spent
@@ -10,35 +10,103 @@ def accept_offline_transaction(
     Preconditions:
     - verify_offline_transaction(tx, ...) == True
     """
+    import time
 
-    # --------------------------------------------------
-    # 1. Mark input serials as seen
-    # --------------------------------------------------
-    from crypto.hash import serialize_point
+    from crypto.hash import serialize_point_fixed
 
-    for serial in tx.input_serials:
-        receiver_state.seen_serials.add(serialize_point(serial))
+    certificate = getattr(tx, "device_certificate", None)
+    sender_cert_id = certificate.cert_id if certificate is not None else None
+    tx_digest = getattr(tx, "transcript_hash", None)
+    received_at = int(time.time())
 
-    # --------------------------------------------------
-    # 2. Store received output tokens
-    # --------------------------------------------------
-    for token in tx.output_commitments:
-        receiver_state.owned_tokens.append(token)
+    # All state changes below commit (or roll back) together; memory
+    # follows the database only once it has committed
+    with receiver_state.changes() as changes:
+
+        # --------------------------------------------------
+        # 1. Mark input serials as seen
+        # --------------------------------------------------
+        changes.add_serials(
+            serialize_point_fixed(serial) for serial in tx.input_serials
+        )
+
+        # --------------------------------------------------
+        # 2. Store received output tokens with their provenance
+        # --------------------------------------------------
+        changes.add_owned_tokens(
+            (C, sender_cert_id, tx_digest, received_at)
+            for C in tx.output_commitments
+        )
+
+        # --------------------------------------------------
+        # 3. Update proof state (for reconciliation)
+        # --------------------------------------------------
+        changes.add_outputs(tx.output_commitments)
+
+
+def accept_offline_transactions(
+    txs,
+    receiver_state
+):
+    """
+    Accept a batch of verified offline transactions in one atomic step.
+
+    Compared with calling accept_offline_transaction() per transaction:
+    - all output commitments are summed once (crypto.curve.sum_points)
+      and folded into the proof state with a single update
+    - serials, received tokens and the proof state are written in one
+      storage transaction; a failure leaves both the WalletDB and the
+      in-memory receiver state unchanged
+
+    Raises ValueError if two transactions in the batch spend the same
+    serial. Preconditions as for accept_offline_transaction().
+    """
+    import time
+
+    from crypto.curve import sum_points
+    from crypto.hash import serialize_point_fixed
+
+    txs = list(txs)
 
     # --------------------------------------------------
-    # 3. Update proof state (for reconciliation)
+    # 1. Reject intra-batch double spends before touching state
     # --------------------------------------------------
-    if receiver_state.proof_state is not None:
+    serial_keys = []
+    batch_seen = set()
 
-        # Wrap commitments into objects expected by ProofState
-        class _Tmp:
-            def __init__(self, C):
-                self.C = C
-                self.r = 0  # receiver does not know blinding factor
+    for tx in txs:
+        for serial in tx.input_serials:
+            key = serialize_point_fixed(serial)
+            if key in batch_seen:
+                raise ValueError("Serial spent twice within the batch")
+            batch_seen.add(key)
+            serial_keys.append(key)
 
-        wrapped_outputs = [_Tmp(C) for C in tx.output_commitments]
+    received_at = int(time.time())
+    entries = []
 
-        receiver_state.proof_state.update_from_spend(
-            input_tokens=[],          # receiver consumes nothing
-            output_tokens=wrapped_outputs
-        )
+    for tx in txs:
+        certificate = getattr(tx, "device_certificate", None)
+        sender_cert_id = certificate.cert_id if certificate is not None else None
+        tx_digest = getattr(tx, "transcript_hash", None)
+
+        for C in tx.output_commitments:
+            entries.append((C, sender_cert_id, tx_digest, received_at))
+
+    with receiver_state.changes() as changes:
+
+        # --------------------------------------------------
+        # 2. Mark input serials as seen
+        # --------------------------------------------------
+        changes.add_serials(serial_keys)
+
+        # --------------------------------------------------
+        # 3. Store received output tokens
+        # --------------------------------------------------
+        changes.add_owned_tokens(entries)
+
+        # --------------------------------------------------
+        # 4. One proof-state update for the whole batch
+        # --------------------------------------------------
+        if entries:
+            changes.add_outputs([sum_points(C for C, _, _, _ in entries)])
@@ -1,27 +1,61 @@
 # crypto/transaction/verify_offline_tx.py
 
-def verify_offline_transaction(
-    tx,
-    pk_bank,
-    seen_serials: set
-) -> bool:
+def _mark_seen(seen_serials, serial_bytes: bytes) -> bool:
     """
-    Receiver-side offline verification of an OfflineTransaction.
+    Test-and-insert a serial into seen_serials.
+
+    Containers shared between processes (e.g. SharedSerialSet) provide an
+    atomic add_if_absent(); a plain check-then-add would let two verifiers
+    accept the same serial at the same moment.
+    """
+    add_if_absent = getattr(seen_serials, "add_if_absent", None)
+    if add_if_absent is not None:
+        return add_if_absent(serial_bytes)
+
+    if serial_bytes in seen_serials:
+        return False
+
+    seen_serials.add(serial_bytes)
+    return True
+
+
+def _serial_keys(tx):
+    """
+    64-byte keys of the input serials. Lazy transaction views expose
+    them directly, without decoding any point.
     """
+    keys = getattr(tx, "input_serial_keys", None)
+    if keys is not None:
+        return keys
 
+    from crypto.hash import serialize_point_fixed
+    return [serialize_point_fixed(s) for s in tx.input_serials]
+
+
+def _verify_authorization_and_proofs(tx, pk_bank, cert_cache) -> bool:
     # --------------------------------------------------
     # 1. Verify device authorization & certificate
     # --------------------------------------------------
     from crypto.device.verify_spend_auth import verify_spend_authorization
 
+    certificate = tx.device_certificate
+    cached = (
+        cert_cache is not None
+        and cert_cache.contains_certificate(certificate)
+    )
+
     if not verify_spend_authorization(
         tx.transcript_hash,
         tx.device_signature,
-        tx.device_certificate,
-        pk_bank
+        certificate,
+        pk_bank,
+        certificate_trusted=cached
     ):
         return False
 
+    if cert_cache is not None and not cached:
+        cert_cache.add(certificate)
+
     # --------------------------------------------------
     #   2. Verify spend ownership ZKP
     # --------------------------------------------------
@@ -33,6 +67,7 @@ def verify_offline_transaction(
         tx.spend_proof
     ):
         return False
+
     # --------------------------------------------------
     # 3. Verify value conservation
     # --------------------------------------------------
@@ -46,18 +81,59 @@ def verify_offline_transaction(
     ):
         return False
 
+    return True
+
+
+def verify_offline_transaction(
+    tx,
+    pk_bank,
+    seen_serials: set,
+    revoked_cert_ids=None,
+    cert_cache=None
+) -> bool:
+    """
+    Receiver-side offline verification of an OfflineTransaction.
+
+    Replayed serials and revoked certificates (revoked_cert_ids, any
+    container of cert ids) are rejected before any proof is checked.
+
+    With a cert_cache (wallet.cert_cache.CertificateCache), a payer
+    certificate already in the cache is not re-verified, and a newly
+    verified one is added to it.
+    """
+
     # --------------------------------------------------
-    # 4. Local double-spend prevention
+    # 0. Cheap rejections (no EC work on lazy views)
     # --------------------------------------------------
-    from crypto.hash import serialize_point
+    serial_keys = _serial_keys(tx)
 
-    for serial in tx.input_serials:
-        serial_bytes = serialize_point(serial)
+    if any(key in seen_serials for key in serial_keys):
+        return False
+
+    if revoked_cert_ids is not None:
+        cert_id = getattr(tx, "cert_id", None)
+        if cert_id is None:
+            cert_id = tx.device_certificate.cert_id
+        if cert_id in revoked_cert_ids:
+            return False
 
-        if serial_bytes in seen_serials:
+    # --------------------------------------------------
+    # 1-3. Certificate, authorization and proofs
+    # --------------------------------------------------
+    try:
+        if not _verify_authorization_and_proofs(tx, pk_bank, cert_cache):
             return False
+    except ValueError:
+        # A malformed point in a lazily decoded transaction
+        # (OfflineTransactionView) only surfaces when it is read
+        return False
 
-        # Mark as seen
-        seen_serials.add(serial_bytes)
+    # --------------------------------------------------
+    # 4. Local double-spend prevention
+    # --------------------------------------------------
+    for serial_bytes in serial_keys:
+        # Check and mark as seen in one step
+        if not _mark_seen(seen_serials, serial_bytes):
+            return False
 
     return True
@@ -1,5 +1,8 @@
-from crypto.curve import G, H, ORDER, random_scalar
+import secrets
+
+from crypto.curve import G, H, ORDER, random_scalar, sum_points
 from crypto.hash import sha256_int
+from crypto.lazy_point import LazyPoint
 
 
 # ============================================================
@@ -7,6 +10,10 @@ from crypto.hash import sha256_int
 # ============================================================
 
 class OpeningProof:
+    __slots__ = ("_A", "z1", "z2")
+
+    A = LazyPoint()
+
     def __init__(self, A, z1, z2):
         self.A = A
         self.z1 = z1
@@ -20,6 +27,22 @@ def _fs_challenge(data: bytes) -> int:
     return sha256_int(data) % ORDER
 
 
+def _minting_challenge(A_map, C) -> int:
+    """
+    Fiat–Shamir challenge of a denomination OR-proof.
+    """
+    transcript = b"".join(
+        A_map[d].x().to_bytes(32, "big") +
+        A_map[d].y().to_bytes(32, "big")
+        for d in ALLOWED_DENOMINATIONS
+    ) + (
+        C.x().to_bytes(32, "big") +
+        C.y().to_bytes(32, "big")
+    )
+
+    return _fs_challenge(transcript)
+
+
 def prove_opening(v: int, r: int, C):
     """
     Prove knowledge of (v, r) such that:
@@ -72,6 +95,8 @@ class DenominationProof:
     """
     OR-proof that committed value belongs to ALLOWED_DENOMINATIONS.
     """
+    __slots__ = ("A_map", "z1_map", "z2_map", "e_map")
+
     def __init__(self, A_map, z1_map, z2_map, e_map):
         self.A_map = A_map
         self.z1_map = z1_map
@@ -118,16 +143,7 @@ def prove_minting(v: int, r: int, C):
     A_map[real_denom] = A_real
 
     # Step 3: Fiat–Shamir challenge
-    transcript = b"".join(
-        A_map[d].x().to_bytes(32, "big") +
-        A_map[d].y().to_bytes(32, "big")
-        for d in ALLOWED_DENOMINATIONS
-    ) + (
-        C.x().to_bytes(32, "big") +
-        C.y().to_bytes(32, "big")
-    )
-
-    e = _fs_challenge(transcript)
+    e = _minting_challenge(A_map, C)
 
     # Step 4: Real challenge
     e_real = (e - e_sum) % ORDER
@@ -162,15 +178,57 @@ def verify_minting(C, proof: DenominationProof) -> bool:
 
         e_sum = (e_sum + e_d) % ORDER
 
-    transcript = b"".join(
-        proof.A_map[d].x().to_bytes(32, "big") +
-        proof.A_map[d].y().to_bytes(32, "big")
-        for d in ALLOWED_DENOMINATIONS
-    ) + (
-        C.x().to_bytes(32, "big") +
-        C.y().to_bytes(32, "big")
-    )
-
-    e = _fs_challenge(transcript)
+    e = _minting_challenge(proof.A_map, C)
 
     return e_sum == e
+
+
+# Weight size for batch verification: a batch holding any invalid
+# proof passes with probability at most 2^-BATCH_WEIGHT_BITS.
+BATCH_WEIGHT_BITS = 128
+
+
+def verify_minting_batch(items) -> bool:
+    """
+    Verify many (C, DenominationProof) pairs at once.
+
+    Challenge sums are checked per proof (hashing only). The group
+    equations of all branches of all proofs,
+        z1*G + z2*H == A + e*C,
+    are folded into one with independent random weights w:
+        (Σ w*z1)*G + (Σ w*z2)*H == Σ w*A + Σ_C (Σ w*e)*C
+    which needs two full multiplications for the whole batch, one per
+    commitment and one half-length multiplication per branch, instead
+    of three full multiplications per branch.
+
+    Returns True only if every proof is valid (up to 2^-128 error).
+    """
+    s1 = 0
+    s2 = 0
+    terms = []
+
+    for C, proof in items:
+        e_sum = 0
+        we = 0
+
+        for d in ALLOWED_DENOMINATIONS:
+            e_d = proof.e_map[d]
+            w = secrets.randbits(BATCH_WEIGHT_BITS)
+
+            s1 += w * proof.z1_map[d]
+            s2 += w * proof.z2_map[d]
+            we += w * e_d
+            terms.append(w * proof.A_map[d])
+
+            e_sum = (e_sum + e_d) % ORDER
+
+        if e_sum != _minting_challenge(proof.A_map, C):
+            return False
+
+        terms.append((we % ORDER) * C)
+
+    if not terms:
+        return True
+
+    left = (s1 % ORDER) * G + (s2 % ORDER) * H
+    return left == sum_points(terms)
@@ -1,10 +1,15 @@
 import secrets
 from crypto.curve import H, ORDER
 from crypto.hash import sha256_int, serialize_point
+from crypto.lazy_point import LazyPoint
 from crypto.state.proof_state import ProofState
 
 
 class RecursiveInvariantProof:
+    __slots__ = ("_A", "z")
+
+    A = LazyPoint()
+
     def __init__(self, A, z):
         self.A = A
         self.z = z
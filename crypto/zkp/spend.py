@@ -2,6 +2,7 @@
 
 from crypto.curve import G, H, ORDER, random_scalar
 from crypto.hash import sha256_int
+from crypto.lazy_point import LazyPoint
 
 
 # ---------------------------------------------------------
@@ -30,6 +31,11 @@ def _fs_challenge(data: bytes) -> int:
 # ---------------------------------------------------------
 
 class SpendProof:
+    __slots__ = ("_A_commit", "_A_serial", "z_v", "z_r", "z_s")
+
+    A_commit = LazyPoint()
+    A_serial = LazyPoint()
+
     def __init__(self, A_commit, A_serial, z_v, z_r, z_s):
         self.A_commit = A_commit  # EC point
         self.A_serial = A_serial  # EC point
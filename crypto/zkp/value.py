@@ -1,5 +1,6 @@
 from crypto.curve import G, H, ORDER, random_scalar
 from crypto.hash import sha256_int
+from crypto.lazy_point import LazyPoint
 
 
 # ============================================================
@@ -24,6 +25,10 @@ class ValueProof:
     without revealing values.
     """
 
+    __slots__ = ("_A", "z_v", "z_r")
+
+    A = LazyPoint()
+
     def __init__(self, A, z_v, z_r):
         self.A = A        # EC point
         self.z_v = z_v    # scalar
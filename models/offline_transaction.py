@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import List
 from crypto.device.certificate import DeviceCertificate
 
-@dataclass
+@dataclass(slots=True)
 class OfflineTransaction:
     input_serials: List[object]
     input_commitments: List[object]   # ← ADD THIS
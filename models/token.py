@@ -5,7 +5,7 @@ from crypto.hash import sha256_bytes, serialize_int, serialize_point
 from crypto.signature import verify
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Token:
     """
     Immutable representation of a Digital Rupee (e₹) token.
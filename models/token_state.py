@@ -10,3 +10,4 @@ class TokenState(Enum):
     UNSPENT = auto()
     SPENT = auto()
     EXPIRED = auto()
+    RESERVED = auto()     # held by an in-flight spend, not yet committed
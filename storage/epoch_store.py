@@ -0,0 +1,240 @@
+# storage/epoch_store.py
+
+import os
+import re
+import time
+from typing import Dict, Optional
+
+from storage.serial_store import SerialStore, serial_key
+
+
+DAY_SECONDS = 24 * 60 * 60
+
+# Upper bound on a token's lifetime (bank/main.py mints with 30 days).
+# Used when a serial is recorded without a known expiry.
+DEFAULT_RETENTION_SECONDS = 30 * DAY_SECONDS
+
+_PARTITION_FILE = re.compile(r"^serials-(any-)?(\d+)\.db$")
+
+
+class EpochSerialStore:
+    """
+    Seen / spent serials partitioned by token expiry epoch.
+
+    A serial is filed under the epoch containing its token's expiry.
+    Once an epoch has ended, every token in it is expired and would be
+    rejected anyway, so the whole partition is dropped in O(1).
+
+    A serial recorded without its expiry goes to a separate
+    "any-expiry" partition for the epoch of now + default_retention
+    (a bound on every token's expiry). Lookups with a known expiry
+    check their own partition plus the live any-expiry ones, so such a
+    serial is still found; record expiries where they are known to
+    keep lookups to one partition.
+
+    Partitions are in-memory sets, or one SerialStore file per epoch
+    when a directory is given (dropping a partition deletes its file).
+    """
+
+    def __init__(
+        self,
+        epoch_seconds: int = DAY_SECONDS,
+        directory: Optional[str] = None,
+        default_retention: int = DEFAULT_RETENTION_SECONDS,
+        batch_size: int = 256
+    ):
+        if epoch_seconds < 1:
+            raise ValueError("epoch_seconds must be positive")
+
+        self.epoch_seconds = epoch_seconds
+        self.directory = directory
+        self.default_retention = default_retention
+        self.batch_size = batch_size
+
+        # epoch number -> set-like partition, for serials filed by
+        # their expiry and for those recorded without one
+        self._partitions: Dict[int, object] = {}
+        self._any_expiry: Dict[int, object] = {}
+        self._pruned_through = None
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            for name in os.listdir(directory):
+                m = _PARTITION_FILE.match(name)
+                if m:
+                    any_expiry = m.group(1) is not None
+                    epoch = int(m.group(2))
+                    self._kind(any_expiry)[epoch] = self._open_partition(epoch, any_expiry)
+
+    # --------------------------------------------------
+    # Partition management
+    # --------------------------------------------------
+
+    def _epoch_of(self, expiry: int) -> int:
+        return expiry // self.epoch_seconds
+
+    def _kind(self, any_expiry: bool) -> Dict[int, object]:
+        return self._any_expiry if any_expiry else self._partitions
+
+    def _all_partitions(self):
+        yield from self._partitions.values()
+        yield from self._any_expiry.values()
+
+    def _partition_path(self, epoch: int, any_expiry: bool = False) -> str:
+        prefix = "serials-any-" if any_expiry else "serials-"
+        return os.path.join(self.directory, f"{prefix}{epoch}.db")
+
+    def _open_partition(self, epoch: int, any_expiry: bool = False):
+        if self.directory is None:
+            return set()
+        return SerialStore(
+            self._partition_path(epoch, any_expiry),
+            batch_size=self.batch_size
+        )
+
+    def _live(self, partitions: Dict[int, object], now: int):
+        """
+        Partitions that may still hold unexpired tokens, newest first.
+        """
+        first = self._epoch_of(now)
+        return [
+            partitions[e]
+            for e in sorted((e for e in partitions if e >= first), reverse=True)
+        ]
+
+    def prune(self, now: Optional[int] = None) -> int:
+        """
+        Drop every partition whose epoch has fully ended.
+        Returns the number of partitions dropped.
+        """
+        if now is None:
+            now = int(time.time())
+
+        # Epoch e holds expiries in [e*E, (e+1)*E); all are expired
+        # (current_time >= expiry) once (e+1)*E <= now.
+        dead = [
+            (e, any_expiry)
+            for any_expiry in (False, True)
+            for e in self._kind(any_expiry)
+            if (e + 1) * self.epoch_seconds <= now
+        ]
+
+        for epoch, any_expiry in dead:
+            partition = self._kind(any_expiry).pop(epoch)
+            if self.directory is not None:
+                partition.close()
+                path = self._partition_path(epoch, any_expiry)
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+
+        self._pruned_through = self._epoch_of(now)
+        return len(dead)
+
+    def _maybe_prune(self, now: int):
+        # Automatic pruning: at most once per epoch boundary
+        if self._pruned_through != self._epoch_of(now):
+            self.prune(now)
+
+    # --------------------------------------------------
+    # Serial operations
+    # --------------------------------------------------
+
+    def add(self, serial, expiry: Optional[int] = None, now: Optional[int] = None):
+        """
+        Record a serial under its token's expiry epoch.
+
+        Without a known expiry the serial is kept for the maximum
+        token lifetime, in an any-expiry partition.
+        """
+        if now is None:
+            now = int(time.time())
+
+        any_expiry = expiry is None
+        if any_expiry:
+            expiry = now + self.default_retention
+
+        self._maybe_prune(now)
+
+        key = serial_key(serial)
+        epoch = self._epoch_of(expiry)
+        partitions = self._kind(any_expiry)
+
+        partition = partitions.get(epoch)
+        if partition is None:
+            partition = self._open_partition(epoch, any_expiry)
+            partitions[epoch] = partition
+
+        partition.add(key)
+
+    def contains(
+        self,
+        serial,
+        expiry: Optional[int] = None,
+        now: Optional[int] = None
+    ) -> bool:
+        """
+        Membership over partitions that can still be valid.
+        With a known expiry that one partition is consulted, plus the
+        any-expiry partitions (serials recorded without an expiry).
+        """
+        if now is None:
+            now = int(time.time())
+
+        key = serial_key(serial)
+
+        if expiry is not None:
+            partition = self._partitions.get(self._epoch_of(expiry))
+            if partition is not None and key in partition:
+                return True
+            candidates = self._live(self._any_expiry, now)
+        else:
+            candidates = (
+                self._live(self._partitions, now)
+                + self._live(self._any_expiry, now)
+            )
+
+        return any(key in partition for partition in candidates)
+
+    def __contains__(self, serial) -> bool:
+        return self.contains(serial)
+
+    def is_spent(self, serial, expiry: Optional[int] = None) -> bool:
+        return self.contains(serial, expiry=expiry)
+
+    def mark_spent(self, serial, expiry: Optional[int] = None):
+        self.add(serial, expiry=expiry)
+
+    def __len__(self) -> int:
+        return sum(len(p) for p in self._all_partitions())
+
+    def __iter__(self):
+        for partitions in (self._partitions, self._any_expiry):
+            for epoch in sorted(partitions):
+                yield from partitions[epoch]
+
+    def partition_count(self) -> int:
+        return len(self._partitions) + len(self._any_expiry)
+
+    def forget(self, serials):
+        """
+        Take buffered serials back out, e.g. after the acceptance that
+        added them was rolled back (see SerialStore.forget).
+        """
+        keys = [serial_key(s) for s in serials]
+
+        for partition in self._all_partitions():
+            if hasattr(partition, "forget"):
+                partition.forget(keys)
+            else:
+                partition.difference_update(keys)
+
+    def flush(self):
+        for partition in self._all_partitions():
+            if hasattr(partition, "flush"):
+                partition.flush()
+
+    def close(self):
+        for partition in self._all_partitions():
+            if hasattr(partition, "close"):
+                partition.close()
@@ -0,0 +1,278 @@
+# storage/serial_filter.py
+
+import hashlib
+import math
+import os
+import struct
+import warnings
+from typing import Iterable
+
+from storage.serial_store import serial_key
+
+
+# ==========================================================
+# File format
+#   magic     (8)   b"CBDCBLM1"
+#   version   (2)
+#   num_bits  (8)
+#   num_hash  (4)
+#   capacity  (8)   serials the filter was sized for
+#   count     (8)
+#   bits      (ceil(num_bits / 8))
+#   sha256    (32)  over everything above
+# ==========================================================
+
+_MAGIC = b"CBDCBLM1"
+_VERSION = 2
+_HEADER = struct.Struct(">8sHQIQQ")
+
+
+class BloomFilter:
+    """
+    Bloom filter over 64-byte serial keys.
+
+    Sized from the expected number of serials and the target
+    false-positive rate. A negative answer is exact; a positive
+    answer must be confirmed against the real store. Past `capacity`
+    serials the false-positive rate rises above the target.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = 1e-6):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not (0 < fp_rate < 1):
+            raise ValueError("fp_rate must be between 0 and 1")
+
+        num_bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        num_hash = max(1, round(num_bits / capacity * math.log(2)))
+
+        self._init(num_bits, num_hash, capacity, 0, bytearray((num_bits + 7) // 8))
+
+    def _init(
+        self,
+        num_bits: int,
+        num_hash: int,
+        capacity: int,
+        count: int,
+        bits: bytearray
+    ):
+        self.num_bits = num_bits
+        self.num_hash = num_hash
+        self.capacity = capacity
+        self.count = count
+        self._bits = bits
+
+    def _positions(self, key: bytes):
+        """
+        Kirsch–Mitzenmacher double hashing: h1 + i*h2 (mod m).
+        """
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+
+        m = self.num_bits
+        for i in range(self.num_hash):
+            yield (h1 + i * h2) % m
+
+    def add(self, serial) -> bool:
+        """
+        Insert a serial. Returns False if every bit was already set,
+        i.e. the serial was (or collided with something) already present.
+        """
+        key = serial_key(serial)
+        bits = self._bits
+        new = False
+
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+
+        if new:
+            self.count += 1
+
+        return new
+
+    def __contains__(self, serial) -> bool:
+        key = serial_key(serial)
+        bits = self._bits
+
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+
+        return True
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+
+    def save(self, path: str):
+        """
+        Atomically write the filter to disk.
+        """
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, self.num_bits, self.num_hash,
+            self.capacity, self.count
+        )
+        checksum = hashlib.sha256(header + self._bits).digest()
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(self._bits)
+            f.write(checksum)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if len(data) < _HEADER.size + 32:
+            raise ValueError("Truncated Bloom filter file")
+
+        magic, version, num_bits, num_hash, capacity, count = \
+            _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Unsupported Bloom filter file")
+
+        body, checksum = data[:-32], data[-32:]
+        if hashlib.sha256(body).digest() != checksum:
+            raise ValueError("Bloom filter checksum mismatch")
+
+        bits = bytearray(body[_HEADER.size:])
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError("Bloom filter size mismatch")
+
+        bloom = cls.__new__(cls)
+        bloom._init(num_bits, num_hash, capacity, count, bits)
+        return bloom
+
+    @classmethod
+    def from_serials(
+        cls,
+        serials: Iterable,
+        capacity: int,
+        fp_rate: float = 1e-6
+    ) -> "BloomFilter":
+        """
+        Build a filter by streaming serials from an existing store.
+        """
+        bloom = cls(capacity, fp_rate)
+        count = 0
+
+        for s in serials:
+            bloom.add(s)
+            count += 1
+
+        # Store iteration yields distinct serials, so this count is exact
+        bloom.count = count
+        return bloom
+
+
+class PrefilteredSerialStore:
+    """
+    Serial store with a Bloom filter in front of it.
+
+    Fresh serials (the common case) are rejected by the in-memory
+    filter without touching disk; only filter hits are confirmed
+    against the exact store.
+    """
+
+    def __init__(self, store, bloom: BloomFilter):
+        self.store = store
+        self.bloom = bloom
+
+    @classmethod
+    def open(
+        cls,
+        store,
+        filter_path: str,
+        capacity: int,
+        fp_rate: float = 1e-6
+    ) -> "PrefilteredSerialStore":
+        """
+        Load the persisted filter, or rebuild it from the store when
+        it is missing, corrupt or out of step with the store.
+
+        A stale filter could answer "not spent" for a spent serial,
+        so any doubt results in a rebuild. The store's len() must be
+        cheap (SerialStore keeps a count row). A filter that has
+        outgrown its capacity is rebuilt with room for twice the
+        current count.
+        """
+        bloom = None
+
+        if os.path.exists(filter_path):
+            try:
+                bloom = BloomFilter.load(filter_path)
+            except ValueError:
+                bloom = None
+
+        count = len(store)
+
+        if bloom is None or bloom.count != count or count > bloom.capacity:
+            capacity = max(capacity, 2 * count)
+            bloom = BloomFilter.from_serials(store, capacity, fp_rate)
+            bloom.save(filter_path)
+
+        return cls(store, bloom)
+
+    def __contains__(self, serial) -> bool:
+        key = serial_key(serial)
+
+        if key not in self.bloom:
+            return False    # definitely not present
+
+        return key in self.store
+
+    def add(self, serial):
+        key = serial_key(serial)
+
+        # Filter first: it must never miss a stored serial.
+        # On a filter collision, confirm against the store so that
+        # bloom.count keeps tracking the number of distinct serials.
+        if not self.bloom.add(key) and key not in self.store:
+            self.bloom.count += 1
+
+        if self.bloom.count == self.bloom.capacity + 1:
+            warnings.warn(
+                "Serial filter is past its capacity; its false-positive "
+                "rate now rises until it is reopened and rebuilt",
+                RuntimeWarning,
+                stacklevel=2
+            )
+
+        self.store.add(key)
+
+    def forget(self, serials):
+        """
+        Delegates to the store. The filter keeps the bits: a stale
+        positive is confirmed against the store, never trusted.
+        """
+        self.store.forget(serials)
+
+    def is_spent(self, serial) -> bool:
+        return serial in self
+
+    def mark_spent(self, serial):
+        self.add(serial)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __iter__(self):
+        return iter(self.store)
+
+    def save(self, filter_path: str):
+        """
+        Flush the store and persist the filter alongside it.
+        """
+        if hasattr(self.store, "flush"):
+            self.store.flush()
+        self.bloom.save(filter_path)
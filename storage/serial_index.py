@@ -0,0 +1,294 @@
+# storage/serial_index.py
+
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+from typing import Iterator
+
+from storage.serial_store import serial_key
+
+
+# ==========================================================
+# Base file format
+#   magic       (8)   b"CBDCIDX2"
+#   generation  (8)   bumped by every merge
+#   count       (8)
+#   digests     (count * 32)  sorted SHA-256(serial_key)
+#
+# Delta log (<path>.log)
+#   magic       (8)   b"CBDCLOG1"
+#   generation  (8)   base generation the records belong to
+#   append-only 32-byte digests; a torn trailing record is ignored
+#
+# A log whose generation differs from the base is stale: after a
+# merge its records are already in the base.
+# ==========================================================
+
+_MAGIC = b"CBDCIDX2"
+_HEADER = struct.Struct(">8sQQ")
+_LOG_MAGIC = b"CBDCLOG1"
+_LOG_HEADER = struct.Struct(">8sQ")
+DIGEST_SIZE = 32
+
+_MERGE_CHUNK = 4096   # records read per step while merging
+
+
+def serial_digest(serial) -> bytes:
+    return hashlib.sha256(serial_key(serial)).digest()
+
+
+class MappedSerialIndex:
+    """
+    Read-mostly spent-serial index for the bank.
+
+    Historical serials live in a sorted file of fixed-width digests
+    that is memory-mapped and binary-searched, so worker processes
+    share the same page cache instead of each holding a Python set.
+    New serials go to a small in-memory delta backed by an append-only
+    log, and are merged into the sorted file periodically.
+
+    Same interface as SpentSerialDB. Only one process may write;
+    readers call refresh() to pick up merges and new log records.
+    """
+
+    def __init__(self, path: str, merge_threshold: int = 65536):
+        self.path = path
+        self.log_path = path + ".log"
+        self.merge_threshold = merge_threshold
+
+        if not os.path.exists(path):
+            self._write_base(path, iter(()), 0, 0)
+
+        self._file = None
+        self._mm = None
+        self._count = 0
+        self._generation = None
+
+        self._delta = set()
+        self._log_offset = _LOG_HEADER.size
+        self._log_ready = False
+
+        self._map_base()
+        self._read_log()
+
+    # --------------------------------------------------
+    # Base file
+    # --------------------------------------------------
+
+    @staticmethod
+    def _write_base(
+        path: str,
+        digests: Iterator[bytes],
+        count: int,
+        generation: int
+    ):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, generation, count))
+            for d in digests:
+                f.write(d)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _base_generation(self) -> int:
+        with open(self.path, "rb") as f:
+            magic, generation, _ = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError("Not a serial index file")
+        return generation
+
+    def _map_base(self):
+        self._unmap_base()
+
+        f = open(self.path, "rb")
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, generation, count = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC:
+            mm.close()
+            f.close()
+            raise ValueError("Not a serial index file")
+        if len(mm) != _HEADER.size + count * DIGEST_SIZE:
+            mm.close()
+            f.close()
+            raise ValueError("Serial index size mismatch")
+
+        self._file = f
+        self._mm = mm
+        self._count = count
+        self._generation = generation
+
+    def _unmap_base(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+            self._file = None
+
+    def _base_contains(self, digest: bytes) -> bool:
+        mm = self._mm
+        lo, hi = 0, self._count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = _HEADER.size + mid * DIGEST_SIZE
+            probe = mm[start:start + DIGEST_SIZE]
+
+            if probe < digest:
+                lo = mid + 1
+            elif probe > digest:
+                hi = mid
+            else:
+                return True
+
+        return False
+
+    def _iter_base(self) -> Iterator[bytes]:
+        mm = self._mm
+        step = _MERGE_CHUNK * DIGEST_SIZE
+        end = _HEADER.size + self._count * DIGEST_SIZE
+
+        for start in range(_HEADER.size, end, step):
+            chunk = mm[start:min(start + step, end)]
+            for i in range(0, len(chunk), DIGEST_SIZE):
+                yield chunk[i:i + DIGEST_SIZE]
+
+    # --------------------------------------------------
+    # Delta log
+    # --------------------------------------------------
+
+    def _read_log(self) -> int:
+        """
+        Load log records past the current offset if the log belongs to
+        the mapped base. Returns the log's generation.
+        """
+        if not os.path.exists(self.log_path):
+            return self._generation
+
+        with open(self.log_path, "rb") as f:
+            magic, generation = _LOG_HEADER.unpack(f.read(_LOG_HEADER.size))
+            if magic != _LOG_MAGIC:
+                raise ValueError("Not a serial index log")
+            if generation != self._generation:
+                return generation
+
+            f.seek(self._log_offset)
+            data = f.read()
+
+        usable = len(data) - len(data) % DIGEST_SIZE
+        for i in range(0, usable, DIGEST_SIZE):
+            digest = data[i:i + DIGEST_SIZE]
+            if not self._base_contains(digest):
+                self._delta.add(digest)
+
+        self._log_offset += usable
+        return generation
+
+    def _reset_log(self):
+        """
+        Start an empty log for the current base generation.
+        """
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_LOG_HEADER.pack(_LOG_MAGIC, self._generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+
+        self._log_offset = _LOG_HEADER.size
+        self._log_ready = True
+
+    def _remap(self):
+        self._map_base()
+        self._delta.clear()
+        self._log_offset = _LOG_HEADER.size
+
+    def refresh(self):
+        """
+        Reader side: remap after a merge and load new log records.
+        """
+        if self._base_generation() != self._generation:
+            self._remap()
+
+        # The writer replaces the base before the log, so a newer log
+        # means a merge finished after the check above
+        if self._read_log() > self._generation:
+            self._remap()
+            self._read_log()
+
+    # --------------------------------------------------
+    # SpentSerialDB interface
+    # --------------------------------------------------
+
+    def is_spent(self, serial) -> bool:
+        digest = serial_digest(serial)
+        return digest in self._delta or self._base_contains(digest)
+
+    def mark_spent(self, serial):
+        digest = serial_digest(serial)
+
+        if digest in self._delta or self._base_contains(digest):
+            return
+
+        if not self._log_ready:
+            # A missing log, or one left over from an interrupted merge
+            if not os.path.exists(self.log_path) or \
+                    self._read_log() != self._generation:
+                self._reset_log()
+            self._log_ready = True
+
+        with open(self.log_path, "ab") as f:
+            f.write(digest)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log_offset += DIGEST_SIZE
+        self._delta.add(digest)
+
+        if len(self._delta) >= self.merge_threshold:
+            self.merge()
+
+    def __contains__(self, serial) -> bool:
+        return self.is_spent(serial)
+
+    def add(self, serial):
+        self.mark_spent(serial)
+
+    def __len__(self) -> int:
+        return self._count + len(self._delta)
+
+    # --------------------------------------------------
+    # Compaction
+    # --------------------------------------------------
+
+    def merge(self):
+        """
+        Merge the delta into a new sorted base file, then reset the log.
+        Streams the old base, so memory stays bounded by the delta.
+        """
+        if not self._delta:
+            return
+
+        merged = heapq.merge(self._iter_base(), sorted(self._delta))
+        self._write_base(
+            self.path,
+            merged,
+            self._count + len(self._delta),
+            self._generation + 1
+        )
+
+        # Base already holds every logged digest before the log is reset
+        self._remap()
+        self._reset_log()
+
+    def close(self):
+        self._unmap_base()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,265 @@
+# storage/serial_store.py
+
+import re
+import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from crypto.hash import serialize_point_fixed
+
+
+SERIAL_KEY_SIZE = 64
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def serial_key(serial) -> bytes:
+    """
+    Canonical 64-byte storage key for a serial.
+
+    Accepts either an EC point or an already-serialized
+    64-byte (x || y) encoding.
+    """
+    if isinstance(serial, (bytes, bytearray, memoryview)):
+        key = bytes(serial)
+        if len(key) != SERIAL_KEY_SIZE:
+            raise ValueError("Serial key must be 64 bytes")
+        return key
+
+    return serialize_point_fixed(serial)
+
+
+class SerialStore:
+    """
+    Persistent set of seen / spent serials backed by SQLite.
+
+    - WAL journal, one WITHOUT ROWID table keyed by a 64-byte BLOB
+    - inserts are buffered and group-committed in batches
+    - a bounded LRU hot cache sits in front of the database
+    - nothing is loaded on startup; lookups fall through lazily
+
+    Supports both the set protocol (`in`, `add`) used for
+    `seen_serials` and the `is_spent` / `mark_spent` interface
+    of SpentSerialDB.
+
+    Serials added since the last flush() live only in memory.
+    Use batch_size=1 where every insert must be durable on return.
+
+    The number of stored serials is kept in a `serial_counts` row
+    updated in the same transaction as the inserts, so len() does not
+    scan the table.
+
+    On a connection shared with other code, pass that code's
+    `transaction` context manager factory (e.g. WalletDB.transaction)
+    so flushes run inside its transactions rather than joining
+    whatever happens to be open on the connection.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        batch_size: int = 256,
+        cache_size: int = 100_000,
+        connection: Optional[sqlite3.Connection] = None,
+        table: str = "seen_serials",
+        transaction: Optional[Callable] = None
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        if not _TABLE_NAME.match(table):
+            raise ValueError("Invalid table name")
+
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+
+        self._owns_connection = connection is None
+        if connection is None:
+            connection = sqlite3.connect(
+                path,
+                isolation_level=None,       # explicit BEGIN / COMMIT
+                check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+        self._conn = connection
+        self._transaction = transaction
+
+        # Fixed SQL text, so sqlite3's statement cache keeps them prepared
+        self._sql_lookup = f"SELECT 1 FROM {table} WHERE serial = ?"
+        self._sql_insert = f"INSERT OR IGNORE INTO {table} (serial) VALUES (?)"
+        self._sql_iter = f"SELECT serial FROM {table}"
+        self._table = table
+
+        with self._atomic():
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"serial BLOB PRIMARY KEY "
+                f"CHECK (length(serial) = {SERIAL_KEY_SIZE})"
+                f") WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS serial_counts ("
+                "name TEXT PRIMARY KEY, "
+                "count INTEGER NOT NULL"
+                ") WITHOUT ROWID"
+            )
+
+            row = self._conn.execute(
+                "SELECT count FROM serial_counts WHERE name = ?", (table,)
+            ).fetchone()
+            if row is None:
+                # Table written before counts were kept: one scan
+                self._conn.execute(
+                    f"INSERT INTO serial_counts (name, count) "
+                    f"SELECT ?, COUNT(*) FROM {table}",
+                    (table,)
+                )
+
+        # serials accepted but not yet written
+        self._pending = set()
+
+        # serials known to be present (LRU order)
+        self._cache: OrderedDict = OrderedDict()
+
+    # --------------------------------------------------
+    # Set protocol (drop-in for seen_serials)
+    # --------------------------------------------------
+
+    def __contains__(self, serial) -> bool:
+        key = serial_key(serial)
+
+        if key in self._pending:
+            return True
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return True
+
+        row = self._conn.execute(self._sql_lookup, (key,)).fetchone()
+        if row is None:
+            return False
+
+        self._remember(key)
+        return True
+
+    def add(self, serial):
+        """
+        Record a serial. Written on the next group commit.
+        """
+        key = serial_key(serial)
+
+        self._pending.add(key)
+        self._remember(key)
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._conn.execute(
+            "SELECT count FROM serial_counts WHERE name = ?", (self._table,)
+        ).fetchone()[0]
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Stream all stored serial keys without loading them at once.
+        """
+        self.flush()
+        for (key,) in self._conn.execute(self._sql_iter):
+            yield key
+
+    # --------------------------------------------------
+    # SpentSerialDB interface
+    # --------------------------------------------------
+
+    def is_spent(self, serial) -> bool:
+        return serial in self
+
+    def mark_spent(self, serial):
+        self.add(serial)
+
+    # --------------------------------------------------
+    # Durability
+    # --------------------------------------------------
+
+    def flush(self):
+        """
+        Group-commit all buffered serials in a single transaction.
+
+        When called inside a transaction owned by someone else on
+        the same connection, the rows join that transaction instead.
+        """
+        if not self._pending:
+            return
+
+        rows = [(key,) for key in self._pending]
+
+        with self._atomic():
+            # rowcount leaves out serials that were already stored
+            added = self._conn.executemany(self._sql_insert, rows).rowcount
+            if added:
+                self._conn.execute(
+                    "UPDATE serial_counts SET count = count + ? WHERE name = ?",
+                    (added, self._table)
+                )
+
+        self._pending.clear()
+
+    @contextmanager
+    def _atomic(self):
+        """
+        Run writes in the owner's transaction when one was given, join
+        a transaction already open on the connection, or open one.
+        """
+        if self._transaction is not None:
+            with self._transaction():
+                yield
+        elif self._conn.in_transaction:
+            yield
+        else:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def forget(self, serials):
+        """
+        Drop serials from the write buffer and hot cache, e.g. after
+        the transaction their rows were flushed in rolled back. Rows
+        that did commit are unaffected: lookups fall through to them.
+        """
+        for serial in serials:
+            key = serial_key(serial)
+            self._pending.discard(key)
+            self._cache.pop(key, None)
+
+    def close(self):
+        self.flush()
+        if self._owns_connection:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --------------------------------------------------
+    # Internals
+    # --------------------------------------------------
+
+    def _remember(self, key: bytes):
+        if self.cache_size <= 0:
+            return
+
+        self._cache[key] = None
+        self._cache.move_to_end(key)
+
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,235 @@
+# storage/shared_serial_set.py
+
+import hashlib
+import multiprocessing
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+from storage.serial_store import serial_key
+
+
+# ==========================================================
+# Shared memory layout
+#   magic             (8)   b"CBDCSHS1"
+#   stripes           (4)
+#   slots_per_stripe  (4)
+#   counts            (stripes * 8)
+#   slots             (stripes * slots_per_stripe * 32)
+#
+# A slot holds SHA-256(serial_key); all-zero means empty and all-0xFF
+# marks a discarded serial (a tombstone: probes continue past it, and
+# inserts may reuse it).
+# Each stripe is its own open-addressing region guarded by its own
+# lock, so linear probing never crosses into another stripe.
+# ==========================================================
+
+_MAGIC = b"CBDCSHS1"
+_HEADER = struct.Struct("<8sII")
+_COUNT = struct.Struct("<Q")
+_SLOT_SIZE = 32
+_EMPTY = bytes(_SLOT_SIZE)
+_TOMBSTONE = b"\xff" * _SLOT_SIZE
+
+MAX_LOAD_FACTOR = 0.75
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing segment without letting this process's
+    resource tracker unlink it on exit (only the creator owns it).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track=
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedSerialSet:
+    """
+    Concurrent set of serials shared by verifier processes on one host.
+
+    Open-addressing hash table in multiprocessing.shared_memory with
+    lock striping. Lookups are lock-free; add_if_absent() is an atomic
+    test-and-insert, so a serial presented to two processes at the same
+    moment is accepted by exactly one of them.
+
+    Drop-in for the `seen_serials` argument of verify_offline_transaction.
+    Share it with workers by passing it as a Process / Pool argument.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1 << 20,
+        stripes: int = 64,
+        name=None,
+        mp_context=None
+    ):
+        if capacity < 1 or stripes < 1:
+            raise ValueError("capacity and stripes must be positive")
+
+        slots_per_stripe = -(-int(capacity / MAX_LOAD_FACTOR) // stripes)
+        size = (
+            _HEADER.size +
+            stripes * _COUNT.size +
+            stripes * slots_per_stripe * _SLOT_SIZE
+        )
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, stripes, slots_per_stripe)
+
+        # Locks must come from the same start-method context as the workers
+        ctx = mp_context or multiprocessing.get_context()
+        locks = [ctx.Lock() for _ in range(stripes)]
+        self._setup(shm, locks, owner=True)
+
+    def _setup(self, shm, locks, owner: bool):
+        magic, stripes, slots_per_stripe = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not a shared serial set")
+
+        self._shm = shm
+        self._buf = shm.buf
+        self._locks = locks
+        self._owner = owner
+
+        self.stripes = stripes
+        self.slots_per_stripe = slots_per_stripe
+        self.max_per_stripe = int(slots_per_stripe * MAX_LOAD_FACTOR)
+
+        self._counts_offset = _HEADER.size
+        self._slots_offset = _HEADER.size + stripes * _COUNT.size
+
+    # --------------------------------------------------
+    # Pickling (for handing the set to worker processes)
+    # --------------------------------------------------
+
+    def __getstate__(self):
+        return {"name": self._shm.name, "locks": self._locks}
+
+    def __setstate__(self, state):
+        self._setup(_attach(state["name"]), state["locks"], owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    # --------------------------------------------------
+    # Hashing
+    # --------------------------------------------------
+
+    def _locate(self, serial):
+        digest = hashlib.sha256(serial_key(serial)).digest()
+        if digest in (_EMPTY, _TOMBSTONE):
+            raise ValueError("Serial digest collides with a slot marker")
+
+        h = int.from_bytes(digest[:8], "little")
+        stripe = h % self.stripes
+        start = (h // self.stripes) % self.slots_per_stripe
+
+        return digest, stripe, start
+
+    def _slot_offset(self, stripe: int, slot: int) -> int:
+        return self._slots_offset + (
+            stripe * self.slots_per_stripe + slot
+        ) * _SLOT_SIZE
+
+    def _probe(self, digest: bytes, stripe: int, start: int):
+        """
+        Linear probe within one stripe. Returns (found, offset of the
+        match, or else of the first tombstone or empty slot passed).
+        """
+        buf = self._buf
+        n = self.slots_per_stripe
+        free = None
+
+        for i in range(n):
+            off = self._slot_offset(stripe, (start + i) % n)
+            slot = bytes(buf[off:off + _SLOT_SIZE])
+
+            if slot == digest:
+                return True, off
+            if slot == _EMPTY:
+                return False, off if free is None else free
+            if slot == _TOMBSTONE and free is None:
+                free = off
+
+        return False, free
+
+    # --------------------------------------------------
+    # Set operations
+    # --------------------------------------------------
+
+    def __contains__(self, serial) -> bool:
+        # Lock-free: a slot being written concurrently never compares
+        # equal to the digest, so the lookup simply orders before it.
+        digest, stripe, start = self._locate(serial)
+        found, _ = self._probe(digest, stripe, start)
+        return found
+
+    def add_if_absent(self, serial) -> bool:
+        """
+        Atomic test-and-insert.
+        Returns True if the serial was inserted, False if already present.
+        """
+        digest, stripe, start = self._locate(serial)
+        count_off = self._counts_offset + stripe * _COUNT.size
+
+        with self._locks[stripe]:
+            found, off = self._probe(digest, stripe, start)
+            if found:
+                return False
+
+            (count,) = _COUNT.unpack_from(self._buf, count_off)
+            if off is None or count >= self.max_per_stripe:
+                raise ValueError("SharedSerialSet is full")
+
+            self._buf[off:off + _SLOT_SIZE] = digest
+            _COUNT.pack_into(self._buf, count_off, count + 1)
+
+        return True
+
+    def add(self, serial):
+        self.add_if_absent(serial)
+
+    def discard(self, serial):
+        """
+        Remove a serial if present, e.g. after the acceptance that
+        added it was rolled back.
+        """
+        digest, stripe, start = self._locate(serial)
+        count_off = self._counts_offset + stripe * _COUNT.size
+
+        with self._locks[stripe]:
+            found, off = self._probe(digest, stripe, start)
+            if not found:
+                return
+
+            # A tombstone, not an empty slot: later entries of the same
+            # probe run must stay reachable for lock-free lookups
+            self._buf[off:off + _SLOT_SIZE] = _TOMBSTONE
+            (count,) = _COUNT.unpack_from(self._buf, count_off)
+            _COUNT.pack_into(self._buf, count_off, count - 1)
+
+    def __len__(self) -> int:
+        return sum(
+            _COUNT.unpack_from(self._buf, self._counts_offset + i * _COUNT.size)[0]
+            for i in range(self.stripes)
+        )
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """
+        Destroy the segment. Only the creating process should call this.
+        """
+        if self._owner:
+            self._shm.unlink()
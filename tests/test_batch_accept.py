@@ -0,0 +1,142 @@
+# tests/test_batch_accept.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from crypto.commitment import commit
+from crypto.curve import G, random_scalar
+from crypto.state.proof_state import ProofState
+from crypto.transaction.accept_offline_tx import (
+    accept_offline_transaction,
+    accept_offline_transactions,
+)
+from wallet.receiver_state import ReceiverWalletState
+from wallet.wallet_db import WalletDB
+
+
+def _empty_state():
+    return ProofState(
+        C_in_total=commit(0, 0),
+        C_out_total=commit(0, 0),
+        r_in_total=0,
+        r_out_total=0
+    )
+
+
+def _txs(n):
+    return [
+        SimpleNamespace(
+            input_serials=[(100 + i) * G],
+            output_commitments=[commit(3, random_scalar()), commit(2, random_scalar())],
+            transcript_hash=bytes([i]) * 32,
+            device_certificate=SimpleNamespace(cert_id=b"sender-%d" % (i % 2))
+        )
+        for i in range(n)
+    ]
+
+
+def test_batch_matches_sequential_accept():
+    txs = _txs(5)
+
+    one_by_one = ReceiverWalletState(proof_state=_empty_state())
+    for tx in txs:
+        accept_offline_transaction(tx, one_by_one)
+
+    batched = ReceiverWalletState(proof_state=_empty_state())
+    accept_offline_transactions(txs, batched)
+
+    assert batched.proof_state.C_out_total == one_by_one.proof_state.C_out_total
+    assert batched.seen_serials == one_by_one.seen_serials
+    assert len(batched.owned_tokens) == 10
+    assert len(batched.owned_tokens.from_sender(b"sender-0")) == 6
+
+
+def test_duplicate_serial_in_batch_is_rejected():
+    txs = _txs(3)
+    txs[2].input_serials = txs[0].input_serials
+
+    receiver = ReceiverWalletState(proof_state=_empty_state())
+
+    with pytest.raises(ValueError):
+        accept_offline_transactions(txs, receiver)
+
+    assert len(receiver.seen_serials) == 0
+    assert len(receiver.owned_tokens) == 0
+
+
+def test_failed_batch_leaves_database_and_memory_unchanged(tmp_path):
+    path = str(tmp_path / "wallet.db")
+
+    with WalletDB(path) as db:
+        receiver = ReceiverWalletState(proof_state=_empty_state(), db=db)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("crash before commit")
+
+        receiver.persist = fail
+
+        with pytest.raises(RuntimeError):
+            accept_offline_transactions(_txs(4), receiver)
+
+        # The live receiver matches the rolled-back database
+        assert len(receiver.owned_tokens) == 0
+        assert receiver.proof_state.C_out_total == commit(0, 0)
+        assert 100 * G not in receiver.seen_serials
+
+    with WalletDB(path) as db:
+        receiver = ReceiverWalletState(db=db)
+        assert len(receiver.owned_tokens) == 0
+        assert 100 * G not in receiver.seen_serials
+        assert receiver.proof_state is None
+
+        # Nothing left over blocks the same batch once the fault is gone
+        receiver.proof_state = _empty_state()
+        accept_offline_transactions(_txs(4), receiver)
+        assert len(receiver.owned_tokens) == 8
+        assert 100 * G in receiver.seen_serials
+
+
+def test_failed_accept_without_db_leaves_state_unchanged():
+    receiver = ReceiverWalletState(proof_state=_empty_state())
+    receiver.seen_serials.add(b"\x01" * 64)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("crash before commit")
+
+    receiver.owned_tokens.prepare_many = fail
+
+    with pytest.raises(RuntimeError):
+        accept_offline_transaction(_txs(1)[0], receiver)
+
+    assert receiver.seen_serials == {b"\x01" * 64}
+    assert receiver.proof_state.C_out_total == commit(0, 0)
+
+
+
+def test_failed_accept_takes_serials_out_of_shared_set():
+    from storage.shared_serial_set import SharedSerialSet
+
+    shared = SharedSerialSet(capacity=64, stripes=4)
+    try:
+        receiver = ReceiverWalletState(proof_state=_empty_state(), seen_serials=shared)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("crash before commit")
+
+        receiver.owned_tokens.prepare_many = fail
+        tx = _txs(1)[0]
+
+        with pytest.raises(RuntimeError):
+            accept_offline_transaction(tx, receiver)
+
+        assert tx.input_serials[0] not in shared
+        assert len(shared) == 0
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_seen_serials_must_support_removal():
+    with pytest.raises(ValueError):
+        ReceiverWalletState(seen_serials=frozenset())
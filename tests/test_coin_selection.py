@@ -0,0 +1,105 @@
+# tests/test_coin_selection.py
+
+from crypto.curve import G
+from models.token import Token
+import pytest
+
+import wallet.coin_selection
+from wallet.coin_selection import (
+    select_coins,
+    EXACT_MATCH,
+    BRANCH_AND_BOUND,
+    MIN_CHANGE,
+)
+from wallet.token_store import TokenStore
+
+
+def make_store(entries):
+    store = TokenStore()
+    for serial, (v, expiry) in enumerate(entries, start=1):
+        store.add_token(Token(
+            serial=serial,
+            commitment=v * G,
+            expiry=expiry,
+            signature=None,
+            v=v,
+            r=0,
+            s=serial
+        ))
+    return store
+
+
+def test_exact_match_prefers_soonest_expiry():
+    store = make_store([(20, 900), (20, 300), (50, 100)])
+
+    sel = select_coins(store, 20, current_time=0, strategy=EXACT_MATCH)
+    assert [t.serial for t in sel.tokens] == [2]
+    assert sel.change == 0
+
+
+def test_branch_and_bound_finds_fewest_exact_inputs():
+    store = make_store([(1, 999)] * 10 + [(5, 999), (10, 999), (2, 999)])
+
+    sel = select_coins(
+        store, 17, current_time=0, strategy=BRANCH_AND_BOUND, max_inputs=8
+    )
+    assert sel.total == 17
+    assert sorted(t.v for t in sel.tokens) == [2, 5, 10]
+
+
+def test_min_change_when_no_exact_combination():
+    store = make_store([(50, 999), (20, 999), (20, 999)])
+
+    sel = select_coins(store, 35, current_time=0, strategy=MIN_CHANGE, max_inputs=8)
+    assert sel.total == 40
+    assert sel.change == 5
+
+
+def test_expired_tokens_are_not_selected():
+    store = make_store([(10, 100), (10, 500)])
+
+    sel = select_coins(store, 10, current_time=200)
+    assert [t.serial for t in sel.tokens] == [2]
+
+    try:
+        select_coins(store, 15, current_time=200)
+        assert False, "Selected more than the spendable balance"
+    except ValueError:
+        pass
+
+
+def test_max_inputs_is_respected():
+    store = make_store([(1, 999)] * 20)
+
+    try:
+        select_coins(store, 5, current_time=0, max_inputs=4)
+        assert False, "Selection exceeded max_inputs"
+    except ValueError:
+        pass
+
+    sel = select_coins(store, 4, current_time=0, max_inputs=4)
+    assert len(sel.tokens) == 4
+
+
+def test_default_selection_is_spendable():
+    store = make_store([(5, 999), (5, 999), (20, 999)])
+
+    sel = select_coins(store, 10, current_time=0)
+    assert [t.v for t in sel.tokens] == [20]
+
+    with pytest.raises(ValueError):
+        select_coins(store, 30, current_time=0)
+
+
+def test_exhausted_search_budget_is_not_insufficient_funds(monkeypatch):
+    monkeypatch.setattr(wallet.coin_selection, "SEARCH_BUDGET", 1)
+    store = make_store([(v, 999) for v in (3, 7, 11, 13)])
+
+    with pytest.raises(ValueError, match="budget"):
+        select_coins(store, 18, current_time=0, strategy=BRANCH_AND_BOUND, max_inputs=4)
+
+    sel = select_coins(store, 18, current_time=0, strategy=MIN_CHANGE, max_inputs=4)
+    assert sel.total >= 18
+
+    sel = select_coins(store, 18, current_time=0, max_inputs=4)
+    assert sel.total >= 18
@@ -0,0 +1,101 @@
+# tests/test_epoch_store.py
+
+import os
+import time
+
+from crypto.curve import G
+from storage.epoch_store import EpochSerialStore
+
+
+DAY = 24 * 60 * 60
+
+
+def test_epoch_store_partitions_by_expiry():
+    store = EpochSerialStore(epoch_seconds=DAY)
+    now = 100 * DAY
+
+    store.add(1 * G, expiry=now + DAY // 2, now=now)
+    store.add(2 * G, expiry=now + 3 * DAY, now=now)
+
+    assert store.partition_count() == 2
+    assert store.contains(1 * G, now=now)
+    assert store.contains(2 * G, expiry=now + 3 * DAY, now=now)
+    assert not store.contains(3 * G, now=now)
+
+
+def test_epoch_store_prunes_expired_partitions():
+    store = EpochSerialStore(epoch_seconds=DAY)
+    now = 100 * DAY
+
+    store.add(1 * G, expiry=now + 10, now=now)
+    store.add(2 * G, expiry=now + 5 * DAY, now=now)
+
+    # Epoch 100 has ended: everything in it is expired
+    assert store.prune(now=101 * DAY) == 1
+    assert store.partition_count() == 1
+    assert not store.contains(1 * G, now=101 * DAY)
+    assert store.contains(2 * G, now=101 * DAY)
+
+
+def test_epoch_store_auto_prunes_on_new_epoch():
+    store = EpochSerialStore(epoch_seconds=DAY)
+
+    store.add(1 * G, expiry=100 * DAY + 1, now=100 * DAY)
+    store.add(2 * G, expiry=110 * DAY, now=102 * DAY)
+
+    assert store.partition_count() == 1
+    assert len(store) == 1
+
+
+def test_epoch_store_file_partitions(tmp_path):
+    directory = str(tmp_path / "serials")
+    now = 100 * DAY
+
+    store = EpochSerialStore(epoch_seconds=DAY, directory=directory)
+    store.add(1 * G, expiry=now + 10, now=now)
+    store.add(2 * G, expiry=now + 2 * DAY, now=now)
+    store.close()
+
+    reopened = EpochSerialStore(epoch_seconds=DAY, directory=directory)
+    assert reopened.contains(1 * G, now=now)
+    assert reopened.contains(2 * G, now=now)
+
+    reopened.prune(now=101 * DAY)
+    assert not os.path.exists(os.path.join(directory, "serials-100.db"))
+    assert reopened.contains(2 * G, now=101 * DAY)
+    reopened.close()
+
+
+def test_serial_added_without_expiry_is_found_by_expiry(tmp_path):
+    directory = str(tmp_path / "serials")
+    now = 100 * DAY
+    expiry = now + 2 * DAY
+
+    store = EpochSerialStore(epoch_seconds=DAY, directory=directory)
+    store.add(1 * G, now=now)
+    store.add(2 * G, expiry=expiry, now=now)
+
+    assert store.contains(1 * G, expiry=expiry, now=now)
+    assert store.contains(1 * G, now=now)
+    assert not store.contains(3 * G, expiry=expiry, now=now)
+    store.close()
+
+    # Still found after a restart
+    reopened = EpochSerialStore(epoch_seconds=DAY, directory=directory)
+    assert reopened.contains(1 * G, expiry=expiry, now=now + DAY)
+    assert reopened.contains(2 * G, expiry=expiry, now=now + DAY)
+    assert reopened.partition_count() == 2
+    reopened.close()
+
+
+def test_epoch_store_forgets_rolled_back_serials(tmp_path):
+    for directory in (None, str(tmp_path)):
+        store = EpochSerialStore(directory=directory, epoch_seconds=DAY, batch_size=100)
+
+        store.add(1 * G)
+        store.add(2 * G, expiry=int(time.time()) + DAY)
+        store.forget([1 * G])
+
+        assert 1 * G not in store
+        assert 2 * G in store
+        store.close()
@@ -0,0 +1,86 @@
+import base64
+import os
+import random
+
+import pytest
+
+from transport.fountain import (
+    FountainDecoder,
+    FountainEncoder,
+    block_indices,
+    decode_frames,
+)
+from transport.qr_decoder import decode_qr_frames
+from transport.qr_encoder import encode_transaction_to_qr_frames
+from transport.transaction_serializer import (
+    WIRE_V2,
+    serialize_offline_transaction,
+)
+
+
+def test_block_selection_is_deterministic():
+    assert block_indices(3, 10) == [3]
+    assert block_indices(1234, 50) == block_indices(1234, 50)
+    assert all(0 <= i < 50 for i in block_indices(99, 50))
+
+
+def test_source_frames_alone_decode():
+    payload = os.urandom(1000)
+    encoder = FountainEncoder(payload, 100)
+
+    assert encoder.k == 10
+    assert decode_frames(encoder.frames(10)) == payload
+
+
+def test_any_order_with_losses_and_duplicates():
+    payload = os.urandom(3001)
+    encoder = FountainEncoder(payload, 120)
+    rng = random.Random(7)
+
+    frames = [f for f in encoder.frames(encoder.k * 4) if rng.random() > 0.4]
+    frames += frames[:5]
+    rng.shuffle(frames)
+
+    assert decode_frames(frames) == payload
+
+
+def test_coded_frames_only():
+    payload = os.urandom(2000)
+    encoder = FountainEncoder(payload, 100)
+
+    decoder = FountainDecoder()
+    for seed in range(encoder.k, encoder.k * 20):
+        if decoder.add_frame(encoder.frame(seed)):
+            break
+
+    assert decoder.result() == payload
+
+
+def test_rejects_foreign_and_insufficient_frames():
+    a = FountainEncoder(os.urandom(500), 100)
+    b = FountainEncoder(os.urandom(500), 100)
+
+    decoder = FountainDecoder()
+    decoder.add_frame(a.frame(0))
+    with pytest.raises(ValueError):
+        decoder.add_frame(b.frame(1))
+    with pytest.raises(ValueError):
+        decoder.result()
+    with pytest.raises(ValueError):
+        decode_frames(a.frames(3))
+
+
+def test_qr_frame_sequence(sample_tx, tmp_path):
+    from PIL import Image
+
+    path = str(tmp_path / "tx.gif")
+    count = encode_transaction_to_qr_frames(sample_tx, path, block_size=150)
+
+    with Image.open(path) as img:
+        assert img.n_frames == count
+
+    payload = serialize_offline_transaction(sample_tx, WIRE_V2)
+    frames = list(FountainEncoder(payload, 150).frames(count * 2))[::-1]
+
+    tx = decode_qr_frames(base64.b64encode(f).decode() for f in frames)
+    assert tx.transcript_hash == sample_tx.transcript_hash
@@ -0,0 +1,60 @@
+# tests/test_lazy_point.py
+
+import pickle
+
+from crypto.curve import G, compress_point
+from crypto.hash import serialize_point_fixed
+from crypto.zkp.recursive import RecursiveInvariantProof
+from crypto.zkp.spend import SpendProof
+from models.token import Token
+from transport.proof_serializer import (
+    deserialize_spend_proof,
+    serialize_spend_proof,
+)
+from wallet.pending_store import PendingSpend
+from wallet.spend_transcript import _serialize_proof
+
+
+def test_models_have_no_instance_dict():
+    proof = RecursiveInvariantProof(5 * G, 7)
+    token = Token(1, G, 10, None, 1, 2, 3)
+
+    for obj in (proof, token, PendingSpend(G, proof, 0)):
+        assert not hasattr(obj, "__dict__")
+
+
+def test_encoded_point_is_decoded_on_access():
+    P = 9 * G
+    proof = RecursiveInvariantProof(serialize_point_fixed(P), 1)
+
+    assert isinstance(proof._A, bytes)
+    assert proof.A == P
+    assert not isinstance(proof._A, bytes)
+
+    assert RecursiveInvariantProof(compress_point(P), 1).A == P
+
+
+def test_lazy_deserialize_round_trip():
+    proof = SpendProof(3 * G, 4 * G, 5, 6, 7)
+    data = serialize_spend_proof(proof)
+
+    lazy = deserialize_spend_proof(data, lazy=True)
+
+    # Re-serializing reuses the stored encodings
+    assert serialize_spend_proof(lazy) == data
+    assert isinstance(lazy._A_commit, bytes)
+
+    assert lazy.A_commit == 3 * G
+    assert lazy.A_serial == 4 * G
+
+
+def test_transcript_hash_ignores_representation():
+    eager = SpendProof(3 * G, 4 * G, 5, 6, 7)
+    lazy = deserialize_spend_proof(serialize_spend_proof(eager), lazy=True)
+
+    assert _serialize_proof(eager) == _serialize_proof(lazy)
+
+
+def test_slotted_proof_pickles():
+    proof = pickle.loads(pickle.dumps(RecursiveInvariantProof(2 * G, 3)))
+    assert proof.A == 2 * G and proof.z == 3
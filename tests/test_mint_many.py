@@ -0,0 +1,68 @@
+# tests/test_mint_many.py
+
+import time
+
+import pytest
+
+from bank.main import BANK_PK, mint_tokens
+from crypto.commitment import commit
+from crypto.curve import random_scalar
+from crypto.state.proof_state import ProofState
+from crypto.zkp.mint import (
+    DenominationProof,
+    prove_minting,
+    verify_minting_batch,
+)
+from wallet.token_lifecycle import TokenLifecycle, split_into_notes
+from wallet.token_store import TokenStore
+
+
+def _request(v):
+    r = random_scalar()
+    C = commit(v, r)
+    return C, prove_minting(v, r, C)
+
+
+def test_split_into_notes():
+    assert split_into_notes(188) == [100, 50, 20, 10, 5, 2, 1]
+    assert sum(split_into_notes(5000)) == 5000
+    assert split_into_notes(5000) == [100] * 50
+
+    with pytest.raises(ValueError):
+        split_into_notes(0)
+
+
+def test_batch_verifier_rejects_one_bad_proof():
+    good = [_request(v) for v in (1, 20, 100)]
+    assert verify_minting_batch(good)
+    assert verify_minting_batch([])
+
+    C, proof = good[1]
+    z1 = dict(proof.z1_map)
+    z1[20] = (z1[20] + 1)
+    bad = DenominationProof(proof.A_map, z1, proof.z2_map, proof.e_map)
+
+    assert not verify_minting_batch(good[:1] + [(C, bad)] + good[2:])
+
+
+def test_mint_many_tops_up_in_one_batch():
+    wallet = TokenLifecycle(TokenStore(), ProofState(commit(0, 0), commit(0, 0), 0, 0))
+    batches = []
+
+    def bank(requests):
+        batches.append(len(requests))
+        return mint_tokens(requests)
+
+    tokens = wallet.mint_many(
+        178,
+        int(time.time()) + 3600,
+        BANK_PK,
+        bank,
+        max_workers=2
+    )
+
+    assert batches == [6]
+    assert sorted(t.v for t in tokens) == [1, 2, 5, 20, 50, 100]
+    assert wallet.store.count_unspent() == 6
+    assert all(t.verify_bank_signature(BANK_PK) for t in tokens)
+    assert all(commit(t.v, t.r) == t.commitment for t in tokens)
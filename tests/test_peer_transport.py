@@ -0,0 +1,191 @@
+# tests/test_peer_transport.py
+
+import os
+import threading
+
+import pytest
+
+from transport.peer_transport import (
+    FramedChannel,
+    LoopbackLink,
+    PayloadReceiver,
+    receive_transaction,
+    send_payload,
+    send_transaction,
+    unix_socket_pair,
+)
+from transport.transaction_serializer import serialize_offline_transaction
+from wallet.cert_cache import CertificateCache
+
+
+def _in_thread(fn, *args):
+    """
+    Run fn in a thread; returns a join() that gives its result or
+    re-raises its exception.
+    """
+    out = {}
+
+    def run():
+        try:
+            out["result"] = fn(*args)
+        except BaseException as e:
+            out["error"] = e
+
+    t = threading.Thread(target=run)
+    t.start()
+
+    def join():
+        t.join(10)
+        if "error" in out:
+            raise out["error"]
+        return out["result"]
+
+    return join
+
+
+class _FaultyLink:
+    """
+    Wraps a link: flips a byte in every `corrupt_every`-th write, loses
+    the writes numbered in `drop` (from 1), and fails for good after
+    `fail_after` writes.
+    """
+
+    def __init__(self, link, corrupt_every=0, fail_after=None, drop=()):
+        self.link = link
+        self.corrupt_every = corrupt_every
+        self.fail_after = fail_after
+        self.drop = set(drop)
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        if self.fail_after is not None and self.writes > self.fail_after:
+            self.link.close()
+            raise ConnectionError("Link lost")
+
+        if self.writes in self.drop:
+            return
+
+        if self.corrupt_every and self.writes % self.corrupt_every == 0:
+            data = bytearray(data)
+            data[len(data) // 2] ^= 0xFF
+
+        self.link.write(data)
+
+    def read(self, max_bytes, timeout=None):
+        return self.link.read(max_bytes, timeout)
+
+    def close(self):
+        self.link.close()
+
+
+@pytest.mark.parametrize("pair", [LoopbackLink.pair, unix_socket_pair])
+@pytest.mark.parametrize("cached", [False, True])
+def test_transaction_over_link_with_cert_handshake(sample_tx, pair, cached):
+    a, b = pair()
+    cache = CertificateCache()
+    if cached:
+        cache.add(sample_tx.device_certificate)
+
+    join = _in_thread(receive_transaction, FramedChannel(b), None, cache)
+    assert send_transaction(FramedChannel(a), sample_tx) is cached
+
+    tx = join()
+    assert serialize_offline_transaction(tx) == serialize_offline_transaction(sample_tx)
+
+    a.close()
+    b.close()
+
+
+@pytest.mark.parametrize("send_window, receive_window", [(4, 32), (32, 4), (1, 1)])
+def test_sender_and_receiver_windows_may_differ(send_window, receive_window):
+    payload = os.urandom(10_000)
+    a, b = LoopbackLink.pair()
+
+    join = _in_thread(PayloadReceiver(window=receive_window).receive, FramedChannel(b), 0.5)
+    send_payload(FramedChannel(a), payload, window=send_window, timeout=0.5, retries=0)
+
+    assert join() == payload
+
+
+def test_lost_offer_is_sent_again():
+    payload = os.urandom(5_000)
+    a, b = LoopbackLink.pair()
+
+    join = _in_thread(PayloadReceiver().receive, FramedChannel(b), 0.2)
+    send_payload(FramedChannel(_FaultyLink(a, drop={1})), payload, timeout=0.2)
+
+    assert join() == payload
+
+
+@pytest.mark.parametrize("sender_drops, receiver_drops", [
+    ({1}, ()),      # HELLO
+    ({2}, ()),      # OFFER
+    ((), {1}),      # HELLO_ACK
+    ((), {2}),      # ACCEPT
+])
+def test_lost_handshake_frames_are_recovered(sample_tx, sender_drops, receiver_drops):
+    a, b = LoopbackLink.pair()
+
+    rx = FramedChannel(_FaultyLink(b, drop=receiver_drops))
+    join = _in_thread(receive_transaction, rx, None, None, 32, 0.2)
+    send_transaction(FramedChannel(_FaultyLink(a, drop=sender_drops)), sample_tx, timeout=0.2)
+
+    tx = join()
+    assert serialize_offline_transaction(tx) == serialize_offline_transaction(sample_tx)
+
+
+def test_lost_end_of_window_is_nacked_when_idle():
+    a, b = LoopbackLink.pair()
+    tx = FramedChannel(_FaultyLink(a, drop={9}))   # OFFER, then DATA 0-7
+    payload = os.urandom(8 * tx.max_payload)
+
+    join = _in_thread(PayloadReceiver().receive, FramedChannel(b), 1.0)
+    sent = send_payload(tx, payload, window=8, timeout=1.0)
+
+    assert join() == payload
+    assert sent == 9     # only the lost chunk went again
+
+
+def test_chunks_survive_corrupted_frames():
+    payload = os.urandom(20_000)
+    a, b = LoopbackLink.pair()
+
+    rx = FramedChannel(b, mtu=64)
+    join = _in_thread(PayloadReceiver(window=8).receive, rx, 0.5)
+
+    tx = FramedChannel(_FaultyLink(a, corrupt_every=13), mtu=64)
+    sent = send_payload(tx, payload, window=8, timeout=0.2)
+
+    assert join() == payload
+    assert rx.dropped > 0
+    assert sent > -(-len(payload) // rx.max_payload)
+
+
+def test_interrupted_transfer_resumes():
+    payload = os.urandom(30_000)
+    receiver = PayloadReceiver()
+
+    a, b = LoopbackLink.pair()
+    join = _in_thread(receiver.receive, FramedChannel(b), 1.0)
+
+    with pytest.raises(ConnectionError):
+        send_payload(FramedChannel(_FaultyLink(a, fail_after=60)), payload)
+    with pytest.raises(ConnectionError):
+        join()
+
+    # New connection, same receiver: only the missing part is sent
+    a, b = LoopbackLink.pair()
+    join = _in_thread(receiver.receive, FramedChannel(b), 1.0)
+
+    channel = FramedChannel(a)
+    n = -(-len(payload) // channel.max_payload)
+    sent = send_payload(channel, payload)
+
+    assert join() == payload
+    assert sent <= n - 32
+
+    # Offered again (e.g. DONE was lost): acknowledged, not redelivered
+    join = _in_thread(receiver.receive, FramedChannel(b), 1.0)
+    assert send_payload(channel, payload) == 0
+    assert join() is None
@@ -1,3 +1,5 @@
+import pytest
+
 from transport.qr_encoder import encode_transaction_to_qr
 from transport.qr_decoder import decode_qr_payload
 from transport.transaction_serializer import serialize_offline_transaction
@@ -11,3 +13,51 @@ def test_qr_base64_roundtrip(sample_tx):
     tx2 = decode_qr_payload(b64)
 
     assert tx2.transcript_hash == sample_tx.transcript_hash
+
+
+def test_qr_accepts_v2_payload(sample_tx):
+    from transport.transaction_serializer import WIRE_V2
+
+    payload = serialize_offline_transaction(sample_tx, WIRE_V2)
+    tx2 = decode_qr_payload(base64.b64encode(payload).decode())
+
+    assert tx2.input_serials == sample_tx.input_serials
+
+
+def test_base45_rfc_vectors():
+    from transport.base45 import b45decode, b45encode
+
+    for raw, text in [(b"AB", "BB8"), (b"Hello!!", "%69 VD92EX0"), (b"base-45", "UJCLQE7W581")]:
+        assert b45encode(raw) == text
+        assert b45decode(text) == raw
+
+    for bad in ("GGW", "A", "abc"):
+        with pytest.raises(ValueError):
+            b45decode(bad)
+
+
+def test_qr_payload_encodings_decode(sample_tx):
+    from transport.qr_encoder import (
+        QR_BASE45,
+        QR_BASE64,
+        QR_BINARY,
+        build_qr,
+        qr_data,
+        qr_version_report,
+    )
+    from transport.transaction_serializer import WIRE_V2
+
+    payload = serialize_offline_transaction(sample_tx, WIRE_V2)
+
+    for encoding in (QR_BINARY, QR_BASE45, QR_BASE64):
+        scanned = qr_data(payload, encoding).data
+        if encoding != QR_BINARY:
+            scanned = scanned.decode()
+        assert decode_qr_payload(scanned).nonce == sample_tx.nonce
+
+    report = qr_version_report(payload)
+    assert report[QR_BINARY] < report[QR_BASE64]
+    assert report[QR_BASE45] < report[QR_BASE64]
+
+    qr, encoding = build_qr(payload)
+    assert qr.version == min(report[QR_BINARY], report[QR_BASE45])
@@ -0,0 +1,72 @@
+# tests/test_qr_render.py
+
+import io
+
+import pytest
+
+from transport.qr_encoder import QR_BASE45, build_qr
+from transport.qr_render import (
+    FORMAT_MATRIX,
+    FORMAT_PNG,
+    FORMAT_SVG,
+    QRRenderCache,
+    render_qr,
+    render_transaction_qr,
+)
+from transport.transaction_serializer import WIRE_V2, serialize_offline_transaction
+
+
+def test_formats_match_the_qr_matrix(sample_tx):
+    from PIL import Image
+
+    payload = serialize_offline_transaction(sample_tx, WIRE_V2)
+    qr, _ = build_qr(payload)
+
+    matrix = render_qr(payload, FORMAT_MATRIX)
+    assert [list(row) for row in matrix] == qr.get_matrix()
+
+    n = len(matrix)
+    png = render_qr(payload, FORMAT_PNG, box_size=4)
+    with Image.open(io.BytesIO(png)) as img:
+        assert img.size == (4 * n, 4 * n)
+        # Top-left finder pattern module (inside the 4-module quiet zone)
+        assert img.getpixel((4 * 4, 4 * 4)) == 0
+        assert img.getpixel((0, 0)) != 0
+
+    svg = render_qr(payload, FORMAT_SVG)
+    assert svg.startswith(b"<svg") and f'viewBox="0 0 {n} {n}"'.encode() in svg
+
+    with pytest.raises(ValueError):
+        render_qr(payload, "jpeg")
+
+
+def test_render_cache(sample_tx):
+    cache = QRRenderCache(max_entries=1)
+
+    png = render_transaction_qr(sample_tx, cache=cache)
+    assert render_transaction_qr(sample_tx, cache=cache) is png
+    assert render_transaction_qr(sample_tx, FORMAT_SVG, cache=cache).startswith(b"<svg")
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    render_transaction_qr(sample_tx, cert_by_reference=True, cache=cache)
+    assert len(cache) == 1 and cache.misses == 2
+
+
+def test_reused_qrcode_matches_a_fresh_one():
+    payloads = [bytes(range(200)), b"\x00" * 40, bytes(range(50))]
+
+    qr = None
+    for payload in payloads:
+        for encoding in ("auto", QR_BASE45):
+            fresh, fresh_encoding = build_qr(payload, encoding)
+            reused, reused_encoding = build_qr(payload, encoding, qr=qr)
+            assert qr is None or reused is qr
+            qr = reused
+
+            assert reused_encoding == fresh_encoding
+            assert reused.version == fresh.version
+            assert reused.get_matrix() == fresh.get_matrix()
+
+    cache = QRRenderCache()
+    for payload in payloads:
+        assert cache.render(payload, FORMAT_MATRIX) == render_qr(payload, FORMAT_MATRIX)
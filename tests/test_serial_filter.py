@@ -0,0 +1,91 @@
+# tests/test_serial_filter.py
+
+from crypto.curve import G
+from storage.serial_filter import BloomFilter, PrefilteredSerialStore
+from storage.serial_store import SerialStore
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=200, fp_rate=1e-4)
+
+    present = [k * G for k in range(1, 101)]
+    for s in present:
+        bloom.add(s)
+
+    assert all(s in bloom for s in present)
+    assert bloom.count == 100
+
+
+def test_bloom_filter_save_and_load(tmp_path):
+    path = str(tmp_path / "serials.bloom")
+
+    bloom = BloomFilter(capacity=50)
+    bloom.add(3 * G)
+    bloom.save(path)
+
+    loaded = BloomFilter.load(path)
+    assert 3 * G in loaded
+    assert loaded.count == 1
+    assert loaded.num_bits == bloom.num_bits
+
+
+def test_bloom_filter_detects_corruption(tmp_path):
+    path = tmp_path / "serials.bloom"
+
+    bloom = BloomFilter(capacity=50)
+    bloom.add(3 * G)
+    bloom.save(str(path))
+
+    data = bytearray(path.read_bytes())
+    data[40] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    try:
+        BloomFilter.load(str(path))
+        assert False, "Corrupted filter was loaded"
+    except ValueError:
+        pass
+
+
+def test_prefiltered_store_rebuilds_stale_filter(tmp_path):
+    db_path = str(tmp_path / "spent.db")
+    filter_path = str(tmp_path / "spent.bloom")
+
+    store = SerialStore(db_path)
+    spent = PrefilteredSerialStore.open(store, filter_path, capacity=100)
+
+    spent.mark_spent(5 * G)
+    spent.save(filter_path)
+
+    # Written behind the filter's back: the saved filter is now stale
+    store.add(6 * G)
+    store.flush()
+
+    reopened = PrefilteredSerialStore.open(store, filter_path, capacity=100)
+    assert reopened.is_spent(5 * G)
+    assert reopened.is_spent(6 * G)
+    assert not reopened.is_spent(7 * G)
+
+    store.close()
+
+
+def test_prefiltered_store_rebuilds_filter_past_capacity(tmp_path):
+    import pytest
+
+    db_path = str(tmp_path / "spent.db")
+    filter_path = str(tmp_path / "spent.bloom")
+
+    store = SerialStore(db_path)
+    spent = PrefilteredSerialStore.open(store, filter_path, capacity=2)
+
+    spent.mark_spent(1 * G)
+    spent.mark_spent(2 * G)
+    with pytest.warns(RuntimeWarning):
+        spent.mark_spent(3 * G)
+    spent.save(filter_path)
+
+    reopened = PrefilteredSerialStore.open(store, filter_path, capacity=2)
+    assert reopened.bloom.capacity >= 6
+    assert all(reopened.is_spent(k * G) for k in (1, 2, 3))
+
+    store.close()
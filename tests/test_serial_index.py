@@ -0,0 +1,144 @@
+# tests/test_serial_index.py
+
+from crypto.curve import G, random_scalar
+from crypto.commitment import commit
+from crypto.spend_verifier import verify_and_record_spend
+from crypto.zkp.spend import derive_serial, prove_spend_ownership
+from storage.serial_index import MappedSerialIndex
+
+
+def test_index_lookup_before_and_after_merge(tmp_path):
+    path = str(tmp_path / "spent.idx")
+    index = MappedSerialIndex(path, merge_threshold=1000)
+
+    serials = [k * G for k in range(1, 21)]
+    for s in serials[:10]:
+        index.mark_spent(s)
+
+    assert all(index.is_spent(s) for s in serials[:10])
+    assert not index.is_spent(serials[10])
+
+    index.merge()
+    assert len(index) == 10
+    assert all(index.is_spent(s) for s in serials[:10])
+
+    for s in serials[10:]:
+        index.mark_spent(s)
+    index.merge()
+
+    assert len(index) == 20
+    assert all(index.is_spent(s) for s in serials)
+    assert not index.is_spent(99 * G)
+    index.close()
+
+
+def test_index_delta_log_survives_restart(tmp_path):
+    path = str(tmp_path / "spent.idx")
+
+    with MappedSerialIndex(path) as index:
+        index.mark_spent(3 * G)
+
+    with MappedSerialIndex(path) as reopened:
+        assert reopened.is_spent(3 * G)
+        assert len(reopened) == 1
+
+
+def test_reader_refresh_sees_writer_updates(tmp_path):
+    path = str(tmp_path / "spent.idx")
+
+    writer = MappedSerialIndex(path)
+    reader = MappedSerialIndex(path)
+
+    writer.mark_spent(5 * G)
+    assert not reader.is_spent(5 * G)
+
+    reader.refresh()
+    assert reader.is_spent(5 * G)
+
+    writer.merge()
+    writer.mark_spent(6 * G)
+
+    reader.refresh()
+    assert reader.is_spent(5 * G)
+    assert reader.is_spent(6 * G)
+
+    writer.close()
+    reader.close()
+
+
+def test_reader_refresh_after_merge_outgrowing_its_log_offset(tmp_path):
+    path = str(tmp_path / "spent.idx")
+
+    writer = MappedSerialIndex(path)
+    reader = MappedSerialIndex(path)
+
+    writer.mark_spent(1 * G)
+    reader.refresh()
+
+    # The new log grows past the reader's old offset before it looks
+    writer.merge()
+    for k in range(2, 6):
+        writer.mark_spent(k * G)
+
+    reader.refresh()
+    assert all(reader.is_spent(k * G) for k in range(1, 6))
+    assert len(reader) == 5
+
+    writer.close()
+    reader.close()
+
+
+def test_reader_refresh_racing_a_merge(tmp_path, monkeypatch):
+    path = str(tmp_path / "spent.idx")
+
+    writer = MappedSerialIndex(path)
+    reader = MappedSerialIndex(path)
+
+    writer.mark_spent(1 * G)
+    writer.merge()
+    writer.mark_spent(2 * G)
+
+    # The reader saw the base header just before the merge replaced it
+    monkeypatch.setattr(reader, "_base_generation", lambda: 0)
+
+    reader.refresh()
+    assert reader.is_spent(1 * G) and reader.is_spent(2 * G)
+    assert len(reader) == 2
+
+    writer.close()
+    reader.close()
+
+
+def test_log_left_by_interrupted_merge_is_ignored(tmp_path):
+    path = str(tmp_path / "spent.idx")
+
+    with MappedSerialIndex(path) as index:
+        index.mark_spent(1 * G)
+        with open(index.log_path, "rb") as f:
+            stale_log = f.read()
+        index.merge()
+
+    # Crash after the base was replaced but before the log was reset
+    with open(path + ".log", "wb") as f:
+        f.write(stale_log)
+
+    with MappedSerialIndex(path) as index:
+        assert len(index) == 1
+        index.mark_spent(2 * G)
+
+    with MappedSerialIndex(path) as index:
+        assert index.is_spent(1 * G) and index.is_spent(2 * G)
+        assert len(index) == 2
+
+
+def test_index_as_spent_serial_db(tmp_path):
+    index = MappedSerialIndex(str(tmp_path / "spent.idx"))
+
+    v, r, s = 10, random_scalar(), random_scalar()
+    C = commit(v, r)
+    serial = derive_serial(s)
+    proof = prove_spend_ownership(v, r, s, C, serial)
+
+    assert verify_and_record_spend(C, serial, proof, index)
+    assert not verify_and_record_spend(C, serial, proof, index)
+    index.close()
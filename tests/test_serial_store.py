@@ -0,0 +1,79 @@
+# tests/test_serial_store.py
+
+from crypto.curve import G
+from crypto.hash import serialize_point_fixed
+from crypto.spend_verifier import SpentSerialDB
+from storage.serial_store import SerialStore
+
+
+def test_serial_store_membership_and_batching(tmp_path):
+    store = SerialStore(str(tmp_path / "serials.db"), batch_size=3)
+
+    serials = [k * G for k in range(1, 6)]
+    for s in serials[:4]:
+        store.add(s)
+
+    for s in serials[:4]:
+        assert s in store
+    assert serials[4] not in store
+
+    # Raw 64-byte keys work the same as points
+    assert serialize_point_fixed(serials[0]) in store
+    assert len(store) == 4
+
+    store.close()
+
+
+def test_serial_store_survives_restart(tmp_path):
+    path = str(tmp_path / "serials.db")
+
+    with SerialStore(path, batch_size=100) as store:
+        store.add(7 * G)
+        store.add(8 * G)
+
+    reopened = SerialStore(path, cache_size=0)
+    assert 7 * G in reopened
+    assert 8 * G in reopened
+    assert 9 * G not in reopened
+    assert sorted(reopened) == sorted(
+        serialize_point_fixed(P) for P in (7 * G, 8 * G)
+    )
+    reopened.close()
+
+
+def test_spent_serial_db_with_persistent_store(tmp_path):
+    store = SerialStore(str(tmp_path / "spent.db"), batch_size=1)
+    db = SpentSerialDB(store)
+
+    serial = 11 * G
+    assert not db.is_spent(serial)
+
+    db.mark_spent(serial)
+    assert db.is_spent(serial)
+    assert store.is_spent(serial)
+
+    store.close()
+
+
+def test_serial_store_rejects_malformed_key():
+    store = SerialStore()
+
+    try:
+        store.add(b"short")
+        assert False, "Malformed serial key was accepted"
+    except ValueError:
+        pass
+
+
+def test_serial_store_count_is_kept_without_scanning(tmp_path):
+    path = str(tmp_path / "serials.db")
+
+    with SerialStore(path, batch_size=2) as store:
+        for k in (1, 2, 2, 3, 1):
+            store.add(k * G)
+        assert len(store) == 3
+
+    with SerialStore(path) as reopened:
+        # Read from the count row, not COUNT(*)
+        reopened._conn.execute("UPDATE serial_counts SET count = 42")
+        assert len(reopened) == 42
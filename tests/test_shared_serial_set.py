@@ -0,0 +1,111 @@
+# tests/test_shared_serial_set.py
+
+import multiprocessing
+
+from crypto.curve import G
+from crypto.hash import serialize_point_fixed
+from storage.shared_serial_set import SharedSerialSet
+
+
+def _claim_all(shared, keys, results):
+    results.put(sum(shared.add_if_absent(k) for k in keys))
+
+
+def test_shared_set_test_and_insert():
+    shared = SharedSerialSet(capacity=64, stripes=4)
+    try:
+        serial = 3 * G
+
+        assert serial not in shared
+        assert shared.add_if_absent(serial)
+        assert not shared.add_if_absent(serial)
+        assert serialize_point_fixed(serial) in shared
+        assert len(shared) == 1
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_shared_set_each_serial_claimed_once_across_processes():
+    shared = SharedSerialSet(capacity=256, stripes=8)
+    keys = [serialize_point_fixed(k * G) for k in range(1, 101)]
+
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_claim_all, args=(shared, keys, results))
+        for _ in range(4)
+    ]
+
+    try:
+        for w in workers:
+            w.start()
+
+        claimed = sum(results.get(timeout=30) for _ in workers)
+
+        for w in workers:
+            w.join(timeout=30)
+
+        assert claimed == len(keys)
+        assert len(shared) == len(keys)
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_shared_set_rejects_when_full():
+    shared = SharedSerialSet(capacity=4, stripes=1)
+    try:
+        try:
+            for k in range(1, 20):
+                shared.add(k * G)
+            assert False, "Overfull set accepted more serials"
+        except ValueError:
+            pass
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_shared_set_attaches_in_spawned_process():
+    ctx = multiprocessing.get_context("spawn")
+
+    shared = SharedSerialSet(capacity=64, stripes=4, mp_context=ctx)
+    shared.add(7 * G)
+
+    results = ctx.Queue()
+    keys = [serialize_point_fixed(7 * G), serialize_point_fixed(8 * G)]
+
+    try:
+        worker = ctx.Process(target=_claim_all, args=(shared, keys, results))
+        worker.start()
+
+        # 7G was already present; only 8G is new
+        assert results.get(timeout=60) == 1
+        worker.join(timeout=60)
+
+        assert 8 * G in shared
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_shared_set_discard_keeps_probe_runs_reachable():
+    shared = SharedSerialSet(capacity=8, stripes=1)
+    try:
+        serials = [k * G for k in range(1, 7)]
+        for s in serials:
+            shared.add(s)
+
+        shared.discard(serials[0])
+        shared.discard(serials[0])
+
+        assert serials[0] not in shared
+        assert all(s in shared for s in serials[1:])
+        assert len(shared) == 5
+
+        assert shared.add_if_absent(serials[0])
+        assert not shared.add_if_absent(serials[3])
+        assert len(shared) == 6
+    finally:
+        shared.close()
+        shared.unlink()
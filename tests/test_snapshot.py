@@ -0,0 +1,105 @@
+# tests/test_snapshot.py
+
+import pytest
+
+from crypto.commitment import commit
+from crypto.curve import G, random_scalar
+from crypto.hash import serialize_point_fixed
+from crypto.state.proof_state import ProofState
+from crypto.zkp.recursive import RecursiveInvariantProof
+from models.token import Token
+from wallet.pending_store import PendingStore
+from wallet.snapshot import load_snapshot, write_snapshot
+from wallet.token_store import TokenStore
+
+
+def _token(v, expiry):
+    r = random_scalar()
+    return Token(
+        serial=random_scalar(),
+        commitment=commit(v, r),
+        expiry=expiry,
+        signature=b"sig",
+        v=v,
+        r=r,
+        s=random_scalar()
+    )
+
+
+def _wallet():
+    store = TokenStore()
+    tokens = [_token(v, 1000 + i) for i, v in enumerate([5, 10, 10, 20])]
+    for t in tokens:
+        store.add_token(t)
+    store.mark_spent(tokens[0].serial)
+
+    pending = PendingStore()
+    pending.add(7 * G, RecursiveInvariantProof(3 * G, 42))
+
+    state = ProofState(
+        C_in_total=commit(0, 0),
+        C_out_total=commit(25, 11),
+        r_in_total=0,
+        r_out_total=11
+    )
+    seen = {serialize_point_fixed(k * G) for k in (2, 3)}
+
+    return state, store, pending, seen
+
+
+@pytest.mark.parametrize("compressed", [True, False])
+def test_snapshot_round_trip(tmp_path, compressed):
+    path = str(tmp_path / "wallet.snap")
+    state, store, pending, seen = _wallet()
+
+    write_snapshot(path, state, store, pending, seen, compressed=compressed)
+    snap = load_snapshot(path)
+
+    assert snap.proof_state.C_in_total == state.C_in_total
+    assert snap.proof_state.C_out_total == state.C_out_total
+    assert snap.proof_state.r_out_total == 11
+
+    assert snap.token_store.all_tokens() == store.all_tokens()
+    assert snap.token_store.unspent_values() == store.unspent_values()
+    assert [t.serial for t in snap.token_store.get_unspent_tokens(0)] == \
+        [t.serial for t in store.get_unspent_tokens(0)]
+
+    (p,) = snap.pending_store.list_pending()
+    assert p.serial == 7 * G and p.proof.A == 3 * G and p.proof.z == 42
+
+    assert snap.seen_serials == seen
+
+
+def test_snapshot_rejects_corruption(tmp_path):
+    path = str(tmp_path / "wallet.snap")
+    write_snapshot(path, *_wallet())
+
+    with open(path, "r+b") as f:
+        f.seek(40)
+        byte = f.read(1)
+        f.seek(40)
+        f.write(bytes([byte[0] ^ 1]))
+
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_compressed_snapshot_is_smaller(tmp_path):
+    small = str(tmp_path / "c.snap")
+    large = str(tmp_path / "u.snap")
+    state, store, pending, seen = _wallet()
+
+    write_snapshot(small, state, store, pending, seen, compressed=True)
+    write_snapshot(large, state, store, pending, seen, compressed=False)
+
+    assert load_snapshot(small).token_store.count_unspent() == 3
+    assert (tmp_path / "c.snap").stat().st_size < (tmp_path / "u.snap").stat().st_size
+
+
+def test_snapshot_defaults_to_uncompressed_points(tmp_path):
+    path = tmp_path / "wallet.snap"
+    write_snapshot(str(path), *_wallet())
+
+    # flags follow the 8-byte magic and 2-byte version
+    assert path.read_bytes()[10:12] == b"\x00\x00"
+    assert load_snapshot(str(path)).pending_store.count() == 1
@@ -0,0 +1,161 @@
+# tests/test_token_store.py
+
+import pytest
+
+from crypto.curve import G
+from models.token import Token
+from models.token_state import TokenState
+from wallet.token_store import TokenStore
+
+
+def make_token(serial, v, expiry):
+    return Token(
+        serial=serial,
+        commitment=v * G,
+        expiry=expiry,
+        signature=None,
+        v=v,
+        r=0,
+        s=serial
+    )
+
+
+def test_unspent_query_skips_spent_and_expired():
+    store = TokenStore()
+    store.add_token(make_token(1, 10, expiry=100))
+    store.add_token(make_token(2, 20, expiry=300))
+    store.add_token(make_token(3, 50, expiry=200))
+
+    store.mark_spent(3)
+
+    assert [t.serial for t in store.get_unspent_tokens(50)] == [1, 2]
+    assert [t.serial for t in store.get_unspent_tokens(100)] == [2]
+    assert store.count_unspent() == 2
+
+
+def test_expire_until_sweeps_in_one_pass():
+    store = TokenStore()
+    for serial, expiry in [(1, 100), (2, 150), (3, 400)]:
+        store.add_token(make_token(serial, 5, expiry=expiry))
+
+    store.mark_spent(2)
+
+    assert store.expire_until(200) == [1]
+    assert store.get_token_state(1) == TokenState.EXPIRED
+    assert store.get_token_state(2) == TokenState.SPENT
+    assert store.get_token_state(3) == TokenState.UNSPENT
+    assert store.unspent_values() == [5]
+
+
+def test_value_index_orders_by_expiry():
+    store = TokenStore()
+    store.add_token(make_token(1, 10, expiry=500))
+    store.add_token(make_token(2, 10, expiry=200))
+    store.add_token(make_token(3, 20, expiry=300))
+
+    assert store.unspent_values() == [10, 20]
+    assert [t.serial for t in store.get_spendable_by_value(10, 0)] == [2, 1]
+    assert [t.serial for t in store.get_spendable_by_value(10, 250)] == [1]
+
+    store.mark_expired(3)
+    assert store.unspent_values() == [10]
+
+
+def test_reserved_token_cannot_expire():
+    store = TokenStore()
+    store.add_token(make_token(1, 10, expiry=100))
+    store.reserve([1])
+
+    with pytest.raises(ValueError):
+        store.mark_expired(1)
+    assert store.all_tokens()[1][1] == TokenState.RESERVED
+
+    store.release([1])
+    store.mark_expired(1)
+    assert store.all_tokens()[1][1] == TokenState.EXPIRED
+
+
+def test_all_tokens_is_read_only_view():
+    store = TokenStore()
+    store.add_token(make_token(1, 10, expiry=100))
+
+    view = store.all_tokens()
+    assert view[1][1] == TokenState.UNSPENT
+
+    try:
+        view[2] = None
+        assert False, "all_tokens() view was writable"
+    except TypeError:
+        pass
+
+
+def test_reserve_is_all_or_nothing_and_release_restores():
+    store = TokenStore()
+    a, b = make_token(1, 5, 100), make_token(2, 5, 200)
+    store.add_token(a)
+    store.add_token(b)
+
+    assert store.reserve([1]) == [a]
+    assert store.get_token_state(1) == TokenState.RESERVED
+    assert store.get_spendable_by_value(5, 0) == [b]
+
+    with pytest.raises(ValueError):
+        store.reserve([2, 1])
+    assert store.get_token_state(2) == TokenState.UNSPENT
+
+    store.release([1])
+    assert store.get_spendable_by_value(5, 0) == [a, b]
+
+
+def test_concurrent_spends_of_one_token_commit_once():
+    import threading
+    import time
+
+    from crypto.commitment import commit
+    from crypto.state.proof_state import ProofState
+    from wallet.token_lifecycle import TokenLifecycle
+
+    expiry = int(time.time()) + 3600
+    state = ProofState(commit(0, 0), commit(0, 0), 0, 0)
+    wallet = TokenLifecycle(TokenStore(), state)
+
+    class _BankToken:
+        def __init__(self, C, serial):
+            self.serial = serial
+            self.commitment = C
+            self.expiry = expiry
+            self.signature = b"sig"
+
+        def verify_bank_signature(self, _):
+            return True
+
+    serials = [
+        wallet.mint(10, expiry, None, lambda C, _, s=s: _BankToken(C, s)).serial
+        for s in (11, 12, 13)
+    ]
+
+    results = []
+
+    def spend(serial):
+        try:
+            wallet.spend([serial], 6, 4, expiry)
+            results.append(serial)
+        except ValueError:
+            results.append(None)
+
+    threads = [
+        threading.Thread(target=spend, args=(s,))
+        for s in serials + [serials[0]] * 3
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Each distinct token is spent exactly once
+    assert sorted(r for r in results if r is not None) == serials
+    assert results.count(None) == 3
+
+    for s in serials:
+        assert wallet.store.get_token_state(s) == TokenState.SPENT
+    assert wallet.store.count_unspent() == 6
@@ -0,0 +1,94 @@
+# tests/test_transaction_archive.py
+
+import dataclasses
+import io
+
+import pytest
+
+from transport.transaction_archive import (
+    TransactionArchive,
+    TransactionArchiveWriter,
+    iter_archive_views,
+    write_transaction_archive,
+)
+from transport.transaction_serializer import serialize_offline_transaction
+
+
+def _txs(sample_tx, n):
+    return [
+        dataclasses.replace(sample_tx, nonce=i.to_bytes(4, "big"))
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("index", [True, False])
+def test_archive_stream_and_random_access(sample_tx, tmp_path, index):
+    txs = _txs(sample_tx, 25)
+    path = str(tmp_path / "batch.txa")
+
+    # Small blocks: several transactions per block, many blocks
+    size = len(serialize_offline_transaction(sample_tx))
+    assert write_transaction_archive(path, txs, block_size=4 * size, index=index) == 25
+
+    with open(path, "rb") as f:
+        views = list(iter_archive_views(f))
+    assert [v.nonce for v in views] == [t.nonce for t in txs]
+    assert views[3].input_serials == sample_tx.input_serials
+
+    with TransactionArchive(path) as archive:
+        assert len(archive) == 25
+        assert archive.block_count == 7
+        assert archive[17].nonce == txs[17].nonce
+        assert archive[-1].nonce == txs[-1].nonce
+        assert archive[0].nonce == txs[0].nonce
+        assert bytes(archive.record(5)) == serialize_offline_transaction(txs[5])
+        assert archive[9].to_transaction().device_certificate == sample_tx.device_certificate
+        assert [v.nonce for v in archive] == [t.nonce for t in txs]
+
+        with pytest.raises(IndexError):
+            archive[25]
+
+
+def test_writer_copies_encoded_records_and_oversized_blocks(sample_tx):
+    one = serialize_offline_transaction(sample_tx)
+
+    f = io.BytesIO()
+    with TransactionArchiveWriter(f, block_size=16) as writer:
+        writer.append(sample_tx)
+        assert writer.append_encoded(one) == 1
+
+        with pytest.raises(ValueError):
+            writer.append_encoded(one + b"\x00")
+
+    f.seek(0)
+    assert [bytes(v.raw) for v in iter_archive_views(f)] == [one, one]
+
+
+def test_corrupt_or_truncated_archive_is_rejected(sample_tx, tmp_path):
+    path = tmp_path / "batch.txa"
+    write_transaction_archive(str(path), _txs(sample_tx, 4))
+    data = path.read_bytes()
+
+    # Flipped byte inside the block payload
+    bad = bytearray(data)
+    bad[200] ^= 1
+    with pytest.raises(ValueError):
+        list(iter_archive_views(io.BytesIO(bytes(bad))))
+
+    # Cut short: streaming fails at the cut, random access won't open
+    with pytest.raises(ValueError):
+        list(iter_archive_views(io.BytesIO(data[:-30])))
+
+    path.write_bytes(data[:-30])
+    with pytest.raises(ValueError):
+        TransactionArchive(str(path))
+
+    # A writer that failed never finishes the archive
+    f = io.BytesIO()
+    with pytest.raises(RuntimeError):
+        with TransactionArchiveWriter(f) as writer:
+            writer.append(sample_tx)
+            raise RuntimeError("upload aborted")
+
+    with pytest.raises(ValueError):
+        list(iter_archive_views(io.BytesIO(f.getvalue())))
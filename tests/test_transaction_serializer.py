@@ -140,3 +140,99 @@ def test_transaction_roundtrip():
     assert tx2.recursive_proof.z == tx.recursive_proof.z
 
     print("Transaction serialization roundtrip OK")
+
+
+def test_concatenated_transactions_decode_in_place(sample_tx):
+    import pytest
+    from transport.transaction_serializer import (
+        deserialize_offline_transaction_at,
+        iter_offline_transactions,
+    )
+
+    one = serialize_offline_transaction(sample_tx)
+    blob = bytearray(one * 3)
+
+    txs = list(iter_offline_transactions(blob))
+    assert len(txs) == 3
+    assert all(t.nonce == sample_tx.nonce for t in txs)
+    assert txs[2].input_serials[0] == sample_tx.input_serials[0]
+
+    tx, end = deserialize_offline_transaction_at(blob, len(one))
+    assert end == 2 * len(one)
+    assert tx.device_certificate == deserialize_offline_transaction(one).device_certificate
+
+    with pytest.raises(ValueError):
+        list(iter_offline_transactions(blob[:-1]))
+
+
+def test_serialize_into_buffer_and_file(sample_tx):
+    import io
+    import pytest
+    from transport.transaction_serializer import (
+        serialized_size,
+        serialize_offline_transaction_into,
+        write_offline_transactions,
+        iter_offline_transactions,
+    )
+
+    one = serialize_offline_transaction(sample_tx)
+    assert serialized_size(sample_tx) == len(one)
+
+    buf = bytearray(len(one) + 10)
+    end = serialize_offline_transaction_into(sample_tx, buf, 5)
+    assert end == 5 + len(one)
+    assert bytes(buf[5:end]) == one
+
+    with pytest.raises(ValueError):
+        serialize_offline_transaction_into(sample_tx, bytearray(len(one) - 1))
+
+    f = io.BytesIO()
+    assert write_offline_transactions([sample_tx] * 3, f) == 3 * len(one)
+    assert f.getvalue() == one * 3
+    assert len(list(iter_offline_transactions(f.getvalue()))) == 3
+
+
+def test_wire_v2_roundtrip_and_mixed_versions(sample_tx):
+    import pytest
+    from transport.transaction_serializer import (
+        WIRE_V2,
+        serialized_size,
+        wire_version,
+        iter_offline_transactions,
+    )
+
+    v1 = serialize_offline_transaction(sample_tx)
+    v2 = serialize_offline_transaction(sample_tx, WIRE_V2)
+
+    assert v2[:2] == b"\xcb\x02"
+    assert len(v2) == serialized_size(sample_tx, WIRE_V2)
+    assert len(v2) < len(v1) * 3 // 4
+    assert wire_version(v1) == 1 and wire_version(v2) == 2
+
+    tx2 = deserialize_offline_transaction(v2)
+    assert serialize_offline_transaction(tx2) == v1
+    assert tx2.device_certificate == deserialize_offline_transaction(v1).device_certificate
+    assert tx2.spend_proof.A_serial == sample_tx.spend_proof.A_serial
+
+    txs = list(iter_offline_transactions(v2 + v1 + v2))
+    assert [t.nonce for t in txs] == [sample_tx.nonce] * 3
+
+    with pytest.raises(ValueError):
+        deserialize_offline_transaction(v2[:-1])
+    with pytest.raises(ValueError):
+        deserialize_offline_transaction(b"\xcb\x03" + v2[2:])
+    with pytest.raises(ValueError):
+        # Input count 1 as a non-minimal varint
+        deserialize_offline_transaction(v2[:2] + b"\x81\x00" + v2[3:])
+
+
+def test_v1_rejects_points_off_the_curve(sample_tx):
+    import pytest
+
+    v1 = bytearray(serialize_offline_transaction(sample_tx))
+
+    # y coordinate of the first input serial, after the u32 input count
+    v1[4 + 63] ^= 1
+
+    with pytest.raises(ValueError):
+        deserialize_offline_transaction(bytes(v1))
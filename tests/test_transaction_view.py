@@ -0,0 +1,96 @@
+# tests/test_transaction_view.py
+
+import pytest
+
+from crypto.transaction.verify_offline_tx import verify_offline_transaction
+from transport.transaction_serializer import (
+    deserialize_offline_transaction,
+    serialize_offline_transaction,
+)
+from transport.transaction_view import (
+    OfflineTransactionView,
+    iter_transaction_views,
+)
+
+
+def test_view_matches_eager_decode(sample_tx):
+    data = serialize_offline_transaction(sample_tx)
+    view = OfflineTransactionView(data)
+    tx = deserialize_offline_transaction(data)
+
+    assert view.nonce == tx.nonce
+    assert view.cert_id == tx.device_certificate.cert_id
+    assert view.input_serials == tx.input_serials
+    assert view.output_commitments == tx.output_commitments
+    assert view.device_certificate == tx.device_certificate
+    assert view.spend_proof.A_commit == tx.spend_proof.A_commit
+    assert view.recursive_proof.z == tx.recursive_proof.z
+    assert bytes(view.raw) == data
+
+    assert serialize_offline_transaction(view.to_transaction()) == data
+
+
+def test_fields_decode_only_when_read(sample_tx):
+    data = serialize_offline_transaction(sample_tx)
+    view = OfflineTransactionView(data)
+
+    view.nonce
+    view.input_serial_keys
+    assert "input_serials" not in vars(view)
+    assert "device_certificate" not in vars(view)
+
+
+def test_invalid_point_fails_on_access_only(sample_tx):
+    data = bytearray(serialize_offline_transaction(sample_tx))
+    L = OfflineTransactionView(data).layout
+
+    # Corrupt the first output commitment's y coordinate
+    data[L.output_commitments + 63] ^= 1
+    view = OfflineTransactionView(bytes(data))
+
+    assert view.nonce == sample_tx.nonce
+    with pytest.raises(ValueError):
+        view.output_commitments
+
+
+def test_malformed_proof_point_fails_verification(sample_tx, monkeypatch):
+    import crypto.device.verify_spend_auth
+    import crypto.zkp.spend
+
+    # Get past authorization (the fixture's bank key is not exposed)
+    # and the fixture's spend proof (which does not verify) to the
+    # value proof, whose commitment point is corrupted below
+    monkeypatch.setattr(
+        crypto.device.verify_spend_auth, "verify_spend_authorization",
+        lambda *a, **kw: True
+    )
+    monkeypatch.setattr(crypto.zkp.spend, "verify_spend_ownership", lambda *a: True)
+
+    data = bytearray(serialize_offline_transaction(sample_tx))
+    L = OfflineTransactionView(data).layout
+    data[L.value_proof + 63] ^= 1
+
+    view = OfflineTransactionView(bytes(data))
+    assert verify_offline_transaction(view, None, set()) is False
+
+
+def test_v2_is_rejected_with_clear_error(sample_tx):
+    from transport.transaction_serializer import WIRE_V2
+
+    data = serialize_offline_transaction(sample_tx, WIRE_V2)
+    with pytest.raises(ValueError, match="v1 transactions only"):
+        OfflineTransactionView(data)
+
+
+def test_replay_and_revocation_rejected_without_decoding(sample_tx):
+    data = serialize_offline_transaction(sample_tx)
+    (view,) = iter_transaction_views(data)
+
+    seen = set(view.input_serial_keys)
+    assert not verify_offline_transaction(view, None, seen)
+
+    revoked = {sample_tx.device_certificate.cert_id}
+    assert not verify_offline_transaction(view, None, set(), revoked)
+
+    assert "input_serials" not in vars(view)
+    assert "device_certificate" not in vars(view)
@@ -0,0 +1,298 @@
+# tests/test_wallet_db.py
+
+import time
+
+from crypto.commitment import commit
+from crypto.curve import G, ORDER, random_scalar
+from crypto.state.proof_state import ProofState
+from crypto.zkp.recursive import RecursiveInvariantProof
+from models.token_state import TokenState
+from wallet.pending_store import PendingStore
+from wallet.receiver_state import ReceiverWalletState
+from wallet.token_lifecycle import TokenLifecycle
+from wallet.token_store import TokenStore
+from wallet.wallet_db import SCHEMA_VERSION, WalletDB, SPEND_PROOF_STATE
+
+
+def _bank_mint_fn(C, proof):
+    class BankToken:
+        serial = random_scalar()
+        commitment = C
+        expiry = int(time.time()) + 3600
+        signature = b"test_signature"
+
+        def verify_bank_signature(self, _):
+            return True
+
+    return BankToken()
+
+
+def _empty_state():
+    return ProofState(
+        C_in_total=commit(0, 0),
+        C_out_total=commit(0, 0),
+        r_in_total=0,
+        r_out_total=0
+    )
+
+
+def test_spend_is_persisted_and_reloaded(tmp_path):
+    path = str(tmp_path / "wallet.db")
+    expiry = int(time.time()) + 3600
+
+    db = WalletDB(path)
+    live_state = _empty_state()
+    wallet = TokenLifecycle(TokenStore(db=db), live_state)
+
+    minted = wallet.mint(10, expiry, None, _bank_mint_fn)
+    derived, _, _, _, _ = wallet.spend(
+        input_serials=[minted.serial],
+        v_out=6,
+        v_change=4,
+        expiry=expiry
+    )
+    db.close()
+
+    # Restart: open from the database instead of replaying history
+    db = WalletDB(path)
+    store = TokenStore(db=db)
+
+    assert store.get_token_state(minted.serial) == TokenState.SPENT
+    for t in derived:
+        assert store.get_token_state(t.serial) == TokenState.UNSPENT
+    assert sorted(t.v for t in store.get_unspent_tokens(0)) == [4, 6]
+
+    state = db.load_proof_state(SPEND_PROOF_STATE)
+    assert state.C_in_total == live_state.C_in_total
+    assert state.C_out_total == live_state.C_out_total
+    assert state.r_out_total == live_state.r_out_total % ORDER
+    db.close()
+
+
+def test_failed_spend_commit_rolls_back(tmp_path):
+    db = WalletDB(str(tmp_path / "wallet.db"))
+    store = TokenStore(db=db)
+    state = _empty_state()
+    wallet = TokenLifecycle(store, state)
+
+    expiry = int(time.time()) + 3600
+    minted = wallet.mint(10, expiry, None, _bank_mint_fn)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    db.save_proof_state = fail
+
+    try:
+        wallet.spend([minted.serial], 6, 4, expiry)
+        assert False, "Spend should have failed"
+    except RuntimeError:
+        pass
+
+    # Memory matches the rolled-back database
+    assert store.get_token_state(minted.serial) == TokenState.UNSPENT
+    assert len(store.all_tokens()) == 1
+    assert [t.serial for t in store.get_unspent_tokens(0)] == [minted.serial]
+
+    db.close()
+
+    reopened = WalletDB(str(tmp_path / "wallet.db"))
+    assert TokenStore(db=reopened).get_token_state(minted.serial) == TokenState.UNSPENT
+    assert state.C_out_total == commit(0, 0)
+    reopened.close()
+
+
+def test_failed_mint_many_commit_leaves_store_unchanged(tmp_path):
+    db = WalletDB(str(tmp_path / "wallet.db"))
+    store = TokenStore(db=db)
+    wallet = TokenLifecycle(store, _empty_state())
+
+    save_token = db.save_token
+    calls = []
+
+    def fail_second(token, state):
+        calls.append(token)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        save_token(token, state)
+
+    db.save_token = fail_second
+
+    try:
+        wallet.mint_many(
+            3, 0, None,
+            lambda reqs: [_bank_mint_fn(C, proof) for C, proof in reqs],
+            max_workers=1
+        )
+        assert False, "Mint should have failed"
+    except RuntimeError:
+        pass
+
+    assert len(calls) == 2
+    assert len(store.all_tokens()) == 0
+    assert store.count_unspent() == 0
+    assert list(db.load_tokens()) == []
+    db.close()
+
+
+def test_pending_store_persists(tmp_path):
+    path = str(tmp_path / "wallet.db")
+
+    with WalletDB(path) as db:
+        PendingStore(db=db).add(5 * G, RecursiveInvariantProof(A=7 * G, z=11))
+
+    with WalletDB(path) as db:
+        store = PendingStore(db=db)
+        assert store.count() == 1
+
+        pending = store.list_pending()[0]
+        assert pending.serial == 5 * G
+        assert pending.proof.A == 7 * G
+        assert pending.proof.z == 11
+
+        store.clear(5 * G)
+        assert store.count() == 0
+
+
+def test_receiver_state_persists(tmp_path):
+    from crypto.transaction.accept_offline_tx import accept_offline_transaction
+    from types import SimpleNamespace
+
+    path = str(tmp_path / "wallet.db")
+    C = commit(6, random_scalar())
+    tx = SimpleNamespace(input_serials=[3 * G], output_commitments=[C])
+
+    with WalletDB(path) as db:
+        receiver = ReceiverWalletState(proof_state=_empty_state(), db=db)
+        accept_offline_transaction(tx, receiver)
+
+    with WalletDB(path) as db:
+        receiver = ReceiverWalletState(db=db)
+        assert 3 * G in receiver.seen_serials
+        assert receiver.owned_tokens.commitments() == [C]
+        assert receiver.proof_state.C_out_total == C
+
+
+def test_transaction_is_not_joined_from_another_thread(tmp_path):
+    import threading
+
+    import pytest
+
+    from models.token import Token
+
+    db = WalletDB(str(tmp_path / "wallet.db"))
+    store = TokenStore(db=db)
+    token = Token(
+        serial=1, commitment=G, expiry=int(time.time()) + 3600,
+        signature=None, v=5, r=1, s=1
+    )
+
+    opened, release = threading.Event(), threading.Event()
+
+    def failing_writer():
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                opened.set()
+                release.wait(5)
+                raise RuntimeError("writer failed")
+
+    def add_token():
+        with store.changes() as changes:
+            changes.add_token(token)
+
+    b = threading.Thread(target=failing_writer)
+    b.start()
+    opened.wait(5)
+
+    # Waits for B's transaction instead of joining it
+    a = threading.Thread(target=add_token)
+    a.start()
+    a.join(0.2)
+    assert a.is_alive()
+
+    release.set()
+    b.join(5)
+    a.join(5)
+
+    assert store.get_token(1) is not None
+    assert db.connection.execute("SELECT COUNT(*) FROM tokens").fetchone()[0] == 1
+    db.close()
+
+
+def test_threaded_token_writes_mixed_with_other_writers(tmp_path):
+    import threading
+
+    import pytest
+
+    from models.token import Token
+
+    path = str(tmp_path / "wallet.db")
+    db = WalletDB(path)
+    store = TokenStore(db=db)
+    pending = PendingStore(db=db)
+    expiry = int(time.time()) + 3600
+
+    def add_tokens(first):
+        for serial in range(first, first + 10):
+            with store.changes() as changes:
+                changes.add_token(Token(
+                    serial=serial, commitment=serial * G, expiry=expiry,
+                    signature=None, v=1, r=serial, s=serial
+                ))
+
+    def pending_writes(first):
+        for k in range(first, first + 10):
+            proof = RecursiveInvariantProof(k * G, k)
+            if k % 2:
+                pending.add(k * G, proof)
+                continue
+            # Rolled back; must not take token rows with it
+            with pytest.raises(RuntimeError):
+                with db.transaction():
+                    pending.add(k * G, proof)
+                    raise RuntimeError("aborted")
+
+    threads = [threading.Thread(target=add_tokens, args=(i * 10 + 1,)) for i in range(4)]
+    threads += [threading.Thread(target=pending_writes, args=(i * 10 + 1,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+    assert store.count_unspent() == 40
+    assert pending.count() == 20
+    db.close()
+
+    db = WalletDB(path)
+    assert TokenStore(db=db).all_tokens() == store.all_tokens()
+    db.close()
+
+
+def test_token_changes_refuse_an_open_transaction(tmp_path):
+    import pytest
+
+    db = WalletDB(str(tmp_path / "wallet.db"))
+    store = TokenStore(db=db)
+
+    with db.transaction():
+        with pytest.raises(ValueError):
+            with store.changes():
+                pass
+    db.close()
+
+
+def test_unknown_schema_version_is_rejected(tmp_path):
+    import sqlite3
+
+    import pytest
+
+    path = str(tmp_path / "wallet.db")
+    WalletDB(path).close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    conn.close()
+
+    with pytest.raises(ValueError):
+        WalletDB(path)
@@ -0,0 +1,62 @@
+# transport/base45.py
+#
+# Base45 (RFC 9285): binary data as text in the QR alphanumeric
+# character set, so a QR code can carry it in alphanumeric mode
+# (5.5 bits per character) instead of byte mode (8 bits).
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+
+# Marks Base45 QR payloads (also in the alphabet, so it stays in
+# alphanumeric mode); tells them apart from legacy Base64 ones
+QR_PREFIX = "B45:"
+
+_INDEX = {c: i for i, c in enumerate(ALPHABET)}
+
+
+def b45encode(data: bytes) -> str:
+    """
+    Every 2 bytes become 3 characters, a trailing byte 2 characters.
+    """
+    out = []
+
+    for i in range(0, len(data) - 1, 2):
+        n = (data[i] << 8) | data[i + 1]
+        n, c = divmod(n, 45)
+        e, d = divmod(n, 45)
+        out += (ALPHABET[c], ALPHABET[d], ALPHABET[e])
+
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        out += (ALPHABET[c], ALPHABET[d])
+
+    return "".join(out)
+
+
+def b45decode(text: str) -> bytes:
+    """
+    Raises ValueError on characters outside the alphabet, a dangling
+    character, or a group that does not fit its byte width.
+    """
+    try:
+        values = [_INDEX[c] for c in text]
+    except KeyError:
+        raise ValueError("Invalid Base45 character") from None
+
+    if len(values) % 3 == 1:
+        raise ValueError("Invalid Base45 length")
+
+    out = bytearray()
+
+    for i in range(0, len(values) - 2, 3):
+        n = values[i] + values[i + 1] * 45 + values[i + 2] * 45 * 45
+        if n > 0xFFFF:
+            raise ValueError("Invalid Base45 group")
+        out += n.to_bytes(2, "big")
+
+    if len(values) % 3 == 2:
+        n = values[-2] + values[-1] * 45
+        if n > 0xFF:
+            raise ValueError("Invalid Base45 group")
+        out.append(n)
+
+    return bytes(out)
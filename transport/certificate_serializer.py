@@ -0,0 +1,71 @@
+# transport/certificate_serializer.py
+
+import struct
+
+from crypto.curve import point_from_bytes
+from crypto.device.certificate import DeviceCertificate
+from crypto.hash import serialize_point_fixed, sha256_bytes
+
+
+# ==========================================================
+# DeviceCertificate Serialization
+# Format (the certificate section of a v1 transaction):
+# pk_device (64)
+# cert_id_len (4) | cert_id
+# issued_at (8)
+# expires_at (8)
+# signature (96)
+# ==========================================================
+
+CERTIFICATE_DIGEST_SIZE = 32
+
+_U32 = struct.Struct(">I")
+_U64x2 = struct.Struct(">QQ")
+
+_SIGNATURE_SIZE = 96
+
+
+def serialize_certificate(cert: DeviceCertificate) -> bytes:
+    if cert.signature is None or len(cert.signature) != _SIGNATURE_SIZE:
+        raise ValueError("Certificate must carry a 96-byte signature")
+
+    return (
+        serialize_point_fixed(cert.pk_device) +
+        _U32.pack(len(cert.cert_id)) +
+        cert.cert_id +
+        _U64x2.pack(cert.issued_at, cert.expires_at) +
+        cert.signature
+    )
+
+
+def deserialize_certificate(data: bytes) -> DeviceCertificate:
+    data = memoryview(data)
+
+    if len(data) < 64 + _U32.size:
+        raise ValueError("Invalid DeviceCertificate length")
+
+    (cert_id_len,) = _U32.unpack_from(data, 64)
+    times = 64 + _U32.size + cert_id_len
+
+    if len(data) != times + _U64x2.size + _SIGNATURE_SIZE:
+        raise ValueError("Invalid DeviceCertificate length")
+
+    issued_at, expires_at = _U64x2.unpack_from(data, times)
+
+    return DeviceCertificate(
+        pk_device=point_from_bytes(data[:64]),
+        cert_id=bytes(data[64 + _U32.size:times]),
+        issued_at=issued_at,
+        expires_at=expires_at,
+        signature=bytes(data[times + _U64x2.size:])
+    )
+
+
+def certificate_digest(cert) -> bytes:
+    """
+    32-byte reference to a certificate: SHA-256 of its encoding.
+    Accepts a DeviceCertificate or its encoding.
+    """
+    if isinstance(cert, (bytes, bytearray, memoryview)):
+        return sha256_bytes(bytes(cert))
+    return sha256_bytes(serialize_certificate(cert))
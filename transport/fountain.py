@@ -0,0 +1,315 @@
+# transport/fountain.py
+
+import math
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Set
+
+
+# ==========================================================
+# Fountain (LT) coding for multi-frame QR transfer
+#
+# The payload is cut into K blocks of block_size bytes, the last one
+# padded with 0xEC 0x11 as QR pads its own data (long zero runs make
+# the qrcode package fail on binary-mode frames). Frame `seed`
+# carries the XOR of a set of blocks chosen from the seed alone:
+#
+#   seed <  K   block `seed` by itself (systematic part: an unbroken
+#               scan of the first K frames needs no decoding at all)
+#   seed >= K   d blocks, d drawn from the robust soliton distribution
+#
+# The sequence is rateless: the sender can loop over as many frames as
+# it likes, and the receiver decodes from any sufficient subset, in
+# any order (typically K plus a few percent).
+#
+# Frame layout (big-endian):
+#
+#   magic        (2)   0xCB 0x46
+#   payload_len  (4)
+#   block_size   (2)
+#   checksum     (4)   crc32 of the payload, also the message id
+#   seed         (4)
+#   data         (block_size)
+#
+# Block selection uses its own xorshift generator rather than `random`,
+# so every sender and receiver derives the same blocks from a seed.
+# ==========================================================
+
+FRAME_MAGIC = b"\xcbF"
+
+DEFAULT_BLOCK_SIZE = 200
+
+# A frame header announces the payload size; refuse absurd ones
+MAX_PAYLOAD_LEN = 1 << 20
+
+_HEADER = struct.Struct(">2sIHII")
+
+HEADER_SIZE = _HEADER.size
+
+# Robust soliton parameters
+_C = 0.1
+_DELTA = 0.5
+
+
+class _Xorshift32:
+    def __init__(self, seed: int):
+        # Never zero; mix the seed so neighbouring seeds diverge
+        self.state = (seed * 0x9E3779B1 + 0x7F4A7C15) & 0xFFFFFFFF or 1
+
+    def next(self) -> int:
+        x = self.state
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        self.state = x
+        return x
+
+    def below(self, n: int) -> int:
+        return self.next() % n
+
+
+def _robust_soliton_cdf(k: int) -> List[float]:
+    """
+    Cumulative robust soliton distribution over degrees 1..k.
+    """
+    if k == 1:
+        return [1.0]
+
+    R = _C * math.log(k / _DELTA) * math.sqrt(k)
+    spike = max(1, min(k, int(k / R)))
+
+    weights = [0.0] * (k + 1)
+    weights[1] = 1.0 / k
+    for d in range(2, k + 1):
+        weights[d] = 1.0 / (d * (d - 1))
+
+    for d in range(1, spike):
+        weights[d] += R / (d * k)
+    weights[spike] += R * math.log(R / _DELTA) / k if R > _DELTA else 0.0
+
+    total = sum(weights)
+    cdf = []
+    acc = 0.0
+    for d in range(1, k + 1):
+        acc += weights[d]
+        cdf.append(acc / total)
+
+    cdf[-1] = 1.0
+    return cdf
+
+
+def block_indices(seed: int, k: int, cdf: Optional[List[float]] = None) -> List[int]:
+    """
+    Source blocks XORed into the frame with this seed.
+    """
+    if seed < k:
+        return [seed]
+
+    if cdf is None:
+        cdf = _robust_soliton_cdf(k)
+
+    rng = _Xorshift32(seed)
+
+    u = rng.next() / 0x100000000
+    degree = 1
+    while degree < k and cdf[degree - 1] < u:
+        degree += 1
+
+    # Partial Fisher-Yates over 0..k-1
+    pool = list(range(k))
+    for i in range(degree):
+        j = i + rng.below(k - i)
+        pool[i], pool[j] = pool[j], pool[i]
+
+    return sorted(pool[:degree])
+
+
+class FountainEncoder:
+    """
+    Produces frames for one payload; frame(seed) for any seed >= 0.
+    """
+
+    def __init__(self, payload: bytes, block_size: int = DEFAULT_BLOCK_SIZE):
+        if not payload:
+            raise ValueError("Empty payload")
+        if not 0 < block_size <= 0xFFFF:
+            raise ValueError("block_size out of range")
+
+        self.payload = bytes(payload)
+        self.block_size = block_size
+        self.k = -(-len(self.payload) // block_size)
+        self.checksum = zlib.crc32(self.payload)
+
+        pad = self.k * block_size - len(self.payload)
+        padded = self.payload + (b"\xec\x11" * pad)[:pad]
+        # Blocks as ints: XOR of two blocks is a single int operation
+        self._blocks = [
+            int.from_bytes(padded[i:i + block_size], "big")
+            for i in range(0, len(padded), block_size)
+        ]
+        self._cdf = _robust_soliton_cdf(self.k)
+
+    def frame(self, seed: int) -> bytes:
+        value = 0
+        for i in block_indices(seed, self.k, self._cdf):
+            value ^= self._blocks[i]
+
+        return _HEADER.pack(
+            FRAME_MAGIC,
+            len(self.payload),
+            self.block_size,
+            self.checksum,
+            seed
+        ) + value.to_bytes(self.block_size, "big")
+
+    def frames(self, count: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Frames for seeds 0, 1, 2, ...: the K source blocks first, then
+        coded ones. Endless when count is None.
+        """
+        seed = 0
+        while count is None or seed < count:
+            yield self.frame(seed)
+            seed += 1
+
+
+class FountainDecoder:
+    """
+    Reassembles a payload from frames received in any order.
+
+    Peeling decoder: a frame whose blocks are all known but one yields
+    that block, which in turn may resolve other buffered frames.
+    Duplicate frames are ignored; frames of another payload raise
+    ValueError.
+    """
+
+    def __init__(self, max_payload_len: int = MAX_PAYLOAD_LEN):
+        self.max_payload_len = max_payload_len
+
+        self.payload_len: Optional[int] = None
+        self.block_size: Optional[int] = None
+        self.checksum: Optional[int] = None
+        self.k = 0
+
+        self._known: Dict[int, int] = {}
+        # block index -> buffered frames [unresolved blocks, XOR value]
+        self._waiting: Dict[int, List[list]] = {}
+        self._seeds: Set[int] = set()
+        self._cdf = None
+
+        self.frames_received = 0
+
+    @property
+    def done(self) -> bool:
+        return self.k > 0 and len(self._known) == self.k
+
+    @property
+    def progress(self) -> float:
+        return len(self._known) / self.k if self.k else 0.0
+
+    def add_frame(self, frame: bytes) -> bool:
+        """
+        Feed one scanned frame. Returns True once the payload is complete.
+        """
+        if len(frame) < HEADER_SIZE:
+            raise ValueError("Truncated fountain frame")
+
+        magic, payload_len, block_size, checksum, seed = _HEADER.unpack_from(frame)
+        if magic != FRAME_MAGIC:
+            raise ValueError("Not a fountain frame")
+        if len(frame) != HEADER_SIZE + block_size or block_size == 0:
+            raise ValueError("Invalid fountain frame length")
+
+        if self.k == 0:
+            if not 0 < payload_len <= self.max_payload_len:
+                raise ValueError("Invalid fountain payload length")
+            self.payload_len = payload_len
+            self.block_size = block_size
+            self.checksum = checksum
+            self.k = -(-payload_len // block_size)
+            self._cdf = _robust_soliton_cdf(self.k)
+        elif (payload_len, block_size, checksum) != (
+            self.payload_len, self.block_size, self.checksum
+        ):
+            raise ValueError("Frame belongs to a different payload")
+
+        self.frames_received += 1
+
+        if self.done or seed in self._seeds:
+            return self.done
+        self._seeds.add(seed)
+
+        value = int.from_bytes(frame[HEADER_SIZE:], "big")
+        unknown = set()
+        for i in block_indices(seed, self.k, self._cdf):
+            if i in self._known:
+                value ^= self._known[i]
+            else:
+                unknown.add(i)
+
+        if unknown:
+            self._resolve(unknown, value)
+
+        return self.done
+
+    def _resolve(self, unknown: Set[int], value: int):
+        stack = [(unknown, value)]
+
+        while stack:
+            unknown, value = stack.pop()
+
+            if len(unknown) > 1:
+                # One shared entry, listed under each of its blocks
+                entry = [unknown, value]
+                for i in unknown:
+                    self._waiting.setdefault(i, []).append(entry)
+                continue
+
+            (i,) = unknown
+            if i in self._known:
+                continue
+
+            self._known[i] = value
+
+            # Every buffered frame that referenced block i loses it
+            for entry in self._waiting.pop(i, ()):
+                entry_unknown = entry[0]
+                if i not in entry_unknown:
+                    continue
+
+                entry_unknown.discard(i)
+                entry[1] ^= value
+
+                if len(entry_unknown) == 1:
+                    stack.append((set(entry_unknown), entry[1]))
+                    entry_unknown.clear()   # resolved
+
+    def result(self) -> bytes:
+        """
+        The payload, once done. Raises ValueError before that or on a
+        checksum mismatch.
+        """
+        if not self.done:
+            raise ValueError("Not enough frames to decode the payload")
+
+        data = b"".join(
+            self._known[i].to_bytes(self.block_size, "big")
+            for i in range(self.k)
+        )[:self.payload_len]
+
+        if zlib.crc32(data) != self.checksum:
+            raise ValueError("Fountain payload checksum mismatch")
+
+        return data
+
+
+def decode_frames(frames) -> bytes:
+    """
+    Reassemble a payload from an iterable of frames.
+    """
+    decoder = FountainDecoder()
+    for frame in frames:
+        if decoder.add_frame(frame):
+            return decoder.result()
+
+    raise ValueError("Not enough frames to decode the payload")
@@ -0,0 +1,663 @@
+# transport/peer_transport.py
+
+import hashlib
+import socket
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from transport.certificate_serializer import certificate_digest
+from transport.transaction_serializer import (
+    WIRE_V2,
+    WIRE_V2_CERT_REF,
+    deserialize_offline_transaction,
+    serialize_offline_transaction,
+)
+
+
+# ==========================================================
+# Framed peer-to-peer transport (BLE / NFC style byte links)
+#
+# Frame (big-endian), at most `mtu` bytes on the wire:
+#
+#   magic    (1)   0xCB
+#   type     (1)
+#   seq      (4)
+#   length   (2)   payload bytes
+#   payload
+#   crc32    (4)   over everything before it
+#
+# A frame with a bad CRC is dropped and the reader resynchronizes on
+# the next magic byte; the transfer protocol repairs the loss.
+#
+# Transfer of one payload (sender -> receiver):
+#
+#   OFFER   seq 0, payload: id (16) | total length u32 | chunk size u16
+#           | window u16 (sender's chunks in flight)
+#   ACCEPT  seq = chunks the receiver already holds from the start
+#           (non-zero when resuming an interrupted transfer)
+#   DATA    seq = chunk number, payload = chunk
+#   ACK     seq = chunks received contiguously so far, every half of
+#           the smaller of the two windows
+#   NACK    seq = first missing chunk, once per gap and once when the
+#           transfer goes idle; the sender goes back to it
+#   DONE    seq = chunk count, after the payload matched its id
+#   ERROR   payload = reason
+#
+# The id is a SHA-256 prefix of the payload: it names the transfer for
+# resuming (the receiver keeps partial transfers across connections)
+# and checks the reassembled payload end to end. Completed ids are
+# remembered too, so a sender that missed DONE and offers again gets
+# DONE back instead of delivering the payload twice.
+#
+# Transactions go through a certificate handshake first:
+#
+#   HELLO      payload: certificate digest (32)
+#   HELLO_ACK  seq = 1 if the receiver's CertificateCache holds it
+#
+# and are then sent by reference (WIRE_V2_CERT_REF) when it does,
+# otherwise as full v2.
+# ==========================================================
+
+FRAME_MAGIC = 0xCB
+
+FRAME_HELLO = 1
+FRAME_HELLO_ACK = 2
+FRAME_OFFER = 3
+FRAME_ACCEPT = 4
+FRAME_DATA = 5
+FRAME_ACK = 6
+FRAME_NACK = 7
+FRAME_DONE = 8
+FRAME_ERROR = 9
+
+DEFAULT_MTU = 244            # BLE ATT MTU 247 minus its 3-byte header
+MIN_MTU = 32
+MAX_MTU = 0xFFFF
+DEFAULT_WINDOW = 32          # unacknowledged DATA frames in flight
+DEFAULT_TIMEOUT = 2.0        # seconds without a frame before giving up / resending
+DEFAULT_RETRIES = 5
+MAX_PAYLOAD_LEN = 1 << 20
+
+TRANSFER_ID_SIZE = 16
+
+_HEADER = struct.Struct(">BBIH")
+_CRC = struct.Struct(">I")
+_OFFER = struct.Struct(f">{TRANSFER_ID_SIZE}sIHH")
+
+FRAME_OVERHEAD = _HEADER.size + _CRC.size
+
+_READ_SIZE = 65536
+_PACING_SLACK = 0.005        # seconds of rate a paced loopback may bank
+
+
+class Frame(NamedTuple):
+    type: int
+    seq: int
+    payload: bytes
+
+
+# ==========================================================
+# Links
+#
+# A link is a reliable-or-not byte stream with
+#
+#   write(data)              send bytes
+#   read(max_bytes, timeout) bytes received, b"" on timeout;
+#                            ConnectionError once the peer is gone
+#   close()
+# ==========================================================
+
+class LoopbackLink:
+    """
+    In-process link end; see LoopbackLink.pair().
+
+    rate (bytes per second) paces writes like a radio link would, so
+    throughput can be measured against a known limit.
+    """
+
+    def __init__(self, rate: Optional[float] = None):
+        self.rate = rate
+        self._peer: Optional["LoopbackLink"] = None
+        self._buf = bytearray()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._next_free = 0.0
+
+    @classmethod
+    def pair(cls, rate: Optional[float] = None):
+        a, b = cls(rate), cls(rate)
+        a._peer, b._peer = b, a
+        return a, b
+
+    def write(self, data):
+        if self._closed:
+            raise ConnectionError("Link closed")
+
+        if self.rate:
+            # Token bucket with a little slack (a radio's transmit
+            # buffer), so sleep overshoot is not lost bandwidth
+            now = time.monotonic()
+            self._next_free = (
+                max(now - _PACING_SLACK, self._next_free) + len(data) / self.rate
+            )
+            if self._next_free > now:
+                time.sleep(self._next_free - now)
+
+        peer = self._peer
+        with peer._cond:
+            if peer._closed:
+                raise ConnectionError("Link closed")
+            peer._buf += data
+            peer._cond.notify()
+
+    def read(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        with self._cond:
+            if not self._buf and not self._closed and not self._peer._closed:
+                self._cond.wait(timeout)
+
+            if not self._buf:
+                if self._closed or self._peer._closed:
+                    raise ConnectionError("Link closed")
+                return b""
+
+            data = bytes(self._buf[:max_bytes])
+            del self._buf[:max_bytes]
+            return data
+
+    def close(self):
+        for end in (self, self._peer):
+            with end._cond:
+                end._closed = True
+                end._cond.notify_all()
+
+
+class UnixSocketLink:
+    """
+    Link over a connected stream socket (a stand-in for the real radio
+    link in tests and benchmarks); see unix_socket_pair().
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+
+    def write(self, data):
+        try:
+            self.sock.sendall(data)
+        except OSError as e:
+            raise ConnectionError("Link closed") from e
+
+    def read(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        self.sock.settimeout(timeout)
+        try:
+            data = self.sock.recv(max_bytes)
+        except socket.timeout:
+            return b""
+        except OSError as e:
+            raise ConnectionError("Link closed") from e
+
+        if not data:
+            raise ConnectionError("Link closed")
+        return data
+
+    def close(self):
+        self.sock.close()
+
+
+def unix_socket_pair():
+    a, b = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    return UnixSocketLink(a), UnixSocketLink(b)
+
+
+# ==========================================================
+# Framing
+# ==========================================================
+
+class FramedChannel:
+    """
+    Frames over a link. Frames are at most `mtu` bytes; received ones
+    that fail their CRC (or claim more than the MTU) are skipped and
+    counted in `dropped`.
+    """
+
+    def __init__(self, link, mtu: int = DEFAULT_MTU):
+        if not MIN_MTU <= mtu <= MAX_MTU:
+            raise ValueError(f"mtu must be between {MIN_MTU} and {MAX_MTU}")
+
+        self.link = link
+        self.mtu = mtu
+        self._buf = bytearray()
+        self.dropped = 0
+
+    @property
+    def max_payload(self) -> int:
+        return self.mtu - FRAME_OVERHEAD
+
+    def send(self, type: int, seq: int = 0, payload: bytes = b""):
+        if len(payload) > self.max_payload:
+            raise ValueError("Frame payload exceeds the MTU")
+
+        header = _HEADER.pack(FRAME_MAGIC, type, seq, len(payload))
+        crc = zlib.crc32(payload, zlib.crc32(header))
+        self.link.write(header + payload + _CRC.pack(crc))
+
+    def _parse(self) -> Optional[Frame]:
+        buf = self._buf
+
+        while True:
+            start = buf.find(FRAME_MAGIC)
+            if start < 0:
+                self.dropped += bool(buf)
+                buf.clear()
+                return None
+            if start:
+                self.dropped += 1
+                del buf[:start]
+
+            if len(buf) < _HEADER.size:
+                return None
+
+            _, type, seq, length = _HEADER.unpack_from(buf)
+            end = _HEADER.size + length
+            if end + _CRC.size > self.mtu:
+                # Not a real frame start: resync past this byte
+                self.dropped += 1
+                del buf[:1]
+                continue
+
+            if len(buf) < end + _CRC.size:
+                return None
+
+            (crc,) = _CRC.unpack_from(buf, end)
+            if zlib.crc32(memoryview(buf)[:end]) != crc:
+                self.dropped += 1
+                del buf[:1]
+                continue
+
+            payload = bytes(buf[_HEADER.size:end])
+            del buf[:end + _CRC.size]
+            return Frame(type, seq, payload)
+
+    def recv(self, timeout: Optional[float] = DEFAULT_TIMEOUT) -> Optional[Frame]:
+        """
+        Next intact frame, or None if none arrives within `timeout`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            frame = self._parse()
+            if frame is not None:
+                return frame
+
+            if deadline is None:
+                remaining = None
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+
+            self._buf += self.link.read(_READ_SIZE, remaining)
+
+    def expect(self, type: int, timeout: Optional[float] = DEFAULT_TIMEOUT) -> Frame:
+        """
+        Wait for a frame of the given type; an ERROR frame from the
+        peer raises ValueError, other frames are skipped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            frame = self.recv(remaining)
+            if frame is None:
+                raise TimeoutError("No response from peer")
+            if frame.type == type:
+                return frame
+            if frame.type == FRAME_ERROR:
+                raise ValueError(f"Peer error: {frame.payload.decode(errors='replace')}")
+
+
+# ==========================================================
+# Payload transfer
+# ==========================================================
+
+def transfer_id(payload: bytes) -> bytes:
+    return hashlib.sha256(payload).digest()[:TRANSFER_ID_SIZE]
+
+
+def _request(
+    channel: FramedChannel,
+    type: int,
+    payload: bytes,
+    reply_type: int,
+    timeout: float,
+    retries: int
+) -> Frame:
+    """
+    Send a control frame and wait for its reply, sending it again on
+    each timeout: either frame may be the one the link drops.
+    """
+    for attempt in range(retries + 1):
+        channel.send(type, 0, payload)
+        try:
+            return channel.expect(reply_type, timeout)
+        except TimeoutError:
+            if attempt == retries:
+                raise
+
+
+def send_payload(
+    channel: FramedChannel,
+    payload: bytes,
+    window: int = DEFAULT_WINDOW,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES
+) -> int:
+    """
+    Send one payload in MTU-sized chunks with up to `window` chunks in
+    flight. If the receiver already holds the start of it (a transfer
+    cut off earlier, same payload), only the rest is sent.
+
+    Returns the number of DATA frames sent. Raises TimeoutError after
+    `retries` silent timeouts in a row and ValueError if the receiver
+    refuses the payload.
+    """
+    if not 0 < window <= 0xFFFF:
+        raise ValueError("window must be between 1 and 65535")
+    if len(payload) > MAX_PAYLOAD_LEN:
+        raise ValueError("Payload too large")
+
+    chunk_size = channel.max_payload
+    n = max(1, -(-len(payload) // chunk_size))
+    tid = transfer_id(payload)
+    offer = _OFFER.pack(tid, len(payload), chunk_size, window)
+
+    acked = _request(channel, FRAME_OFFER, offer, FRAME_ACCEPT, timeout, retries).seq
+    if acked > n:
+        raise ValueError("Invalid ACCEPT from peer")
+
+    next_seq = acked
+    sent = 0
+    silent = 0
+
+    while True:
+        while next_seq < n and next_seq - acked < window:
+            start = next_seq * chunk_size
+            channel.send(FRAME_DATA, next_seq, payload[start:start + chunk_size])
+            next_seq += 1
+            sent += 1
+
+        frame = channel.recv(timeout)
+
+        if frame is None:
+            silent += 1
+            if silent > retries:
+                raise TimeoutError("Peer stopped acknowledging")
+            # Go back to the first unacknowledged chunk
+            next_seq = acked
+            if acked == n:
+                # Everything arrived but DONE was lost: ask again
+                channel.send(FRAME_OFFER, 0, offer)
+            continue
+
+        silent = 0
+
+        if frame.type in (FRAME_ACK, FRAME_NACK):
+            if frame.seq > n:
+                raise ValueError("Invalid ACK from peer")
+            acked = max(acked, frame.seq)
+            if frame.type == FRAME_NACK and frame.seq < next_seq:
+                # Resend from the missing chunk
+                next_seq = frame.seq
+        elif frame.type == FRAME_DONE and frame.seq == n:
+            return sent
+        elif frame.type == FRAME_ERROR:
+            raise ValueError(f"Peer error: {frame.payload.decode(errors='replace')}")
+
+
+class _Transfer:
+    def __init__(self, tid: bytes, total: int, chunk_size: int):
+        self.id = tid
+        self.total = total
+        self.chunk_size = chunk_size
+        self.n = max(1, -(-total // chunk_size))
+        self.chunks: List[Optional[bytes]] = [None] * self.n
+        self.contiguous = 0
+        self.last_ack = 0
+        self.ack_every = 1
+        self.gap_reported = -1
+        self.idle_reported = -1
+
+    def add(self, seq: int, data: bytes) -> bool:
+        """
+        Store a chunk; returns True if it was out of order (a gap).
+        """
+        expected = self.chunk_size if seq < self.n - 1 else self.total - seq * self.chunk_size
+        if len(data) != expected:
+            raise ValueError("Invalid chunk length")
+
+        if self.chunks[seq] is None:
+            self.chunks[seq] = data
+            while self.contiguous < self.n and self.chunks[self.contiguous] is not None:
+                self.contiguous += 1
+
+        return seq > self.contiguous
+
+
+class PayloadReceiver:
+    """
+    Receiving side of send_payload().
+
+    Partial transfers survive the connection they arrived on: keep the
+    receiver and call receive() on the next channel, and a sender that
+    offers the same payload again resumes where it stopped. At most
+    `max_partials` partial transfers are kept (oldest dropped).
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        max_payload_len: int = MAX_PAYLOAD_LEN,
+        max_partials: int = 8
+    ):
+        self.window = window
+        self.max_payload_len = max_payload_len
+        self.max_partials = max_partials
+
+        self._partials: "OrderedDict[bytes, _Transfer]" = OrderedDict()
+        self._completed: "OrderedDict[bytes, int]" = OrderedDict()
+
+    def _offer(self, channel: FramedChannel, frame: Frame) -> Optional[_Transfer]:
+        try:
+            tid, total, chunk_size, window = _OFFER.unpack(frame.payload)
+        except struct.error:
+            channel.send(FRAME_ERROR, 0, b"Malformed offer")
+            return None
+
+        if tid in self._completed:
+            channel.send(FRAME_ACCEPT, self._completed[tid])
+            channel.send(FRAME_DONE, self._completed[tid])
+            return None
+
+        if total > self.max_payload_len or window < 1 or \
+                not 0 < chunk_size <= channel.max_payload:
+            channel.send(FRAME_ERROR, 0, b"Offer refused")
+            return None
+
+        t = self._partials.pop(tid, None)
+        if t is None or t.total != total or t.chunk_size != chunk_size:
+            t = _Transfer(tid, total, chunk_size)
+
+        self._partials[tid] = t
+        while len(self._partials) > self.max_partials:
+            self._partials.popitem(last=False)
+
+        # A sender with a smaller window than ours would stall waiting
+        # for an ACK we only send every half of ours
+        t.ack_every = max(1, min(self.window, window) // 2)
+        t.last_ack = t.contiguous
+        t.gap_reported = -1
+        t.idle_reported = -1
+        channel.send(FRAME_ACCEPT, t.contiguous)
+        return t
+
+    def _finish(self, channel: FramedChannel, t: _Transfer) -> Optional[bytes]:
+        del self._partials[t.id]
+        payload = b"".join(t.chunks)
+
+        if transfer_id(payload) != t.id:
+            channel.send(FRAME_ERROR, 0, b"Payload does not match its id")
+            return None
+
+        self._completed[t.id] = t.n
+        while len(self._completed) > 4 * self.max_partials:
+            self._completed.popitem(last=False)
+
+        channel.send(FRAME_DONE, t.n)
+        return payload
+
+    def receive(
+        self,
+        channel: FramedChannel,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        replies: Optional[Dict[int, Tuple[int, int]]] = None
+    ) -> Optional[bytes]:
+        """
+        Serve offers on the channel until one payload is complete and
+        return it. Returns None when the sender offered a payload that
+        was already delivered (it missed the DONE). Raises TimeoutError
+        once the sender has been quiet for `retries` + 1 timeouts, as
+        long as send_payload() keeps retrying.
+
+        A transfer that goes quiet for a quarter of `timeout` gets a
+        NACK for its first missing chunk: when the last chunks of a
+        window are lost no later chunk reveals the gap, and the sender
+        would otherwise wait out its timeout and resend the window.
+
+        replies maps a control frame type the sender may repeat (its
+        answer was lost) to the (type, seq) to answer it with again.
+        """
+        t = None
+        deadline = time.monotonic() + timeout * (retries + 1)
+
+        while True:
+            frame = channel.recv(timeout if t is None else timeout / 4)
+            if frame is None:
+                if t is not None and t.idle_reported != t.contiguous:
+                    t.idle_reported = t.contiguous
+                    t.last_ack = t.contiguous
+                    channel.send(FRAME_NACK, t.contiguous)
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("Transfer stalled")
+                continue
+
+            deadline = time.monotonic() + timeout * (retries + 1)
+
+            if replies and frame.type in replies:
+                channel.send(*replies[frame.type])
+                continue
+
+            if frame.type == FRAME_OFFER:
+                if frame.payload[:TRANSFER_ID_SIZE] in self._completed:
+                    self._offer(channel, frame)
+                    return None
+                t = self._offer(channel, frame)
+                continue
+
+            if frame.type != FRAME_DATA or t is None or frame.seq >= t.n:
+                continue
+
+            try:
+                gap = t.add(frame.seq, frame.payload)
+            except ValueError:
+                # Intact frame, wrong size: the sender disagrees about
+                # the transfer; drop it and let it start over
+                del self._partials[t.id]
+                channel.send(FRAME_ERROR, 0, b"Invalid chunk")
+                t = None
+                continue
+
+            if t.contiguous == t.n:
+                payload = self._finish(channel, t)
+                t = None
+                if payload is not None:
+                    return payload
+                continue
+
+            if gap and t.gap_reported != t.contiguous:
+                t.gap_reported = t.contiguous
+                t.last_ack = t.contiguous
+                channel.send(FRAME_NACK, t.contiguous)
+            elif t.contiguous - t.last_ack >= t.ack_every:
+                t.last_ack = t.contiguous
+                channel.send(FRAME_ACK, t.contiguous)
+
+
+# ==========================================================
+# Transactions
+# ==========================================================
+
+def send_transaction(
+    channel: FramedChannel,
+    tx,
+    window: int = DEFAULT_WINDOW,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES
+) -> bool:
+    """
+    Certificate handshake, then the transaction: by reference if the
+    receiver caches the payer's certificate, full v2 otherwise.
+    Returns True if it went by reference.
+    """
+    hello_ack = _request(
+        channel,
+        FRAME_HELLO,
+        certificate_digest(tx.device_certificate),
+        FRAME_HELLO_ACK,
+        timeout,
+        retries
+    )
+    by_reference = hello_ack.seq == 1
+
+    payload = serialize_offline_transaction(
+        tx,
+        WIRE_V2_CERT_REF if by_reference else WIRE_V2
+    )
+    send_payload(channel, payload, window, timeout, retries)
+    return by_reference
+
+
+def receive_transaction(
+    channel: FramedChannel,
+    receiver: Optional[PayloadReceiver] = None,
+    cert_cache=None,
+    window: int = DEFAULT_WINDOW,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES
+):
+    """
+    Answer the handshake from `cert_cache` (a CertificateCache or any
+    digest container) and decode the transaction that follows.
+    Pass the same `receiver` across connections to resume transfers;
+    returns None if the transaction was already received through it.
+    """
+    receiver = receiver or PayloadReceiver(window)
+
+    hello = channel.expect(FRAME_HELLO, timeout * (retries + 1))
+    known = cert_cache is not None and hello.payload in cert_cache
+    hello_ack = (FRAME_HELLO_ACK, 1 if known else 0)
+    channel.send(*hello_ack)
+
+    # A repeated HELLO means our HELLO_ACK was lost
+    payload = receiver.receive(
+        channel,
+        timeout,
+        retries,
+        replies={FRAME_HELLO: hello_ack}
+    )
+    if payload is None:
+        return None
+    return deserialize_offline_transaction(payload, certificates=cert_cache)
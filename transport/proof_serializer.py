@@ -1,30 +1,67 @@
 # transport/proof_serializer.py
 
-from crypto.hash import serialize_point
+from crypto.curve import decompress_point, point_from_bytes
+from crypto.lazy_point import point_encoding
 from crypto.zkp.spend import SpendProof
 from crypto.zkp.value import ValueProof
 from crypto.zkp.recursive import RecursiveInvariantProof
 
 from ecdsa.ellipticcurve import Point
-from ecdsa.curves import SECP256k1
+
+
+SPEND_PROOF_SIZE = 224
+VALUE_PROOF_SIZE = 128
+RECURSIVE_PROOF_SIZE = 96
+
+# Same layouts with 33-byte compressed points (wire format v2)
+COMPRESSED_SPEND_PROOF_SIZE = 162
+COMPRESSED_VALUE_PROOF_SIZE = 97
+COMPRESSED_RECURSIVE_PROOF_SIZE = 65
 
 
 # ==========================================================
 # Helpers
 # ==========================================================
 
+def _put_scalar(buf, offset: int, x: int) -> int:
+    buf[offset:offset + 32] = x.to_bytes(32, "big")
+    return offset + 32
+
+
+def _put_point(buf, offset: int, proof, name: str, compressed: bool) -> int:
+    data = point_encoding(proof, name, compressed)
+    buf[offset:offset + len(data)] = data
+    return offset + len(data)
+
+
 def _point_from_bytes(data: bytes) -> Point:
     """
     Deserialize EC point from 64-byte (x || y) format.
     """
-    if len(data) != 64:
-        raise ValueError("Invalid EC point encoding")
+    return point_from_bytes(data)
 
-    x = int.from_bytes(data[:32], "big")
-    y = int.from_bytes(data[32:], "big")
 
-    curve = SECP256k1.curve
-    return Point(curve, x, y)
+def _point_field(data: bytes, lazy: bool):
+    """
+    lazy=True keeps the encoding and defers decoding (and the on-curve
+    check) to first access. Only use it for already-trusted data.
+    """
+    if lazy:
+        return bytes(data)
+    if len(data) == 33:
+        return decompress_point(data)
+    return _point_from_bytes(data)
+
+
+def _point_size(length: int, size: int, compressed_size: int, name: str) -> int:
+    """
+    Point width implied by an encoded proof's length.
+    """
+    if length == size:
+        return 64
+    if length == compressed_size:
+        return 33
+    raise ValueError(f"Invalid {name} length")
 
 
 # ==========================================================
@@ -35,29 +72,49 @@ def _point_from_bytes(data: bytes) -> Point:
 # z_v (32)
 # z_r (32)
 # z_s (32)
-# Total: 224 bytes
+# Total: 224 bytes (162 with compressed points)
 # ==========================================================
 
-def serialize_spend_proof(proof: SpendProof) -> bytes:
-    return (
-        serialize_point(proof.A_commit) +
-        serialize_point(proof.A_serial) +
-        proof.z_v.to_bytes(32, "big") +
-        proof.z_r.to_bytes(32, "big") +
-        proof.z_s.to_bytes(32, "big")
+def pack_spend_proof_into(
+    proof: SpendProof,
+    buf,
+    offset: int = 0,
+    compressed: bool = False
+) -> int:
+    """
+    Write the proof into a writable buffer at offset.
+    Returns the offset just past it.
+    """
+    offset = _put_point(buf, offset, proof, "A_commit", compressed)
+    offset = _put_point(buf, offset, proof, "A_serial", compressed)
+    offset = _put_scalar(buf, offset, proof.z_v)
+    offset = _put_scalar(buf, offset, proof.z_r)
+    return _put_scalar(buf, offset, proof.z_s)
+
+
+def serialize_spend_proof(proof: SpendProof, compressed: bool = False) -> bytes:
+    buf = bytearray(
+        COMPRESSED_SPEND_PROOF_SIZE if compressed else SPEND_PROOF_SIZE
     )
+    pack_spend_proof_into(proof, buf, 0, compressed)
+    return bytes(buf)
 
 
-def deserialize_spend_proof(data: bytes) -> SpendProof:
-    if len(data) != 224:
-        raise ValueError("Invalid SpendProof length")
+def deserialize_spend_proof(data: bytes, lazy: bool = False) -> SpendProof:
+    """
+    Accepts either point width; the length tells them apart.
+    """
+    p = _point_size(
+        len(data), SPEND_PROOF_SIZE, COMPRESSED_SPEND_PROOF_SIZE, "SpendProof"
+    )
 
-    A_commit = _point_from_bytes(data[0:64])
-    A_serial = _point_from_bytes(data[64:128])
+    A_commit = _point_field(data[0:p], lazy)
+    A_serial = _point_field(data[p:2 * p], lazy)
 
-    z_v = int.from_bytes(data[128:160], "big")
-    z_r = int.from_bytes(data[160:192], "big")
-    z_s = int.from_bytes(data[192:224], "big")
+    o = 2 * p
+    z_v = int.from_bytes(data[o:o + 32], "big")
+    z_r = int.from_bytes(data[o + 32:o + 64], "big")
+    z_s = int.from_bytes(data[o + 64:o + 96], "big")
 
     return SpendProof(A_commit, A_serial, z_v, z_r, z_s)
 
@@ -68,24 +125,36 @@ def deserialize_spend_proof(data: bytes) -> SpendProof:
 # A (64)
 # z_v (32)
 # z_r (32)
-# Total: 128 bytes
+# Total: 128 bytes (97 with a compressed point)
 # ==========================================================
 
-def serialize_value_proof(proof: ValueProof) -> bytes:
-    return (
-        serialize_point(proof.A) +
-        proof.z_v.to_bytes(32, "big") +
-        proof.z_r.to_bytes(32, "big")
+def pack_value_proof_into(
+    proof: ValueProof,
+    buf,
+    offset: int = 0,
+    compressed: bool = False
+) -> int:
+    offset = _put_point(buf, offset, proof, "A", compressed)
+    offset = _put_scalar(buf, offset, proof.z_v)
+    return _put_scalar(buf, offset, proof.z_r)
+
+
+def serialize_value_proof(proof: ValueProof, compressed: bool = False) -> bytes:
+    buf = bytearray(
+        COMPRESSED_VALUE_PROOF_SIZE if compressed else VALUE_PROOF_SIZE
     )
+    pack_value_proof_into(proof, buf, 0, compressed)
+    return bytes(buf)
 
 
-def deserialize_value_proof(data: bytes) -> ValueProof:
-    if len(data) != 128:
-        raise ValueError("Invalid ValueProof length")
+def deserialize_value_proof(data: bytes, lazy: bool = False) -> ValueProof:
+    p = _point_size(
+        len(data), VALUE_PROOF_SIZE, COMPRESSED_VALUE_PROOF_SIZE, "ValueProof"
+    )
 
-    A = _point_from_bytes(data[0:64])
-    z_v = int.from_bytes(data[64:96], "big")
-    z_r = int.from_bytes(data[96:128], "big")
+    A = _point_field(data[0:p], lazy)
+    z_v = int.from_bytes(data[p:p + 32], "big")
+    z_r = int.from_bytes(data[p + 32:p + 64], "big")
 
     return ValueProof(A, z_v, z_r)
 
@@ -95,21 +164,42 @@ def deserialize_value_proof(data: bytes) -> ValueProof:
 # Format:
 # A (64)
 # z (32)
-# Total: 96 bytes
+# Total: 96 bytes (65 with a compressed point)
 # ==========================================================
 
-def serialize_recursive_proof(proof: RecursiveInvariantProof) -> bytes:
-    return (
-        serialize_point(proof.A) +
-        proof.z.to_bytes(32, "big")
+def pack_recursive_proof_into(
+    proof: RecursiveInvariantProof,
+    buf,
+    offset: int = 0,
+    compressed: bool = False
+) -> int:
+    offset = _put_point(buf, offset, proof, "A", compressed)
+    return _put_scalar(buf, offset, proof.z)
+
+
+def serialize_recursive_proof(
+    proof: RecursiveInvariantProof,
+    compressed: bool = False
+) -> bytes:
+    buf = bytearray(
+        COMPRESSED_RECURSIVE_PROOF_SIZE if compressed else RECURSIVE_PROOF_SIZE
+    )
+    pack_recursive_proof_into(proof, buf, 0, compressed)
+    return bytes(buf)
+
+
+def deserialize_recursive_proof(
+    data: bytes,
+    lazy: bool = False
+) -> RecursiveInvariantProof:
+    p = _point_size(
+        len(data),
+        RECURSIVE_PROOF_SIZE,
+        COMPRESSED_RECURSIVE_PROOF_SIZE,
+        "RecursiveInvariantProof"
     )
 
-
-def deserialize_recursive_proof(data: bytes) -> RecursiveInvariantProof:
-    if len(data) != 96:
-        raise ValueError("Invalid RecursiveInvariantProof length")
-
-    A = _point_from_bytes(data[0:64])
-    z = int.from_bytes(data[64:96], "big")
+    A = _point_field(data[0:p], lazy)
+    z = int.from_bytes(data[p:p + 32], "big")
 
     return RecursiveInvariantProof(A, z)
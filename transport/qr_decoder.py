@@ -1,12 +1,51 @@
 # transport/qr_decoder.py
 
 import base64
+import binascii
+
+from transport.base45 import QR_PREFIX, b45decode
+from transport.fountain import decode_frames
 from transport.transaction_serializer import deserialize_offline_transaction
 
 
-def decode_qr_payload(b64_string: str):
+def qr_payload_bytes(scanned) -> bytes:
+    """
+    Raw payload from a scan result, whatever the sender's encoding:
+
+    - bytes / bytearray: a binary-mode QR code, already raw
+    - str with the "B45:" prefix: Base45 (alphanumeric mode)
+    - any other str: Base64
+    """
+    if isinstance(scanned, (bytes, bytearray, memoryview)):
+        return bytes(scanned)
+
+    if scanned.startswith(QR_PREFIX):
+        return b45decode(scanned[len(QR_PREFIX):])
+
+    try:
+        return base64.b64decode(scanned)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid QR payload: {e}") from None
+
+
+def decode_qr_payload(scanned, certificates=None):
+    """
+    Scanned QR content → bytes → OfflineTransaction (any wire format)
+
+    certificates (e.g. ReceiverWalletState.cert_cache) resolves
+    certificate-by-reference payloads; ValueError if it cannot.
     """
-    Base64 string → bytes → OfflineTransaction
+    raw_bytes = qr_payload_bytes(scanned)
+    return deserialize_offline_transaction(raw_bytes, certificates)
+
+
+def decode_qr_frames(scanned_frames, certificates=None):
+    """
+    Scanned fountain frames (any order, duplicates and gaps allowed)
+    → OfflineTransaction.
+
+    Raises ValueError if the frames are not enough yet; for live
+    scanning feed transport.fountain.FountainDecoder frame by frame.
     """
-    raw_bytes = base64.b64decode(b64_string)
-    return deserialize_offline_transaction(raw_bytes)
+    payload = decode_frames(qr_payload_bytes(f) for f in scanned_frames)
+    return deserialize_offline_transaction(payload, certificates)
@@ -1,33 +1,206 @@
 # transport/qr_encoder.py
 
 import base64
+import math
 import qrcode
+from qrcode.util import MODE_8BIT_BYTE, MODE_ALPHA_NUM, QRData
 
-from transport.transaction_serializer import serialize_offline_transaction
+from transport.base45 import QR_PREFIX, b45encode
+from transport.fountain import DEFAULT_BLOCK_SIZE, FountainEncoder
+from transport.transaction_serializer import (
+    WIRE_V2,
+    WIRE_V2_CERT_REF,
+    serialize_offline_transaction,
+)
 
 
-def encode_transaction_to_qr(tx, output_file="offline_tx.png"):
+# ==========================================================
+# Payload encodings inside the QR code
+#
+#   binary   raw bytes in QR byte mode (8 bits per byte)
+#   base45   "B45:" + Base45 text in QR alphanumeric mode
+#            (5.5 bits per character, ~8.25 bits per byte); for
+#            scanners that only hand text to the app
+#   base64   legacy: Base64 text in byte mode (~10.7 bits per byte)
+#
+# "auto" picks the smallest QR version, binary on a tie, and falls
+# back to base64 for the rare payload the qrcode package cannot lay
+# out in binary or alphanumeric mode (it fails on an all-zero error
+# correction block with "glog(0)").
+# qr_decoder accepts all three.
+# ==========================================================
+
+QR_BINARY = "binary"
+QR_BASE45 = "base45"
+QR_BASE64 = "base64"
+QR_AUTO = "auto"
+
+_ENCODINGS = (QR_BINARY, QR_BASE45, QR_BASE64)
+
+
+def qr_data(payload: bytes, encoding: str) -> QRData:
     """
-    Serialize transaction → Base64 → QR image file.
+    Payload as QR segment data in the mode the encoding calls for.
     """
+    if encoding == QR_BINARY:
+        return QRData(payload, mode=MODE_8BIT_BYTE)
+    if encoding == QR_BASE45:
+        return QRData(QR_PREFIX + b45encode(payload), mode=MODE_ALPHA_NUM)
+    if encoding == QR_BASE64:
+        return QRData(base64.b64encode(payload), mode=MODE_8BIT_BYTE)
 
-    payload = serialize_offline_transaction(tx)
+    raise ValueError(f"Unknown QR payload encoding {encoding!r}")
 
-    # Base64 encode for QR safety
-    b64_payload = base64.b64encode(payload).decode()
 
-    qr = qrcode.QRCode(
+def _qr() -> qrcode.QRCode:
+    return qrcode.QRCode(
         version=None,  # auto size
         error_correction=qrcode.constants.ERROR_CORRECT_M,
         box_size=8,
         border=4,
     )
 
-    qr.add_data(b64_payload)
-    qr.make(fit=True)
+
+def build_qr(payload: bytes, encoding: str = QR_AUTO, version=None, qr=None):
+    """
+    Laid-out QRCode for a payload. Returns (qr, encoding used).
+
+    `qr` is a QRCode from an earlier call to clear and refill instead
+    of constructing a new one; the returned code is that same object.
+    """
+    if qr is None:
+        qr = _qr()
+
+    if encoding != QR_AUTO:
+        _fill(qr, payload, encoding, version)
+        qr.make(fit=False)
+        return qr, encoding
+
+    # Size every candidate first (cheap), lay out only the winner:
+    # make() tries all 8 mask patterns, which is most of the cost
+    candidates = []
+    for rank, name in enumerate((QR_BINARY, QR_BASE45)):
+        candidates.append((_fill(qr, payload, name, version), rank, name))
+
+    for fitted, _, name in sorted(candidates):
+        _fill(qr, payload, name, fitted)
+        try:
+            qr.make(fit=False)
+        except ValueError:
+            continue
+        return qr, name
+
+    _fill(qr, payload, QR_BASE64, version)
+    qr.make(fit=False)
+    return qr, QR_BASE64
+
+
+def _fill(qr: qrcode.QRCode, payload: bytes, encoding: str, version) -> int:
+    """
+    Clear qr and load the payload; returns the (fitted) version.
+    """
+    qr.clear()
+    qr.version = version
+    qr.add_data(qr_data(payload, encoding))
+    if version is None:
+        qr.best_fit()
+    return qr.version
+
+
+def qr_version_report(payload: bytes) -> dict:
+    """
+    QR version per payload encoding, e.g. {"binary": 22, ...}.
+    """
+    return {name: build_qr(payload, name)[0].version for name in _ENCODINGS}
+
+
+def encode_transaction_to_qr(
+    tx,
+    output_file="offline_tx.png",
+    cert_by_reference=False,
+    encoding=QR_AUTO
+):
+    """
+    Serialize transaction (compact v2 wire format) → QR image file.
+
+    cert_by_reference=True sends only the certificate digest, for a
+    receiver that already holds the certificate; if it cannot decode
+    the payment, re-encode with the full certificate.
+    """
+
+    payload = serialize_offline_transaction(
+        tx,
+        WIRE_V2_CERT_REF if cert_by_reference else WIRE_V2
+    )
+
+    qr, encoding = build_qr(payload, encoding)
 
     img = qr.make_image(fill_color="black", back_color="white")
     img.save(output_file)
 
     print(f"QR code saved to {output_file}")
-    print(f"Payload size: {len(payload)} bytes")
+    print(
+        f"Payload size: {len(payload)} bytes "
+        f"({encoding}, QR version {qr.version})"
+    )
+
+
+def encode_transaction_to_qr_frames(
+    tx,
+    output_file="offline_tx.gif",
+    block_size=DEFAULT_BLOCK_SIZE,
+    overhead=1.5,
+    frame_ms=200,
+    cert_by_reference=False,
+    encoding=QR_AUTO
+):
+    """
+    Serialize transaction → fountain-coded frames → animated QR (GIF).
+
+    Every frame is a small, fixed-size QR code. The receiver keeps
+    scanning until decode_qr_frames() / FountainDecoder has enough of
+    them, in any order, so a missed frame just costs one more frame
+    of the loop instead of a retry. `overhead` sets how many frames
+    one loop holds, relative to the K source blocks.
+
+    Returns the number of frames.
+    """
+
+    payload = serialize_offline_transaction(
+        tx,
+        WIRE_V2_CERT_REF if cert_by_reference else WIRE_V2
+    )
+
+    encoder = FountainEncoder(payload, block_size)
+    count = max(encoder.k, math.ceil(encoder.k * overhead))
+
+    images = []
+    version = None
+    qr = _qr()
+
+    for frame in encoder.frames(count):
+        # Sized (and the encoding picked) once: every frame has the
+        # same length
+        qr, encoding = build_qr(frame, encoding, version, qr)
+        version = qr.version
+
+        images.append(
+            qr.make_image(fill_color="black", back_color="white").get_image()
+        )
+
+    images[0].save(
+        output_file,
+        save_all=True,
+        append_images=images[1:],
+        duration=frame_ms,
+        loop=0
+    )
+
+    print(f"QR frame sequence saved to {output_file}")
+    print(
+        f"Payload size: {len(payload)} bytes, "
+        f"{count} frames of {block_size} bytes "
+        f"({encoding}, QR version {version})"
+    )
+
+    return count
@@ -0,0 +1,214 @@
+# transport/qr_render.py
+
+import hashlib
+import io
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from transport.qr_encoder import QR_AUTO, build_qr
+from transport.transaction_serializer import (
+    WIRE_V2,
+    WIRE_V2_CERT_REF,
+    serialize_offline_transaction,
+)
+
+
+# ==========================================================
+# In-memory QR rendering
+#
+# A payload is laid out once (build_qr, the expensive step: version
+# fit plus eight mask trials) into a module matrix; every output
+# format is drawn from that matrix:
+#
+#   matrix   tuple of rows of bools, quiet zone included
+#   png      bytes, one scaled 1-bit image (no per-module drawing)
+#   svg      bytes, a single path
+#
+# QRRenderCache keeps matrices and rendered outputs by payload digest,
+# so showing the same payment again costs a dictionary lookup. It also
+# keeps one configured QRCode and refills it for every new payload.
+# ==========================================================
+
+FORMAT_MATRIX = "matrix"
+FORMAT_PNG = "png"
+FORMAT_SVG = "svg"
+
+DEFAULT_BOX_SIZE = 8
+DEFAULT_CACHE_ENTRIES = 32
+
+_FORMATS = (FORMAT_MATRIX, FORMAT_PNG, FORMAT_SVG)
+
+Matrix = Tuple[Tuple[bool, ...], ...]
+
+
+def qr_matrix(payload: bytes, encoding: str = QR_AUTO) -> Matrix:
+    """
+    Module matrix of the payload's QR code (quiet zone included).
+    """
+    qr, _ = build_qr(payload, encoding)
+    return _matrix(qr)
+
+
+def _matrix(qr) -> Matrix:
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def matrix_to_png(matrix: Matrix, box_size: int = DEFAULT_BOX_SIZE) -> bytes:
+    from PIL import Image
+
+    n = len(matrix)
+    pixels = bytes(
+        0 if dark else 255
+        for row in matrix
+        for dark in row
+    )
+
+    # 1-bit PNG: a fifth of the encode time and half the size of 8-bit
+    img = Image.frombytes("L", (n, n), pixels).convert("1")
+    img = img.resize((n * box_size, n * box_size), Image.NEAREST)
+
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def matrix_to_svg(matrix: Matrix, box_size: int = DEFAULT_BOX_SIZE) -> bytes:
+    """
+    One path, one run of dark modules per "h" segment; scales freely
+    (viewBox in modules, size in pixels).
+    """
+    n = len(matrix)
+    path = []
+
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < n:
+            if not row[x]:
+                x += 1
+                continue
+
+            start = x
+            while x < n and row[x]:
+                x += 1
+            path.append(f"M{start} {y}h{x - start}v1h{start - x}z")
+
+    size = n * box_size
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{size}" height="{size}" viewBox="0 0 {n} {n}" '
+        'shape-rendering="crispEdges">'
+        f'<rect width="{n}" height="{n}" fill="#fff"/>'
+        f'<path d="{"".join(path)}" fill="#000"/>'
+        '</svg>'
+    ).encode()
+
+
+def _render(matrix: Matrix, fmt: str, box_size: int):
+    if fmt == FORMAT_MATRIX:
+        return matrix
+    if fmt == FORMAT_PNG:
+        return matrix_to_png(matrix, box_size)
+    if fmt == FORMAT_SVG:
+        return matrix_to_svg(matrix, box_size)
+
+    raise ValueError(f"Unknown QR render format {fmt!r}")
+
+
+def render_qr(
+    payload: bytes,
+    fmt: str = FORMAT_PNG,
+    encoding: str = QR_AUTO,
+    box_size: int = DEFAULT_BOX_SIZE
+):
+    """
+    Render a payload's QR code in memory: PNG / SVG bytes or a matrix.
+    """
+    if fmt not in _FORMATS:
+        raise ValueError(f"Unknown QR render format {fmt!r}")
+
+    return _render(qr_matrix(payload, encoding), fmt, box_size)
+
+
+class QRRenderCache:
+    """
+    LRU cache of rendered QR codes keyed by payload digest.
+
+    The matrix is computed once per payload; each (format, box size)
+    is rendered from it on first request.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
+        # (digest, encoding) -> {"matrix": Matrix, (fmt, box_size): output}
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        # Cleared and refilled by build_qr on every miss
+        self._qr = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def render(
+        self,
+        payload: bytes,
+        fmt: str = FORMAT_PNG,
+        encoding: str = QR_AUTO,
+        box_size: int = DEFAULT_BOX_SIZE
+    ):
+        if fmt not in _FORMATS:
+            raise ValueError(f"Unknown QR render format {fmt!r}")
+
+        key = (hashlib.sha256(payload).digest(), encoding)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            self._qr, _ = build_qr(payload, encoding, qr=self._qr)
+            entry = {FORMAT_MATRIX: _matrix(self._qr)}
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        if fmt == FORMAT_MATRIX:
+            return entry[FORMAT_MATRIX]
+
+        out = entry.get((fmt, box_size))
+        if out is None:
+            out = _render(entry[FORMAT_MATRIX], fmt, box_size)
+            entry[(fmt, box_size)] = out
+
+        return out
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def render_transaction_qr(
+    tx,
+    fmt: str = FORMAT_PNG,
+    cert_by_reference: bool = False,
+    encoding: str = QR_AUTO,
+    box_size: int = DEFAULT_BOX_SIZE,
+    cache: Optional[QRRenderCache] = None
+):
+    """
+    Serialize a transaction (v2 wire format) and render its QR code in
+    memory, through `cache` when given. Nothing touches the disk.
+    """
+    payload = serialize_offline_transaction(
+        tx,
+        WIRE_V2_CERT_REF if cert_by_reference else WIRE_V2
+    )
+
+    if cache is not None:
+        return cache.render(payload, fmt, encoding, box_size)
+
+    return render_qr(payload, fmt, encoding, box_size)
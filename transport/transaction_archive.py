@@ -0,0 +1,453 @@
+# transport/transaction_archive.py
+
+import bisect
+import os
+import struct
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+from transport.transaction_serializer import (
+    WIRE_V1,
+    scan_transaction,
+    serialize_offline_transaction_into,
+    serialized_size,
+)
+from transport.transaction_view import OfflineTransactionView
+
+
+# ==========================================================
+# Transaction archive (reconciliation uploads, audit archives)
+#
+#   header   magic (8) b"CBDCTXA1" | version u16 | flags u16
+#   blocks   length u32 | record count u32 | crc32(payload) u32 | payload
+#            payload: records, each  length u32 | v1 transaction
+#   end      0xFFFFFFFF | block count u32 | crc32(index) u32
+#   index    (FLAG_INDEX only) per block:
+#            file offset of block u64 | number of its first record u64
+#   trailer  offset of end marker u64 | record count u64 | b"CBDCTXAE"
+#
+# Records are v1 transactions, the fixed layout OfflineTransactionView
+# reads in place. A block is checked as a whole before any of its
+# records is handed out, so readers hold one block at a time whatever
+# the archive size. The trailer sits at a fixed distance from the end
+# of the file: random access seeks there, then to the index (or scans
+# block headers when the archive has none).
+#
+# An archive without its end marker was cut short. Streaming readers
+# raise ValueError when they reach the cut; random access refuses to
+# open it.
+# ==========================================================
+
+ARCHIVE_MAGIC = b"CBDCTXA1"
+ARCHIVE_VERSION = 1
+
+FLAG_INDEX = 0x0001
+
+DEFAULT_BLOCK_SIZE = 1 << 20   # target payload bytes per block
+
+_TRAILER_MAGIC = b"CBDCTXAE"
+
+_HEADER = struct.Struct(">8sHH")
+_BLOCK = struct.Struct(">III")
+_RECORD = struct.Struct(">I")
+_INDEX_ENTRY = struct.Struct(">QQ")
+_TRAILER = struct.Struct(">QQ8s")
+_END = 0xFFFFFFFF
+
+
+# ==========================================================
+# Writer
+# ==========================================================
+
+class TransactionArchiveWriter:
+    """
+    Streaming archive writer over a binary file object.
+
+    Records collect in one block buffer that is flushed once it
+    reaches block_size, so memory stays bounded by the block size
+    however many transactions are written. The file object only needs
+    write(); it is not closed.
+
+    Used as a context manager, the archive is finished on a clean exit
+    and left without its end marker (and so rejected by readers) when
+    the block raises.
+    """
+
+    def __init__(self, f, block_size: int = DEFAULT_BLOCK_SIZE, index: bool = True):
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+
+        self._f = f
+        self.block_size = block_size
+        self.index = index
+
+        self._block = bytearray(block_size)
+        self._used = 0
+        self._block_records = 0
+
+        self._offset = 0
+        self._blocks: List[Tuple[int, int]] = []   # (file offset, first record)
+        self.count = 0
+        self.closed = False
+
+        self._write(_HEADER.pack(
+            ARCHIVE_MAGIC, ARCHIVE_VERSION, FLAG_INDEX if index else 0
+        ))
+
+    def _write(self, data):
+        self._f.write(data)
+        self._offset += len(data)
+
+    def _reserve(self, size: int) -> int:
+        """
+        Room for a `size`-byte record in the current block; returns the
+        offset its transaction goes to. An oversized record gets a
+        block of its own.
+        """
+        if self.closed:
+            raise ValueError("Archive writer is closed")
+
+        needed = _RECORD.size + size
+        if self._used and self._used + needed > self.block_size:
+            self._flush_block()
+
+        if self._used + needed > len(self._block):
+            self._block.extend(bytes(self._used + needed - len(self._block)))
+
+        return self._used + _RECORD.size
+
+    def _commit(self, size: int) -> int:
+        # Only once the record is fully written, so a failed append
+        # leaves the block as it was
+        _RECORD.pack_into(self._block, self._used, size)
+        self._used += _RECORD.size + size
+        self._block_records += 1
+        self.count += 1
+        return self.count - 1
+
+    def append(self, tx) -> int:
+        """
+        Serialize an OfflineTransaction (v1) straight into the block.
+        Returns its record number.
+        """
+        size = serialized_size(tx, WIRE_V1)
+        offset = self._reserve(size)
+        serialize_offline_transaction_into(tx, self._block, offset, WIRE_V1)
+        return self._commit(size)
+
+    def append_encoded(self, data) -> int:
+        """
+        Add an already encoded v1 transaction (e.g. a record copied from
+        another archive). Returns its record number.
+        """
+        buf = memoryview(data)
+        if scan_transaction(buf).end != len(buf):
+            raise ValueError("Trailing bytes after transaction")
+
+        offset = self._reserve(len(buf))
+        self._block[offset:offset + len(buf)] = buf
+        return self._commit(len(buf))
+
+    def _flush_block(self):
+        if not self._block_records:
+            return
+
+        self._blocks.append((self._offset, self.count - self._block_records))
+
+        # Released before the block buffer may be resized again
+        with memoryview(self._block)[:self._used] as payload:
+            self._write(_BLOCK.pack(
+                self._used, self._block_records, zlib.crc32(payload)
+            ))
+            self._write(payload)
+
+        self._used = 0
+        self._block_records = 0
+
+        # Give back the room an oversized record took
+        if len(self._block) > self.block_size:
+            self._block = bytearray(self.block_size)
+
+    def close(self):
+        """
+        Flush the last block and write the end marker, index and trailer.
+        """
+        if self.closed:
+            return
+
+        self._flush_block()
+
+        index = b"".join(
+            _INDEX_ENTRY.pack(offset, first) for offset, first in self._blocks
+        ) if self.index else b""
+
+        end_offset = self._offset
+        self._write(_BLOCK.pack(_END, len(self._blocks), zlib.crc32(index)))
+        self._write(index)
+        self._write(_TRAILER.pack(end_offset, self.count, _TRAILER_MAGIC))
+
+        self.closed = True
+        self._block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.closed = True
+
+
+def write_transaction_archive(
+    path: str,
+    txs,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    index: bool = True
+) -> int:
+    """
+    Write transactions to an archive file atomically (tmp file, fsync,
+    rename). Returns the number of records.
+    """
+    tmp_path = path + ".tmp"
+
+    try:
+        with open(tmp_path, "wb") as f:
+            with TransactionArchiveWriter(f, block_size, index) as writer:
+                for tx in txs:
+                    writer.append(tx)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    os.replace(tmp_path, path)
+    return writer.count
+
+
+# ==========================================================
+# Streaming reader
+# ==========================================================
+
+def _read_exact(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated archive")
+    return data
+
+
+def _read_header(f) -> int:
+    magic, version, flags = _HEADER.unpack(_read_exact(f, _HEADER.size))
+    if magic != ARCHIVE_MAGIC:
+        raise ValueError("Not a transaction archive")
+    if version != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported archive version {version}")
+    return flags
+
+
+def _read_block(f, length: int, crc: int) -> memoryview:
+    payload = _read_exact(f, length)
+    if zlib.crc32(payload) != crc:
+        raise ValueError("Corrupt archive block")
+    return memoryview(payload)
+
+
+def _block_records(payload: memoryview, count: int) -> Iterator[memoryview]:
+    offset = 0
+
+    for _ in range(count):
+        if offset + _RECORD.size > len(payload):
+            raise ValueError("Corrupt archive block")
+
+        (size,) = _RECORD.unpack_from(payload, offset)
+        offset += _RECORD.size
+        if offset + size > len(payload):
+            raise ValueError("Corrupt archive block")
+
+        yield payload[offset:offset + size]
+        offset += size
+
+    if offset != len(payload):
+        raise ValueError("Corrupt archive block")
+
+
+def iter_archive_records(f) -> Iterator[memoryview]:
+    """
+    Encoded transactions of an archive, in order, from a binary file
+    object read front to back (no seeking, so pipes and upload streams
+    work). Each block's checksum is verified before its records are
+    yielded; one block is in memory at a time.
+    """
+    flags = _read_header(f)
+
+    blocks = 0
+    records = 0
+    while True:
+        length, count, crc = _BLOCK.unpack(_read_exact(f, _BLOCK.size))
+        if length == _END:
+            break
+
+        yield from _block_records(_read_block(f, length, crc), count)
+        blocks += 1
+        records += count
+
+    if count != blocks:
+        raise ValueError("Archive block count mismatch")
+
+    index_size = blocks * _INDEX_ENTRY.size if flags & FLAG_INDEX else 0
+    if zlib.crc32(_read_exact(f, index_size)) != crc:
+        raise ValueError("Corrupt archive index")
+
+    _, total, magic = _TRAILER.unpack(_read_exact(f, _TRAILER.size))
+    if magic != _TRAILER_MAGIC or total != records:
+        raise ValueError("Truncated archive")
+
+
+def iter_archive_views(f) -> Iterator[OfflineTransactionView]:
+    """
+    Lazy views over every transaction of an archive (see
+    iter_archive_records). A view keeps its block alive; views that
+    are dropped as the loop goes on keep memory constant.
+    """
+    for record in iter_archive_records(f):
+        view = OfflineTransactionView(record)
+        if view.layout.end != len(record):
+            raise ValueError("Corrupt archive record")
+        yield view
+
+
+# ==========================================================
+# Random access
+# ==========================================================
+
+class TransactionArchive:
+    """
+    Read-only, random-access archive file.
+
+    Opening reads the header, trailer and block index (or, for an
+    archive written without one, every block header, skipping the
+    payloads). archive[i] reads and checks just the block holding
+    record i; the last block read is kept, so nearby lookups are free.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+
+        try:
+            self._open()
+        except BaseException:
+            self._f.close()
+            raise
+
+        self._cached_block: Optional[int] = None
+        self._cached_records: List[memoryview] = []
+
+    def _open(self):
+        f = self._f
+        flags = _read_header(f)
+
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER.size + _BLOCK.size + _TRAILER.size:
+            raise ValueError("Truncated archive")
+
+        f.seek(size - _TRAILER.size)
+        end_offset, self._count, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+        if magic != _TRAILER_MAGIC or end_offset > size - _TRAILER.size - _BLOCK.size:
+            raise ValueError("Truncated archive")
+
+        f.seek(end_offset)
+        marker, n_blocks, crc = _BLOCK.unpack(_read_exact(f, _BLOCK.size))
+        if marker != _END:
+            raise ValueError("Truncated archive")
+
+        index_size = size - _TRAILER.size - end_offset - _BLOCK.size
+
+        if flags & FLAG_INDEX:
+            index = _read_exact(f, index_size)
+            if index_size != n_blocks * _INDEX_ENTRY.size or zlib.crc32(index) != crc:
+                raise ValueError("Corrupt archive index")
+            entries = list(_INDEX_ENTRY.iter_unpack(index))
+        else:
+            if index_size:
+                raise ValueError("Corrupt archive index")
+            entries = self._scan_blocks(end_offset)
+            if len(entries) != n_blocks:
+                raise ValueError("Archive block count mismatch")
+
+        self._offsets = [offset for offset, _ in entries]
+        self._firsts = [first for _, first in entries]
+
+    def _scan_blocks(self, end_offset: int) -> List[Tuple[int, int]]:
+        f = self._f
+        entries = []
+        offset = _HEADER.size
+        first = 0
+
+        while offset < end_offset:
+            f.seek(offset)
+            length, count, _ = _BLOCK.unpack(_read_exact(f, _BLOCK.size))
+            entries.append((offset, first))
+            offset += _BLOCK.size + length
+            first += count
+
+        if offset != end_offset or first != self._count:
+            raise ValueError("Corrupt archive")
+
+        return entries
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def block_count(self) -> int:
+        return len(self._offsets)
+
+    def record(self, i: int) -> memoryview:
+        """
+        Encoded transaction number i.
+        """
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("Archive record out of range")
+
+        block = bisect.bisect_right(self._firsts, i) - 1
+
+        if block != self._cached_block:
+            self._f.seek(self._offsets[block])
+            length, count, crc = _BLOCK.unpack(_read_exact(self._f, _BLOCK.size))
+            if length == _END:
+                raise ValueError("Corrupt archive index")
+
+            payload = _read_block(self._f, length, crc)
+            self._cached_records = list(_block_records(payload, count))
+            self._cached_block = block
+
+        return self._cached_records[i - self._firsts[block]]
+
+    def __getitem__(self, i: int) -> OfflineTransactionView:
+        record = self.record(i)
+        view = OfflineTransactionView(record)
+        if view.layout.end != len(record):
+            raise ValueError("Corrupt archive record")
+        return view
+
+    def __iter__(self) -> Iterator[OfflineTransactionView]:
+        """
+        Stream every view in order on a separate file handle.
+        """
+        with open(self.path, "rb") as f:
+            yield from iter_archive_views(f)
+
+    def close(self):
+        self._cached_block = None
+        self._cached_records = []
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,16 +1,29 @@
-from crypto.hash import serialize_point
+import struct
+from typing import Iterator, NamedTuple, Optional
+
+from crypto.curve import compress_point, decompress_point, point_from_bytes
+from crypto.hash import serialize_point_fixed
 from transport.proof_serializer import (
-    serialize_spend_proof,
-    serialize_value_proof,
-    serialize_recursive_proof,
+    SPEND_PROOF_SIZE,
+    VALUE_PROOF_SIZE,
+    RECURSIVE_PROOF_SIZE,
+    COMPRESSED_SPEND_PROOF_SIZE,
+    COMPRESSED_VALUE_PROOF_SIZE,
+    COMPRESSED_RECURSIVE_PROOF_SIZE,
+    pack_spend_proof_into,
+    pack_value_proof_into,
+    pack_recursive_proof_into,
     deserialize_spend_proof,
     deserialize_value_proof,
     deserialize_recursive_proof,
 )
+from transport.certificate_serializer import (
+    CERTIFICATE_DIGEST_SIZE,
+    certificate_digest,
+)
 from models.offline_transaction import OfflineTransaction
 from crypto.device.certificate import DeviceCertificate
 from ecdsa.ellipticcurve import Point
-from ecdsa.curves import SECP256k1
 
 
 # ==========================================================
@@ -18,187 +31,611 @@ from ecdsa.curves import SECP256k1
 # ==========================================================
 
 def _point_from_bytes(data: bytes) -> Point:
-    x = int.from_bytes(data[:32], "big")
-    y = int.from_bytes(data[32:], "big")
-    return Point(SECP256k1.curve, x, y)
+    """
+    Decode a 64-byte (x || y) point, rejecting points off the curve
+    with ValueError as decompress_point does for v2.
+    """
+    return point_from_bytes(data)
 
 
 # ==========================================================
-# Serialize
+# Wire versions
+#
+# v1  fixed width: 64-byte x || y points, u32 lengths, u64 times.
+#     No header; it starts with the u32 input count, so its first
+#     byte is 0x00 for any real transaction.
+#
+# v2  header 0xCB 0x02, then the same fields in the same order with
+#     33-byte SEC1 compressed points and varint (LEB128) counts,
+#     lengths and certificate times. Scalars, the transcript hash and
+#     signatures stay fixed width.
+#
+# v2 with certificate by reference: header 0xCB 0x03, the 32-byte
+#     certificate_digest() of the payer's certificate, then the v2
+#     fields without the certificate section. Only decodable by a
+#     receiver holding that certificate (wallet.cert_cache); otherwise
+#     the payer falls back to a full v2 frame.
+#
+# Decoders look at the header and accept any of them.
 # ==========================================================
 
-def serialize_offline_transaction(tx: OfflineTransaction) -> bytes:
+WIRE_V1 = 1
+WIRE_V2 = 2
+WIRE_V2_CERT_REF = 3
 
-    payload = b""
+WIRE_MAGIC = 0xCB
+_SUPPORTED_VERSIONS = (WIRE_V1, WIRE_V2, WIRE_V2_CERT_REF)
 
-    # ----------------------------
-    # 1️⃣ Input serials
-    # ----------------------------
-    payload += len(tx.input_serials).to_bytes(4, "big")
-    for s in tx.input_serials:
-        payload += serialize_point(s)
 
-    # ----------------------------
-    # 2️⃣ Input commitments  ← MUST BE HERE
-    # ----------------------------
-    payload += len(tx.input_commitments).to_bytes(4, "big")
-    for C in tx.input_commitments:
-        payload += serialize_point(C)
+# ==========================================================
+# Layout constants
+# ==========================================================
 
-    # ----------------------------
-    # 3️⃣ Output commitments
-    # ----------------------------
-    payload += len(tx.output_commitments).to_bytes(4, "big")
-    for C in tx.output_commitments:
-        payload += serialize_point(C)
+_U32 = struct.Struct(">I")
+_U64x2 = struct.Struct(">QQ")
+
+_POINT_SIZE = 64
+_COMPRESSED_POINT_SIZE = 33
+_SPEND_PROOF_SIZE = SPEND_PROOF_SIZE
+_VALUE_PROOF_SIZE = VALUE_PROOF_SIZE
+_RECURSIVE_PROOF_SIZE = RECURSIVE_PROOF_SIZE
+_TRANSCRIPT_SIZE = 32
+_SIGNATURE_SIZE = 96
+
+_PROOFS_SIZE = _SPEND_PROOF_SIZE + _VALUE_PROOF_SIZE + _RECURSIVE_PROOF_SIZE
+_COMPRESSED_PROOFS_SIZE = (
+    COMPRESSED_SPEND_PROOF_SIZE
+    + COMPRESSED_VALUE_PROOF_SIZE
+    + COMPRESSED_RECURSIVE_PROOF_SIZE
+)
 
-    # ----------------------------
-    # 4️⃣ Proofs
-    # ----------------------------
-    payload += serialize_spend_proof(tx.spend_proof)
-    payload += serialize_value_proof(tx.value_proof)
-    payload += serialize_recursive_proof(tx.recursive_proof)
+_MAX_VARINT_BYTES = 10      # enough for any u64
 
-    # ----------------------------
-    # 5️⃣ Transcript + signature
-    # ----------------------------
-    payload += tx.transcript_hash
-    payload += tx.device_signature
 
-    # ----------------------------
-    # 6️⃣ Certificate
-    # ----------------------------
-    cert = tx.device_certificate
+# ==========================================================
+# Varints (unsigned LEB128)
+# ==========================================================
 
-    payload += serialize_point(cert.pk_device)
+def _varint_size(n: int) -> int:
+    return max(1, (n.bit_length() + 6) // 7)
 
-    payload += len(cert.cert_id).to_bytes(4, "big")
-    payload += cert.cert_id
 
-    payload += cert.issued_at.to_bytes(8, "big")
-    payload += cert.expires_at.to_bytes(8, "big")
+def _put_varint(buf, offset: int, n: int) -> int:
+    if n < 0 or n >= 1 << 64:
+        raise ValueError("Varint out of range")
 
-    payload += cert.signature
+    while n >= 0x80:
+        buf[offset] = (n & 0x7F) | 0x80
+        n >>= 7
+        offset += 1
 
-    # ----------------------------
-    # 7️⃣ Nonce
-    # ----------------------------
-    payload += len(tx.nonce).to_bytes(4, "big")
-    payload += tx.nonce
+    buf[offset] = n
+    return offset + 1
+
+
+def _read_varint(buf, offset: int):
+    """
+    Returns (value, offset just past it). Rejects truncated, overlong
+    and non-minimal encodings, so every value has exactly one encoding.
+    """
+    n = 0
+    shift = 0
+
+    for i in range(_MAX_VARINT_BYTES):
+        if offset + i >= len(buf):
+            raise ValueError("Truncated transaction")
+
+        byte = buf[offset + i]
+        n |= (byte & 0x7F) << shift
+
+        if not byte & 0x80:
+            if byte == 0 and i > 0:
+                raise ValueError("Non-minimal varint")
+            if n >= 1 << 64:
+                raise ValueError("Varint out of range")
+            return n, offset + i + 1
+
+        shift += 7
+
+    raise ValueError("Varint too long")
 
-    return payload
 
 # ==========================================================
-# Deserialize
+# Serialize
+#
+# The exact encoded size is computed first and every field is written
+# in place with pack_into / slice assignment, so encoding is a single
+# allocation (or none, with a caller-supplied buffer) instead of one
+# bytes copy per field.
 # ==========================================================
 
-def deserialize_offline_transaction(data: bytes) -> OfflineTransaction:
+def _check_version(version: int):
+    if version not in _SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported wire version {version}")
 
-    offset = 0
 
-    # ----------------------------
-    # 1️⃣ Input serials
-    # ----------------------------
-    n_inputs = int.from_bytes(data[offset:offset+4], "big")
-    offset += 4
+def serialized_size(tx: OfflineTransaction, version: int = WIRE_V1) -> int:
+    """
+    Exact length of serialize_offline_transaction(tx, version).
+    """
+    _check_version(version)
+
+    cert = tx.device_certificate
+    n_points = (
+        len(tx.input_serials)
+        + len(tx.input_commitments)
+        + len(tx.output_commitments)
+    )
+    fixed = (
+        len(tx.transcript_hash)
+        + len(tx.device_signature)
+        + len(cert.cert_id)
+        + len(cert.signature)
+        + len(tx.nonce)
+    )
 
-    input_serials = []
-    for _ in range(n_inputs):
-        pt = _point_from_bytes(data[offset:offset+64])
-        offset += 64
-        input_serials.append(pt)
+    if version == WIRE_V1:
+        return (
+            fixed
+            + _POINT_SIZE * (n_points + 1)
+            + _PROOFS_SIZE
+            + 5 * _U32.size
+            + _U64x2.size
+        )
+
+    size = (
+        2
+        + len(tx.transcript_hash)
+        + len(tx.device_signature)
+        + _COMPRESSED_POINT_SIZE * n_points
+        + _COMPRESSED_PROOFS_SIZE
+        + _varint_size(len(tx.input_serials))
+        + _varint_size(len(tx.input_commitments))
+        + _varint_size(len(tx.output_commitments))
+        + _varint_size(len(tx.nonce))
+        + len(tx.nonce)
+    )
 
-    # ----------------------------
-    # 2️⃣ Input commitments  ← MUST MATCH SERIALIZER
-    # ----------------------------
-    n_input_commitments = int.from_bytes(data[offset:offset+4], "big")
-    offset += 4
+    if version == WIRE_V2_CERT_REF:
+        return size + CERTIFICATE_DIGEST_SIZE
+
+    return (
+        size
+        + _COMPRESSED_POINT_SIZE
+        + _varint_size(len(cert.cert_id))
+        + len(cert.cert_id)
+        + _varint_size(cert.issued_at)
+        + _varint_size(cert.expires_at)
+        + len(cert.signature)
+    )
+
+
+def _put_points(buf, offset: int, points, compressed: bool) -> int:
+    if compressed:
+        offset = _put_varint(buf, offset, len(points))
+        encode, size = compress_point, _COMPRESSED_POINT_SIZE
+    else:
+        _U32.pack_into(buf, offset, len(points))
+        offset += _U32.size
+        encode, size = serialize_point_fixed, _POINT_SIZE
+
+    for P in points:
+        buf[offset:offset + size] = encode(P)
+        offset += size
+
+    return offset
+
+
+def _put_bytes(buf, offset: int, data: bytes) -> int:
+    end = offset + len(data)
+    buf[offset:end] = data
+    return end
+
+
+def _put_length_prefixed(buf, offset: int, data: bytes, compressed: bool) -> int:
+    if compressed:
+        offset = _put_varint(buf, offset, len(data))
+    else:
+        _U32.pack_into(buf, offset, len(data))
+        offset += _U32.size
+
+    return _put_bytes(buf, offset, data)
+
+
+def serialize_offline_transaction_into(
+    tx: OfflineTransaction,
+    buf,
+    offset: int = 0,
+    version: int = WIRE_V1
+) -> int:
+    """
+    Encode tx into a writable buffer (bytearray, memoryview, mmap)
+    starting at offset. Returns the offset just past the transaction.
+    Raises ValueError if the buffer is too small.
+    """
+    if offset < 0 or len(buf) - offset < serialized_size(tx, version):
+        raise ValueError("Buffer too small for transaction")
 
-    input_commitments = []
-    for _ in range(n_input_commitments):
-        pt = _point_from_bytes(data[offset:offset+64])
-        offset += 64
-        input_commitments.append(pt)
+    v2 = version != WIRE_V1
+    cert_ref = version == WIRE_V2_CERT_REF
+
+    if v2:
+        buf[offset] = WIRE_MAGIC
+        buf[offset + 1] = version
+        offset += 2
+
+    if cert_ref:
+        offset = _put_bytes(
+            buf, offset, certificate_digest(tx.device_certificate)
+        )
 
     # ----------------------------
+    # 1️⃣ Input serials
+    # 2️⃣ Input commitments
     # 3️⃣ Output commitments
     # ----------------------------
-    n_outputs = int.from_bytes(data[offset:offset+4], "big")
-    offset += 4
-
-    output_commitments = []
-    for _ in range(n_outputs):
-        pt = _point_from_bytes(data[offset:offset+64])
-        offset += 64
-        output_commitments.append(pt)
+    offset = _put_points(buf, offset, tx.input_serials, v2)
+    offset = _put_points(buf, offset, tx.input_commitments, v2)
+    offset = _put_points(buf, offset, tx.output_commitments, v2)
 
     # ----------------------------
     # 4️⃣ Proofs
     # ----------------------------
-    spend_proof = deserialize_spend_proof(data[offset:offset+224])
-    offset += 224
-
-    value_proof = deserialize_value_proof(data[offset:offset+128])
-    offset += 128
-
-    recursive_proof = deserialize_recursive_proof(data[offset:offset+96])
-    offset += 96
+    offset = pack_spend_proof_into(tx.spend_proof, buf, offset, v2)
+    offset = pack_value_proof_into(tx.value_proof, buf, offset, v2)
+    offset = pack_recursive_proof_into(tx.recursive_proof, buf, offset, v2)
 
     # ----------------------------
     # 5️⃣ Transcript + signature
     # ----------------------------
-    transcript_hash = data[offset:offset+32]
-    offset += 32
+    offset = _put_bytes(buf, offset, tx.transcript_hash)
+    offset = _put_bytes(buf, offset, tx.device_signature)
 
-    device_signature = data[offset:offset+96]
-    offset += 96
+    # ----------------------------
+    # 6️⃣ Certificate (by reference: already written after the header)
+    # ----------------------------
+    cert = tx.device_certificate
+
+    if not cert_ref:
+        if v2:
+            offset = _put_bytes(buf, offset, compress_point(cert.pk_device))
+            offset = _put_length_prefixed(buf, offset, cert.cert_id, True)
+            offset = _put_varint(buf, offset, cert.issued_at)
+            offset = _put_varint(buf, offset, cert.expires_at)
+        else:
+            offset = _put_bytes(buf, offset, serialize_point_fixed(cert.pk_device))
+            offset = _put_length_prefixed(buf, offset, cert.cert_id, False)
+            _U64x2.pack_into(buf, offset, cert.issued_at, cert.expires_at)
+            offset += _U64x2.size
+
+        offset = _put_bytes(buf, offset, cert.signature)
 
     # ----------------------------
-    # 6️⃣ Certificate
+    # 7️⃣ Nonce
     # ----------------------------
-    pk_device = _point_from_bytes(data[offset:offset+64])
-    offset += 64
+    return _put_length_prefixed(buf, offset, tx.nonce, v2)
+
+
+def serialize_offline_transaction(
+    tx: OfflineTransaction,
+    version: int = WIRE_V1
+) -> bytes:
+    """
+    v1 (the default) keeps the fixed layout used for bank-side files
+    and in-place views; v2 is the compact form for QR and other
+    size-bound links, and WIRE_V2_CERT_REF the smallest one for a
+    receiver known to hold the payer's certificate.
+    """
+    buf = bytearray(serialized_size(tx, version))
+    serialize_offline_transaction_into(tx, buf, 0, version)
+    return bytes(buf)
+
+
+def write_offline_transactions(txs, f, version: int = WIRE_V1) -> int:
+    """
+    Write transactions back to back to a binary file object, reusing
+    one scratch buffer. The output can be read back with
+    iter_offline_transactions. Returns the number of bytes written.
+    """
+    buf = bytearray()
+    written = 0
+
+    for tx in txs:
+        size = serialized_size(tx, version)
+        if size > len(buf):
+            buf = bytearray(max(size, 2 * len(buf)))
+
+        serialize_offline_transaction_into(tx, buf, 0, version)
+        f.write(memoryview(buf)[:size])
+        written += size
+
+    return written
 
-    cert_len = int.from_bytes(data[offset:offset+4], "big")
-    offset += 4
+# ==========================================================
+# Deserialize
+#
+# Decoding works over a memoryview: the layout is scanned once with
+# struct.unpack_from, and every field is read in place, so no
+# intermediate slices are copied. A buffer may hold many transactions
+# back to back (see iter_offline_transactions).
+# ==========================================================
+
+
+class TransactionLayout(NamedTuple):
+    """
+    Offsets of every section of one encoded transaction in its buffer.
+    """
+    input_serials: int
+    n_input_serials: int
+    input_commitments: int
+    n_input_commitments: int
+    output_commitments: int
+    n_output_commitments: int
+    spend_proof: int
+    value_proof: int
+    recursive_proof: int
+    transcript_hash: int
+    device_signature: int
+    certificate: int
+    cert_id: int
+    cert_id_len: int
+    cert_times: int
+    cert_signature: int
+    nonce: int
+    nonce_len: int
+    end: int
+
+
+def wire_version(data, offset: int = 0) -> int:
+    """
+    Wire version of the transaction starting at `offset`.
+    """
+    if offset >= len(data):
+        raise ValueError("Truncated transaction")
+
+    if data[offset] != WIRE_MAGIC:
+        return WIRE_V1
+
+    if offset + 1 >= len(data):
+        raise ValueError("Truncated transaction")
+
+    version = data[offset + 1]
+    if version not in (WIRE_V2, WIRE_V2_CERT_REF):
+        raise ValueError(f"Unsupported wire version {version}")
+
+    return version
+
+
+def scan_transaction(buf: memoryview, offset: int = 0) -> TransactionLayout:
+    """
+    Locate every field of the v1 transaction starting at `offset`
+    without decoding any of them. Raises ValueError if the buffer is
+    too short or holds a v2 transaction (which has no fixed layout).
+    """
+    if wire_version(buf, offset) != WIRE_V1:
+        raise ValueError("Only v1 transactions have a fixed layout")
+
+    unpack = _U32.unpack_from
+
+    try:
+        (n_inputs,) = unpack(buf, offset)
+        inputs = offset + 4
+        o = inputs + n_inputs * _POINT_SIZE
+
+        (n_input_commitments,) = unpack(buf, o)
+        input_commitments = o + 4
+        o = input_commitments + n_input_commitments * _POINT_SIZE
+
+        (n_outputs,) = unpack(buf, o)
+        outputs = o + 4
+        o = outputs + n_outputs * _POINT_SIZE
+
+        spend_proof = o
+        value_proof = spend_proof + _SPEND_PROOF_SIZE
+        recursive_proof = value_proof + _VALUE_PROOF_SIZE
+        transcript_hash = recursive_proof + _RECURSIVE_PROOF_SIZE
+        device_signature = transcript_hash + _TRANSCRIPT_SIZE
+        certificate = device_signature + _SIGNATURE_SIZE
+
+        (cert_id_len,) = unpack(buf, certificate + _POINT_SIZE)
+        cert_id = certificate + _POINT_SIZE + 4
+        cert_times = cert_id + cert_id_len
+        cert_signature = cert_times + _U64x2.size
+
+        (nonce_len,) = unpack(buf, cert_signature + _SIGNATURE_SIZE)
+        nonce = cert_signature + _SIGNATURE_SIZE + 4
+        end = nonce + nonce_len
+    except struct.error:
+        raise ValueError("Truncated transaction") from None
+
+    if end > len(buf):
+        raise ValueError("Truncated transaction")
+
+    return TransactionLayout(
+        inputs, n_inputs,
+        input_commitments, n_input_commitments,
+        outputs, n_outputs,
+        spend_proof, value_proof, recursive_proof,
+        transcript_hash, device_signature,
+        certificate, cert_id, cert_id_len, cert_times, cert_signature,
+        nonce, nonce_len,
+        end
+    )
 
-    cert_id = data[offset:offset+cert_len]
-    offset += cert_len
 
-    issued_at = int.from_bytes(data[offset:offset+8], "big")
-    offset += 8
+def _points_at(buf: memoryview, offset: int, count: int) -> list:
+    return [
+        _point_from_bytes(buf[o:o + _POINT_SIZE])
+        for o in range(offset, offset + count * _POINT_SIZE, _POINT_SIZE)
+    ]
 
-    expires_at = int.from_bytes(data[offset:offset+8], "big")
-    offset += 8
 
-    signature = data[offset:offset+96]
-    offset += 96
+def _decode(buf: memoryview, L: TransactionLayout) -> OfflineTransaction:
+    issued_at, expires_at = _U64x2.unpack_from(buf, L.cert_times)
 
     certificate = DeviceCertificate(
-        pk_device=pk_device,
-        cert_id=cert_id,
+        pk_device=_point_from_bytes(buf[L.certificate:L.certificate + _POINT_SIZE]),
+        cert_id=bytes(buf[L.cert_id:L.cert_id + L.cert_id_len]),
         issued_at=issued_at,
         expires_at=expires_at,
-        signature=signature
+        signature=bytes(buf[L.cert_signature:L.cert_signature + _SIGNATURE_SIZE])
     )
 
-    # ----------------------------
-    # 7️⃣ Nonce
-    # ----------------------------
-    nonce_len = int.from_bytes(data[offset:offset+4], "big")
-    offset += 4
+    return OfflineTransaction(
+        input_serials=_points_at(buf, L.input_serials, L.n_input_serials),
+        input_commitments=_points_at(
+            buf, L.input_commitments, L.n_input_commitments
+        ),
+        output_commitments=_points_at(
+            buf, L.output_commitments, L.n_output_commitments
+        ),
+        spend_proof=deserialize_spend_proof(
+            buf[L.spend_proof:L.value_proof]
+        ),
+        value_proof=deserialize_value_proof(
+            buf[L.value_proof:L.recursive_proof]
+        ),
+        recursive_proof=deserialize_recursive_proof(
+            buf[L.recursive_proof:L.transcript_hash]
+        ),
+        transcript_hash=bytes(buf[L.transcript_hash:L.device_signature]),
+        device_signature=bytes(buf[L.device_signature:L.certificate]),
+        device_certificate=certificate,
+        nonce=bytes(buf[L.nonce:L.end])
+    )
 
-    nonce = data[offset:offset+nonce_len]
 
-    return OfflineTransaction(
+def _take(buf: memoryview, offset: int, size: int):
+    end = offset + size
+    if end > len(buf):
+        raise ValueError("Truncated transaction")
+    return buf[offset:end], end
+
+
+def _take_prefixed(buf: memoryview, offset: int):
+    size, offset = _read_varint(buf, offset)
+    return _take(buf, offset, size)
+
+
+def _take_points(buf: memoryview, offset: int):
+    count, offset = _read_varint(buf, offset)
+    data, end = _take(buf, offset, count * _COMPRESSED_POINT_SIZE)
+
+    points = [
+        decompress_point(data[o:o + _COMPRESSED_POINT_SIZE])
+        for o in range(0, len(data), _COMPRESSED_POINT_SIZE)
+    ]
+    return points, end
+
+
+def referenced_certificate(data, offset: int = 0) -> Optional[bytes]:
+    """
+    Certificate digest of a by-reference transaction, None for frames
+    that carry the full certificate.
+    """
+    if wire_version(data, offset) != WIRE_V2_CERT_REF:
+        return None
+
+    start = offset + 2
+    digest = bytes(data[start:start + CERTIFICATE_DIGEST_SIZE])
+    if len(digest) != CERTIFICATE_DIGEST_SIZE:
+        raise ValueError("Truncated transaction")
+    return digest
+
+
+def _decode_v2(buf: memoryview, offset: int, certificates=None):
+    """
+    Decode the v2 transaction at `offset` (header included) in one
+    forward pass. Returns (transaction, offset just past it).
+    """
+    o = offset + 2
+    certificate = None
+
+    if buf[offset + 1] == WIRE_V2_CERT_REF:
+        # Resolved before any point is decompressed
+        digest, o = _take(buf, o, CERTIFICATE_DIGEST_SIZE)
+        if certificates is not None:
+            certificate = certificates.get(bytes(digest))
+        if certificate is None:
+            raise ValueError("Unknown device certificate")
+
+    input_serials, o = _take_points(buf, o)
+    input_commitments, o = _take_points(buf, o)
+    output_commitments, o = _take_points(buf, o)
+
+    spend, o = _take(buf, o, COMPRESSED_SPEND_PROOF_SIZE)
+    value, o = _take(buf, o, COMPRESSED_VALUE_PROOF_SIZE)
+    recursive, o = _take(buf, o, COMPRESSED_RECURSIVE_PROOF_SIZE)
+
+    transcript_hash, o = _take(buf, o, _TRANSCRIPT_SIZE)
+    device_signature, o = _take(buf, o, _SIGNATURE_SIZE)
+
+    if certificate is None:
+        pk_device, o = _take(buf, o, _COMPRESSED_POINT_SIZE)
+        cert_id, o = _take_prefixed(buf, o)
+        issued_at, o = _read_varint(buf, o)
+        expires_at, o = _read_varint(buf, o)
+        cert_signature, o = _take(buf, o, _SIGNATURE_SIZE)
+
+        certificate = DeviceCertificate(
+            pk_device=decompress_point(pk_device),
+            cert_id=bytes(cert_id),
+            issued_at=issued_at,
+            expires_at=expires_at,
+            signature=bytes(cert_signature)
+        )
+
+    nonce, o = _take_prefixed(buf, o)
+
+    tx = OfflineTransaction(
         input_serials=input_serials,
         input_commitments=input_commitments,
         output_commitments=output_commitments,
-        spend_proof=spend_proof,
-        value_proof=value_proof,
-        recursive_proof=recursive_proof,
-        transcript_hash=transcript_hash,
-        device_signature=device_signature,
+        spend_proof=deserialize_spend_proof(spend),
+        value_proof=deserialize_value_proof(value),
+        recursive_proof=deserialize_recursive_proof(recursive),
+        transcript_hash=bytes(transcript_hash),
+        device_signature=bytes(device_signature),
         device_certificate=certificate,
-        nonce=nonce
+        nonce=bytes(nonce)
     )
+    return tx, o
+
+
+def deserialize_offline_transaction(data, certificates=None) -> OfflineTransaction:
+    """
+    Decode one transaction of any wire version from bytes, bytearray
+    or a memoryview.
+
+    certificates: digest -> DeviceCertificate lookup (a dict or a
+    wallet.cert_cache.CertificateCache) used to resolve by-reference
+    frames. An unresolvable reference raises ValueError.
+    """
+    return deserialize_offline_transaction_at(data, 0, certificates)[0]
+
+
+def deserialize_offline_transaction_at(data, offset: int = 0, certificates=None):
+    """
+    Decode the transaction (any version) starting at `offset`.
+    Returns (transaction, offset just past it).
+    """
+    buf = memoryview(data)
+
+    if wire_version(buf, offset) != WIRE_V1:
+        return _decode_v2(buf, offset, certificates)
+
+    layout = scan_transaction(buf, offset)
+    return _decode(buf, layout), layout.end
+
+
+def iter_offline_transactions(data, certificates=None) -> Iterator[OfflineTransaction]:
+    """
+    Decode a buffer of concatenated transactions, e.g. a bank ingest
+    file, one transaction at a time. Versions may be mixed.
+    """
+    buf = memoryview(data)
+    offset = 0
+
+    while offset < len(buf):
+        tx, offset = deserialize_offline_transaction_at(buf, offset, certificates)
+        yield tx
@@ -0,0 +1,214 @@
+# transport/transaction_view.py
+
+from functools import cached_property
+from typing import Iterator, List
+
+from crypto.curve import point_from_bytes
+from crypto.device.certificate import DeviceCertificate
+from models.offline_transaction import OfflineTransaction
+from transport.proof_serializer import (
+    deserialize_spend_proof,
+    deserialize_value_proof,
+    deserialize_recursive_proof,
+)
+from transport.transaction_serializer import (
+    WIRE_V1,
+    TransactionLayout,
+    scan_transaction,
+    wire_version,
+    _U64x2,
+    _POINT_SIZE,
+    _SIGNATURE_SIZE,
+)
+
+
+class OfflineTransactionView:
+    """
+    Lazily decoded, read-only view of an encoded OfflineTransaction.
+
+    Only the layout is scanned up front. Each field is decoded (points
+    validated on the curve) the first time it is read and then cached,
+    so checks that need just a few fields (replayed serials, revoked
+    certificates, routing by nonce) never build EC objects for the rest.
+
+    Field names match OfflineTransaction, so a view can be passed to
+    verify_offline_transaction / accept_offline_transaction as is.
+    A point that turns out malformed when first read raises ValueError
+    there; verify_offline_transaction treats that as an invalid
+    transaction.
+
+    Only the v1 wire format has the fixed layout a view reads in place
+    (bank-side files, transaction archives). A v2 transaction (QR and
+    other compact links) raises ValueError; decode it with
+    deserialize_offline_transaction instead.
+
+    The view keeps a reference to the whole underlying buffer.
+    """
+
+    def __init__(self, data, offset: int = 0, layout: TransactionLayout = None):
+        self._buf = memoryview(data)
+
+        if layout is None:
+            if wire_version(self._buf, offset) != WIRE_V1:
+                raise ValueError(
+                    "OfflineTransactionView reads v1 transactions only; "
+                    "use deserialize_offline_transaction for v2"
+                )
+            layout = scan_transaction(self._buf, offset)
+
+        self.layout = layout
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+
+    def _bytes(self, start: int, end: int) -> bytes:
+        return bytes(self._buf[start:end])
+
+    def _keys(self, offset: int, count: int) -> List[bytes]:
+        return [
+            self._bytes(o, o + _POINT_SIZE)
+            for o in range(offset, offset + count * _POINT_SIZE, _POINT_SIZE)
+        ]
+
+    @property
+    def raw(self) -> memoryview:
+        """
+        The encoded transaction itself.
+        """
+        L = self.layout
+        return self._buf[L.input_serials - 4:L.end]
+
+    # --------------------------------------------------
+    # Cheap fields (no EC work)
+    # --------------------------------------------------
+
+    @cached_property
+    def input_serial_keys(self) -> List[bytes]:
+        """
+        64-byte serial keys, as stored in seen-serial sets.
+        """
+        L = self.layout
+        return self._keys(L.input_serials, L.n_input_serials)
+
+    @cached_property
+    def transcript_hash(self) -> bytes:
+        L = self.layout
+        return self._bytes(L.transcript_hash, L.device_signature)
+
+    @cached_property
+    def device_signature(self) -> bytes:
+        L = self.layout
+        return self._bytes(L.device_signature, L.certificate)
+
+    @cached_property
+    def cert_id(self) -> bytes:
+        L = self.layout
+        return self._bytes(L.cert_id, L.cert_id + L.cert_id_len)
+
+    @cached_property
+    def certificate_bytes(self) -> bytes:
+        """
+        Encoded device certificate, e.g. as a certificate cache key.
+        """
+        L = self.layout
+        return self._bytes(L.certificate, L.cert_signature + _SIGNATURE_SIZE)
+
+    @cached_property
+    def nonce(self) -> bytes:
+        L = self.layout
+        return self._bytes(L.nonce, L.end)
+
+    # --------------------------------------------------
+    # Decoded fields
+    # --------------------------------------------------
+
+    @cached_property
+    def input_serials(self) -> list:
+        return [point_from_bytes(k) for k in self.input_serial_keys]
+
+    @cached_property
+    def input_commitments(self) -> list:
+        L = self.layout
+        return [
+            point_from_bytes(k)
+            for k in self._keys(L.input_commitments, L.n_input_commitments)
+        ]
+
+    @cached_property
+    def output_commitments(self) -> list:
+        L = self.layout
+        return [
+            point_from_bytes(k)
+            for k in self._keys(L.output_commitments, L.n_output_commitments)
+        ]
+
+    # Proof points stay encoded until used (LazyPoint validates on access)
+
+    @cached_property
+    def spend_proof(self):
+        L = self.layout
+        return deserialize_spend_proof(
+            self._buf[L.spend_proof:L.value_proof], lazy=True
+        )
+
+    @cached_property
+    def value_proof(self):
+        L = self.layout
+        return deserialize_value_proof(
+            self._buf[L.value_proof:L.recursive_proof], lazy=True
+        )
+
+    @cached_property
+    def recursive_proof(self):
+        L = self.layout
+        return deserialize_recursive_proof(
+            self._buf[L.recursive_proof:L.transcript_hash], lazy=True
+        )
+
+    @cached_property
+    def device_certificate(self) -> DeviceCertificate:
+        L = self.layout
+        issued_at, expires_at = _U64x2.unpack_from(self._buf, L.cert_times)
+
+        return DeviceCertificate(
+            pk_device=point_from_bytes(
+                self._buf[L.certificate:L.certificate + _POINT_SIZE]
+            ),
+            cert_id=self.cert_id,
+            issued_at=issued_at,
+            expires_at=expires_at,
+            signature=self._bytes(
+                L.cert_signature, L.cert_signature + _SIGNATURE_SIZE
+            )
+        )
+
+    def to_transaction(self) -> OfflineTransaction:
+        """
+        Fully decoded OfflineTransaction.
+        """
+        return OfflineTransaction(
+            input_serials=self.input_serials,
+            input_commitments=self.input_commitments,
+            output_commitments=self.output_commitments,
+            spend_proof=self.spend_proof,
+            value_proof=self.value_proof,
+            recursive_proof=self.recursive_proof,
+            transcript_hash=self.transcript_hash,
+            device_signature=self.device_signature,
+            device_certificate=self.device_certificate,
+            nonce=self.nonce
+        )
+
+
+def iter_transaction_views(data) -> Iterator[OfflineTransactionView]:
+    """
+    Lazy views over a buffer of concatenated v1 transactions.
+    """
+    buf = memoryview(data)
+    offset = 0
+
+    while offset < len(buf):
+        view = OfflineTransactionView(buf, offset)
+        yield view
+        offset = view.layout.end
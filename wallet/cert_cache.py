@@ -0,0 +1,154 @@
+# wallet/cert_cache.py
+
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from crypto.device.certificate import DeviceCertificate
+from transport.certificate_serializer import (
+    certificate_digest,
+    deserialize_certificate,
+    serialize_certificate,
+)
+
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_TOUCH_BATCH = 64
+
+
+class CertificateCache:
+    """
+    Receiver-side cache of verified device certificates, keyed by
+    certificate digest and bounded to `capacity` entries (least
+    recently used are evicted first).
+
+    A payer whose certificate is cached can send its digest instead of
+    the full certificate, and its bank signature is not checked again.
+
+    With a WalletDB the cache is reloaded on startup and every change
+    is written through, so it joins the caller's storage transaction.
+    Hits only reorder the cache: their timestamps are buffered and
+    written with the next add(), once `touch_batch` certificates have
+    been hit, or on flush(). Touches lost in a crash only affect
+    eviction order.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        capacity: int = DEFAULT_CAPACITY,
+        touch_batch: int = DEFAULT_TOUCH_BATCH
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if touch_batch < 1:
+            raise ValueError("touch_batch must be positive")
+
+        self.capacity = capacity
+        self.touch_batch = touch_batch
+        self.db = db
+
+        # digest -> certificate, least recently used first
+        self._certs: "OrderedDict[bytes, DeviceCertificate]" = OrderedDict()
+        self._clock = 0
+
+        # digest -> last_used not yet written to the WalletDB
+        self._touched: Dict[bytes, int] = {}
+
+        if db is not None:
+            for digest, encoded, last_used in db.load_certificates():
+                self._certs[digest] = deserialize_certificate(encoded)
+                self._clock = max(self._clock, last_used)
+            self._evict()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _evict(self):
+        evicted = []
+        while len(self._certs) > self.capacity:
+            digest, _ = self._certs.popitem(last=False)
+            self._touched.pop(digest, None)
+            evicted.append(digest)
+
+        if self.db is not None and evicted:
+            self.db.remove_certificates(evicted)
+
+    # --------------------------------------------------
+    # Updates
+    # --------------------------------------------------
+
+    def add(self, cert: DeviceCertificate) -> bytes:
+        """
+        Cache a certificate that has passed verify_device_certificate.
+        Returns its digest.
+        """
+        encoded = serialize_certificate(cert)
+        digest = certificate_digest(encoded)
+
+        self._certs[digest] = cert
+        self._certs.move_to_end(digest)
+        self._touched.pop(digest, None)
+
+        if self.db is not None:
+            with self.db.transaction():
+                self.flush()
+                self.db.save_certificate(digest, encoded, self._tick())
+
+        self._evict()
+        return digest
+
+    def discard(self, digest: bytes):
+        """
+        Drop a certificate, e.g. after its revocation.
+        """
+        self._touched.pop(digest, None)
+        if self._certs.pop(digest, None) is not None and self.db is not None:
+            self.db.remove_certificates([digest])
+
+    def flush(self):
+        """
+        Write buffered hit timestamps to the WalletDB in one statement.
+        """
+        if self.db is None or not self._touched:
+            return
+
+        with self.db.transaction():
+            self.db.touch_certificates(self._touched.items())
+        self._touched.clear()
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+
+    def get(self, digest: bytes) -> Optional[DeviceCertificate]:
+        """
+        Certificate for a digest, or None. A hit counts as a use.
+        """
+        cert = self._certs.get(digest)
+        if cert is None:
+            return None
+
+        self._certs.move_to_end(digest)
+        if self.db is not None:
+            self._touched[digest] = self._tick()
+            if len(self._touched) >= self.touch_batch:
+                self.flush()
+
+        return cert
+
+    def contains_certificate(self, cert: DeviceCertificate) -> bool:
+        """
+        Whether this exact certificate (not just its cert_id) is cached.
+        """
+        try:
+            digest = certificate_digest(cert)
+        except ValueError:
+            return False
+        return digest in self._certs
+
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self._certs
+
+    def __len__(self) -> int:
+        return len(self._certs)
@@ -0,0 +1,200 @@
+# wallet/coin_selection.py
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from models.token import Token
+from wallet.token_store import TokenStore
+
+
+EXACT_MATCH = "exact"
+BRANCH_AND_BOUND = "bnb"
+MIN_CHANGE = "min_change"
+AUTO = "auto"
+
+# TokenLifecycle.spend() takes a single input; pass a larger
+# max_inputs only where the selection is not spent through it
+DEFAULT_MAX_INPUTS = 1
+
+# Upper bound on search nodes, so selection time is bounded by this
+# budget and the number of distinct values, not by wallet size.
+SEARCH_BUDGET = 50_000
+
+
+@dataclass(frozen=True)
+class CoinSelection:
+    tokens: List[Token]
+    total: int
+    change: int
+
+
+def _buckets(
+    store: TokenStore,
+    current_time: int,
+    max_inputs: int
+) -> List[Tuple[int, int]]:
+    """
+    (value, usable count) pairs, largest value first.
+    Counts are capped at max_inputs since no selection can use more.
+    """
+    buckets = []
+
+    for v in reversed(store.unspent_values()):
+        n = store.count_spendable_by_value(v, current_time)
+        if n > 0 and v > 0:
+            buckets.append((v, min(n, max_inputs)))
+
+    return buckets
+
+
+def _search(
+    buckets: List[Tuple[int, int]],
+    amount: int,
+    max_inputs: int,
+    exact: bool
+) -> Tuple[Optional[Dict[int, int]], bool]:
+    """
+    Depth-first search over value buckets.
+
+    exact=True : sum == amount, fewest inputs           (branch-and-bound)
+    exact=False: sum >= amount, least change, then fewest inputs
+
+    Returns (counts or None, whether SEARCH_BUDGET ran out).
+    """
+    # suffix[i] = most value obtainable from buckets[i:] with max_inputs tokens
+    suffix = [0] * (len(buckets) + 1)
+    for i in range(len(buckets) - 1, -1, -1):
+        v, n = buckets[i]
+        suffix[i] = suffix[i + 1] + v * n
+
+    best = None             # (change, inputs, counts)
+    budget = [SEARCH_BUDGET]
+    chosen: Dict[int, int] = {}
+
+    def visit(i: int, total: int, used: int):
+        nonlocal best
+
+        budget[0] -= 1
+        if budget[0] < 0:
+            return
+
+        if total >= amount:
+            change = total - amount
+            if exact and change != 0:
+                return
+            key = (change, used)
+            if best is None or key < best[:2]:
+                best = (change, used, dict(chosen))
+            return
+
+        if i == len(buckets) or used == max_inputs:
+            return
+
+        # Bound: even every remaining token cannot reach the amount
+        if total + suffix[i] < amount:
+            return
+
+        # Bound: cannot beat the best selection found so far
+        if best is not None and best[0] == 0 and used + 1 >= best[1]:
+            return
+
+        v, n = buckets[i]
+        take_max = min(n, max_inputs - used, -(-(amount - total) // v))
+
+        for take in range(take_max, -1, -1):
+            if take:
+                chosen[v] = take
+            else:
+                chosen.pop(v, None)
+            visit(i + 1, total + take * v, used + take)
+
+        chosen.pop(v, None)
+
+    visit(0, 0, 0)
+
+    return (None if best is None else best[2]), budget[0] < 0
+
+
+def _largest(buckets: List[Tuple[int, int]], max_inputs: int) -> Dict[int, int]:
+    """
+    The max_inputs most valuable tokens: the largest total any
+    selection can reach.
+    """
+    counts = {}
+    left = max_inputs
+
+    for v, n in buckets:
+        take = min(n, left)
+        if take:
+            counts[v] = take
+            left -= take
+
+    return counts
+
+
+def select_coins(
+    store: TokenStore,
+    amount: int,
+    current_time: int,
+    strategy: str = AUTO,
+    max_inputs: int = DEFAULT_MAX_INPUTS
+) -> CoinSelection:
+    """
+    Choose input tokens for a payment of `amount`.
+
+    Strategies:
+    - EXACT_MATCH      : one token worth exactly `amount`
+    - BRANCH_AND_BOUND : fewest tokens summing exactly to `amount`
+    - MIN_CHANGE       : smallest overshoot, then fewest tokens
+    - AUTO             : the above in order, first success wins
+
+    Within a value, soonest-expiring tokens are spent first.
+
+    The search is bounded by SEARCH_BUDGET. When it runs out,
+    BRANCH_AND_BOUND fails with its own error (AUTO then moves on to
+    MIN_CHANGE), and MIN_CHANGE falls back to the largest tokens, so
+    "Insufficient spendable funds" always means exactly that.
+    """
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    if max_inputs < 1:
+        raise ValueError("max_inputs must be positive")
+
+    if strategy == AUTO:
+        for s in (EXACT_MATCH, BRANCH_AND_BOUND, MIN_CHANGE):
+            try:
+                return select_coins(store, amount, current_time, s, max_inputs)
+            except ValueError:
+                continue
+        raise ValueError("Insufficient spendable funds")
+
+    if strategy == EXACT_MATCH:
+        tokens = store.get_spendable_by_value(amount, current_time, limit=1)
+        if not tokens:
+            raise ValueError("No token matches the amount exactly")
+        return CoinSelection(tokens=tokens, total=amount, change=0)
+
+    if strategy not in (BRANCH_AND_BOUND, MIN_CHANGE):
+        raise ValueError(f"Unknown coin selection strategy: {strategy}")
+
+    buckets = _buckets(store, current_time, max_inputs)
+    exact = strategy == BRANCH_AND_BOUND
+    counts, exhausted = _search(buckets, amount, max_inputs, exact)
+
+    if counts is None and exhausted:
+        if exact:
+            raise ValueError("Search budget exhausted before an exact match was found")
+
+        counts = _largest(buckets, max_inputs)
+        if sum(v * n for v, n in counts.items()) < amount:
+            counts = None
+
+    if counts is None:
+        raise ValueError("Insufficient spendable funds")
+
+    tokens = []
+    for v, n in sorted(counts.items(), reverse=True):
+        tokens.extend(store.get_spendable_by_value(v, current_time, limit=n))
+
+    total = sum(t.v for t in tokens)
+    return CoinSelection(tokens=tokens, total=total, change=total - amount)
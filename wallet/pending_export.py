@@ -0,0 +1,226 @@
+# wallet/pending_export.py
+
+import os
+import struct
+import zlib
+from typing import Iterable, Iterator, List, Tuple
+
+
+# ==========================================================
+# Record framing (shared by chunk and ack files)
+#
+#   magic     (8)
+#   records:  length u32 | crc32(payload) u32 | payload
+#   end:      length 0xFFFFFFFF | record count u32
+#
+# A file missing its end marker was cut short and is rejected as a
+# whole, so a partial upload is never half-applied.
+#
+# Chunk payload:  serial key 64 | timestamp u64 | proof 96
+# Ack payload:    serial key 64
+# ==========================================================
+
+CHUNK_MAGIC = b"CBDCPND1"
+ACK_MAGIC = b"CBDCACK1"
+
+DEFAULT_RECORDS_PER_CHUNK = 4096
+
+_FRAME = struct.Struct(">II")
+_END = 0xFFFFFFFF
+_U64 = struct.Struct(">Q")
+
+_SERIAL_KEY_SIZE = 64
+_PROOF_SIZE = 96
+_CHUNK_PAYLOAD = _SERIAL_KEY_SIZE + _U64.size + _PROOF_SIZE
+
+
+class _RecordWriter:
+    """
+    Writes one framed file atomically (tmp file, fsync, rename).
+    """
+
+    def __init__(self, path: str, magic: bytes):
+        self.path = path
+        self._tmp_path = path + ".tmp"
+        self._f = open(self._tmp_path, "wb")
+        self._f.write(magic)
+        self.count = 0
+
+    def write(self, payload: bytes):
+        self._f.write(_FRAME.pack(len(payload), zlib.crc32(payload)))
+        self._f.write(payload)
+        self.count += 1
+
+    def close(self):
+        self._f.write(_FRAME.pack(_END, self.count))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._f.close()
+        os.remove(self._tmp_path)
+
+
+def _read_records(path: str, magic: bytes) -> List[bytes]:
+    """
+    Read and check every record of a framed file.
+    Raises ValueError on a bad magic, checksum or missing end marker.
+    """
+    records = []
+
+    with open(path, "rb") as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"Not a {magic.decode()} file: {path}")
+
+        while True:
+            header = f.read(_FRAME.size)
+            if len(header) != _FRAME.size:
+                raise ValueError(f"Truncated file: {path}")
+
+            length, crc = _FRAME.unpack(header)
+            if length == _END:
+                if crc != len(records):
+                    raise ValueError(f"Record count mismatch: {path}")
+                return records
+
+            payload = f.read(length)
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                raise ValueError(f"Corrupt record in {path}")
+
+            records.append(payload)
+
+
+# ==========================================================
+# Device side: export
+# ==========================================================
+
+_CHUNK_PREFIX = "pending-"
+_CHUNK_SUFFIX = ".chunk"
+
+
+def chunk_path(directory: str, index: int) -> str:
+    return os.path.join(directory, f"{_CHUNK_PREFIX}{index:06d}{_CHUNK_SUFFIX}")
+
+
+def _remove_stale_chunks(directory: str, keep: List[str]):
+    """
+    Delete chunk files left in directory by an earlier export.
+    """
+    keep = {os.path.basename(p) for p in keep}
+
+    for name in os.listdir(directory):
+        if not name.startswith(_CHUNK_PREFIX) or name in keep:
+            continue
+        if name.endswith(_CHUNK_SUFFIX) or name.endswith(_CHUNK_SUFFIX + ".tmp"):
+            os.remove(os.path.join(directory, name))
+
+
+def export_pending(
+    store,
+    directory: str,
+    records_per_chunk: int = DEFAULT_RECORDS_PER_CHUNK
+) -> List[str]:
+    """
+    Stream every pending spend of a PendingStore into chunk files of at
+    most records_per_chunk records each. Only one record is held in
+    memory at a time. Chunk files of an earlier export into the same
+    directory are removed once the new ones are written, so the
+    directory only ever holds the current set. Returns the chunk paths
+    in order.
+    """
+    if records_per_chunk < 1:
+        raise ValueError("records_per_chunk must be positive")
+
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    writer = None
+
+    try:
+        for serial_key, proof, timestamp in store.iter_records():
+            if len(serial_key) != _SERIAL_KEY_SIZE or len(proof) != _PROOF_SIZE:
+                raise ValueError("Invalid pending record")
+
+            if writer is None:
+                writer = _RecordWriter(
+                    chunk_path(directory, len(paths)), CHUNK_MAGIC
+                )
+
+            writer.write(serial_key + _U64.pack(timestamp) + proof)
+
+            if writer.count == records_per_chunk:
+                writer.close()
+                paths.append(writer.path)
+                writer = None
+
+        if writer is not None:
+            writer.close()
+            paths.append(writer.path)
+            writer = None
+    finally:
+        if writer is not None:
+            writer.abort()
+
+    _remove_stale_chunks(directory, paths)
+
+    return paths
+
+
+def import_ack(store, path: str) -> int:
+    """
+    Clear every spend acknowledged by a bank ack file.
+    The whole file is checked first, then applied in one transaction.
+    Returns the number of acknowledged serials.
+    """
+    keys = _read_records(path, ACK_MAGIC)
+
+    for key in keys:
+        if len(key) != _SERIAL_KEY_SIZE:
+            raise ValueError(f"Invalid ack record in {path}")
+
+    db = getattr(store, "db", None)
+    if db is not None:
+        with db.transaction():
+            store.clear_keys(keys)
+    else:
+        store.clear_keys(keys)
+
+    return len(keys)
+
+
+# ==========================================================
+# Bank side: read chunks, write acks
+# ==========================================================
+
+def read_chunk(path: str) -> Iterator[Tuple[bytes, int, bytes]]:
+    """
+    Yield (serial_key, timestamp, serialized proof) from a checked chunk.
+    """
+    for payload in _read_records(path, CHUNK_MAGIC):
+        if len(payload) != _CHUNK_PAYLOAD:
+            raise ValueError(f"Invalid pending record in {path}")
+
+        key = payload[:_SERIAL_KEY_SIZE]
+        (timestamp,) = _U64.unpack_from(payload, _SERIAL_KEY_SIZE)
+        proof = payload[_SERIAL_KEY_SIZE + _U64.size:]
+
+        yield key, timestamp, proof
+
+
+def write_ack(path: str, serial_keys: Iterable[bytes]):
+    """
+    Write an acknowledgement file for reconciled serial keys.
+    """
+    writer = _RecordWriter(path, ACK_MAGIC)
+    try:
+        for key in serial_keys:
+            if len(key) != _SERIAL_KEY_SIZE:
+                raise ValueError("Serial keys must be 64 bytes")
+            writer.write(key)
+    except BaseException:
+        writer.abort()
+        raise
+
+    writer.close()
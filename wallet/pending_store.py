@@ -1,8 +1,10 @@
 # wallet/pending_store.py
 
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Tuple
 import time
 
+from crypto.lazy_point import LazyPoint, point_encoding
+
 
 class PendingSpend:
     """
@@ -10,20 +12,28 @@ class PendingSpend:
     that has not yet been reconciled with the bank/RBI.
     """
 
-    def __init__(self, serial, proof):
+    __slots__ = ("_serial", "proof", "timestamp")
+
+    serial = LazyPoint()
+
+    def __init__(self, serial, proof, timestamp=None):
         self.serial = serial          # EC point or serialized form
         self.proof = proof            # RecursiveInvariantProof
-        self.timestamp = int(time.time())
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
 
 
 class PendingStore:
     """
     Tracks all offline spends pending reconciliation.
+
+    With a WalletDB the pending set lives only in the database,
+    so it survives restarts and is never held in memory as a whole.
     """
 
-    def __init__(self):
+    def __init__(self, db=None):
         # serialized_serial -> PendingSpend
         self._pending: Dict[bytes, PendingSpend] = {}
+        self.db = db
 
     @staticmethod
     def _serialize_serial(serial) -> bytes:
@@ -41,23 +51,97 @@ class PendingStore:
         """
         key = self._serialize_serial(serial)
 
+        if self.db is not None:
+            from transport.proof_serializer import serialize_recursive_proof
+
+            spend = PendingSpend(serial, proof)
+            self.db.add_pending(
+                key,
+                serialize_recursive_proof(proof),
+                spend.timestamp
+            )
+            return
+
         if key in self._pending:
             raise ValueError("Spend already recorded as pending")
 
         self._pending[key] = PendingSpend(serial, proof)
 
+    def bulk_load(self, spends: Iterable[PendingSpend]):
+        """
+        Load PendingSpend objects into an empty in-memory store, keeping
+        their serials encoded until first use. Not written through to a
+        WalletDB.
+        """
+        if self._pending:
+            raise ValueError("bulk_load requires an empty store")
+
+        for spend in spends:
+            key = point_encoding(spend, "serial")
+            if key in self._pending:
+                raise ValueError("Spend already recorded as pending")
+            self._pending[key] = spend
+
     def list_pending(self) -> List[PendingSpend]:
         """
         Return all pending spends.
         """
+        if self.db is not None:
+            from transport.proof_serializer import deserialize_recursive_proof
+
+            # Rows come from our own database: keep points encoded
+            # until they are actually used.
+            return [
+                PendingSpend(
+                    key,
+                    deserialize_recursive_proof(proof, lazy=True),
+                    timestamp
+                )
+                for key, proof, timestamp in self.db.iter_pending()
+            ]
+
         return list(self._pending.values())
 
+    def iter_records(self) -> Iterator[Tuple[bytes, bytes, int]]:
+        """
+        Stream (serial_key, serialized proof, timestamp) in serial order,
+        without materializing PendingSpend objects.
+        """
+        from transport.proof_serializer import serialize_recursive_proof
+
+        if self.db is not None:
+            yield from self.db.iter_pending()
+            return
+
+        for key in sorted(self._pending):
+            spend = self._pending[key]
+            yield key, serialize_recursive_proof(spend.proof), spend.timestamp
+
     def clear(self, serial):
         """
         Remove a spend after successful reconciliation.
         """
         key = self._serialize_serial(serial)
+
+        if self.db is not None:
+            self.db.remove_pending(key)
+            return
+
         self._pending.pop(key, None)
 
+    def clear_keys(self, serial_keys: Iterable[bytes]):
+        """
+        Remove many spends by their 64-byte serial keys.
+        """
+        if self.db is not None:
+            self.db.remove_pending_many(serial_keys)
+            return
+
+        for key in serial_keys:
+            self._pending.pop(key, None)
+
     def count(self) -> int:
+        if self.db is not None:
+            return self.db.count_pending()
+
         return len(self._pending)
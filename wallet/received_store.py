@@ -0,0 +1,244 @@
+# wallet/received_store.py
+
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from crypto.curve import decompress_point
+from crypto.hash import serialize_point_fixed, sha256_bytes
+from crypto.lazy_point import LazyPoint, point_encoding
+
+
+def commitment_digest(commitment) -> bytes:
+    """
+    32-byte key of a received commitment: SHA-256 of its 64-byte encoding.
+
+    Accepts a point, its 64-byte encoding, or its 33-byte compressed
+    (v2 wire) encoding, which is normalized so that both encodings of
+    a point share one key.
+    """
+    if isinstance(commitment, (bytes, bytearray, memoryview)):
+        encoded = bytes(commitment)
+        if len(encoded) == 33:
+            encoded = serialize_point_fixed(decompress_point(encoded))
+        elif len(encoded) != 64:
+            raise ValueError("Commitment encoding must be 33 or 64 bytes")
+        return sha256_bytes(encoded)
+    return sha256_bytes(serialize_point_fixed(commitment))
+
+
+class ReceivedToken:
+    """
+    A commitment received in an offline payment, with its provenance.
+    """
+
+    __slots__ = (
+        "_commitment",
+        "digest",
+        "sender_cert_id",
+        "tx_digest",
+        "received_at",
+    )
+
+    commitment = LazyPoint()
+
+    def __init__(
+        self,
+        commitment,
+        digest: bytes,
+        sender_cert_id: Optional[bytes] = None,
+        tx_digest: Optional[bytes] = None,
+        received_at: int = 0
+    ):
+        self.commitment = commitment      # EC point or 64-byte encoding
+        self.digest = digest              # commitment_digest(commitment)
+        self.sender_cert_id = sender_cert_id
+        self.tx_digest = tx_digest        # transcript hash of the payment
+        self.received_at = received_at
+
+
+class ReceivedTokenStore:
+    """
+    Receiver-side store of owned tokens.
+
+    Indexes:
+    - digest -> ReceivedToken
+    - (received_at, digest) pairs sorted by time
+    - sender cert id -> (received_at, digest) pairs sorted by time
+
+    With a WalletDB, tokens are loaded from it on startup and every
+    change is written through.
+    """
+
+    def __init__(self, db=None):
+        self._by_digest: Dict[bytes, ReceivedToken] = {}
+        self._by_time: List[Tuple[int, bytes]] = []
+        self._by_sender: Dict[bytes, List[Tuple[int, bytes]]] = {}
+
+        self.db = db
+        if db is not None:
+            for commitment, sender, tx_digest, received_at in db.load_received():
+                self._index(ReceivedToken(
+                    commitment,
+                    commitment_digest(commitment),
+                    sender,
+                    tx_digest,
+                    received_at
+                ))
+
+    # --------------------------------------------------
+    # Index maintenance
+    # --------------------------------------------------
+
+    def _index(self, token: ReceivedToken):
+        entry = (token.received_at, token.digest)
+
+        self._by_digest[token.digest] = token
+        insort(self._by_time, entry)
+        if token.sender_cert_id is not None:
+            insort(self._by_sender.setdefault(token.sender_cert_id, []), entry)
+
+    def _unindex(self, token: ReceivedToken):
+        entry = (token.received_at, token.digest)
+
+        del self._by_digest[token.digest]
+
+        i = bisect_left(self._by_time, entry)
+        if i < len(self._by_time) and self._by_time[i] == entry:
+            del self._by_time[i]
+
+        bucket = self._by_sender.get(token.sender_cert_id)
+        if bucket is not None:
+            i = bisect_left(bucket, entry)
+            if i < len(bucket) and bucket[i] == entry:
+                del bucket[i]
+            if not bucket:
+                del self._by_sender[token.sender_cert_id]
+
+    # --------------------------------------------------
+    # Updates
+    # --------------------------------------------------
+
+    def add(
+        self,
+        commitment,
+        sender_cert_id: Optional[bytes] = None,
+        tx_digest: Optional[bytes] = None,
+        received_at: Optional[int] = None
+    ) -> ReceivedToken:
+        """
+        Record a received commitment. Receiving the same commitment
+        again returns the existing entry unchanged.
+        """
+        self.add_many([(commitment, sender_cert_id, tx_digest, received_at)])
+        return self._by_digest[commitment_digest(commitment)]
+
+    def add_many(self, entries) -> List[ReceivedToken]:
+        """
+        Record (commitment, sender_cert_id, tx_digest, received_at)
+        tuples with a single database write. Returns the new tokens;
+        commitments already held are skipped.
+        """
+        added = self.prepare_many(entries)
+        self.apply(added)
+        return added
+
+    def prepare_many(self, entries, skip=()) -> List[ReceivedToken]:
+        """
+        Database half of add_many(): build the new tokens and write
+        them (joining the caller's transaction, if any) without
+        indexing them. Pass the result to apply() once the transaction
+        has committed. Digests in `skip` (already staged) are left out.
+        """
+        now = int(time.time())
+        added = []
+        digests = set(skip)
+
+        for commitment, sender_cert_id, tx_digest, received_at in entries:
+            digest = commitment_digest(commitment)
+            if digest in self._by_digest or digest in digests:
+                continue
+
+            added.append(ReceivedToken(
+                commitment,
+                digest,
+                sender_cert_id,
+                tx_digest,
+                now if received_at is None else received_at
+            ))
+            digests.add(digest)
+
+        if self.db is not None and added:
+            self.db.add_received_many(added)
+
+        return added
+
+    def apply(self, tokens: List[ReceivedToken]):
+        """
+        Index tokens returned by prepare_many().
+        """
+        for token in tokens:
+            if token.digest not in self._by_digest:
+                self._index(token)
+
+    def remove(self, digest: bytes) -> ReceivedToken:
+        """
+        Drop a token once it has been re-spent or reconciled.
+        """
+        token = self._by_digest.get(digest)
+        if token is None:
+            raise ValueError("Unknown received token")
+
+        self._unindex(token)
+
+        if self.db is not None:
+            self.db.remove_received(point_encoding(token, "commitment"))
+
+        return token
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+
+    def get(self, digest: bytes) -> Optional[ReceivedToken]:
+        return self._by_digest.get(digest)
+
+    def __contains__(self, commitment) -> bool:
+        return commitment_digest(commitment) in self._by_digest
+
+    def __len__(self) -> int:
+        return len(self._by_digest)
+
+    def __iter__(self) -> Iterator[ReceivedToken]:
+        """
+        Tokens in order of receipt.
+        """
+        for _, digest in self._by_time:
+            yield self._by_digest[digest]
+
+    def commitments(self) -> List:
+        return [t.commitment for t in self]
+
+    def received_between(self, start: int, end: int) -> List[ReceivedToken]:
+        """
+        Tokens received in [start, end).
+        """
+        return self._range(self._by_time, start, end)
+
+    def from_sender(
+        self,
+        sender_cert_id: bytes,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> List[ReceivedToken]:
+        """
+        Tokens received from one device certificate, optionally
+        restricted to [start, end).
+        """
+        bucket = self._by_sender.get(sender_cert_id, [])
+        return self._range(bucket, start, end)
+
+    def _range(self, entries, start, end) -> List[ReceivedToken]:
+        lo = 0 if start is None else bisect_left(entries, (start,))
+        hi = len(entries) if end is None else bisect_left(entries, (end,))
+        return [self._by_digest[d] for _, d in entries[lo:hi]]
@@ -1,5 +1,190 @@
+import copy
+from contextlib import contextmanager, nullcontext
+
+from wallet.cert_cache import CertificateCache
+from wallet.received_store import ReceivedTokenStore
+
+
 class ReceiverWalletState:
-    def __init__(self, proof_state=None):
-        self.seen_serials = set()
-        self.owned_tokens = []
+    def __init__(self, proof_state=None, seen_serials=None, db=None):
+        # With a WalletDB, seen serials, received tokens and the receive
+        # proof state are reloaded from it and persisted on acceptance.
+        self.db = db
+
+        if db is not None:
+            from wallet.wallet_db import RECEIVE_PROOF_STATE
+
+            if seen_serials is None:
+                seen_serials = db.seen_serials()
+            if proof_state is None:
+                proof_state = db.load_proof_state(RECEIVE_PROOF_STATE)
+
+        # Any set-like container with forget() or discard() works, e.g.
+        # storage.serial_store.SerialStore to keep seen serials across
+        # restarts; a rolled-back acceptance takes its serials back out.
+        if seen_serials is None:
+            seen_serials = set()
+        if not hasattr(seen_serials, "forget") and \
+                not hasattr(seen_serials, "discard"):
+            raise ValueError("seen_serials must support forget() or discard()")
+        self.seen_serials = seen_serials
+        self.owned_tokens = ReceivedTokenStore(db=db)
+        # Verified payer certificates, for certificate-by-reference
+        # payments (see transport.transaction_serializer.WIRE_V2_CERT_REF)
+        self.cert_cache = CertificateCache(db=db)
         self.proof_state = proof_state
+
+    def transaction(self):
+        """
+        Atomic scope for an acceptance (no-op without a WalletDB).
+        """
+        if self.db is None:
+            return nullcontext()
+        return self.db.transaction()
+
+    @contextmanager
+    def changes(self):
+        """
+        Stage one acceptance:
+
+            with receiver_state.changes() as changes:
+                changes.add_serials(serial_keys)
+                changes.add_owned_tokens(entries)
+                changes.add_outputs(commitments)
+
+        With a WalletDB, serials, received tokens and the proof state
+        are written in one transaction. Owned tokens and the proof
+        state change in memory only after it commits; if the block (or
+        the commit) fails, the serials it added are taken back out of
+        seen_serials, so memory matches the database again.
+        """
+        # Earlier buffered serials commit on their own, not with (and
+        # not rolled back with) this acceptance
+        if hasattr(self.seen_serials, "flush"):
+            self.seen_serials.flush()
+
+        staged = _StagedAcceptance(self)
+
+        try:
+            with self.transaction():
+                yield staged
+                self.persist(staged.proof_state)
+        except BaseException:
+            staged.forget_serials()
+            raise
+
+        self.owned_tokens.apply(staged.tokens)
+
+        if staged.proof_state is not None:
+            self.proof_state.C_in_total = staged.proof_state.C_in_total
+            self.proof_state.C_out_total = staged.proof_state.C_out_total
+            self.proof_state.r_in_total = staged.proof_state.r_in_total
+            self.proof_state.r_out_total = staged.proof_state.r_out_total
+
+    def add_owned_token(
+        self,
+        commitment,
+        sender_cert_id=None,
+        tx_digest=None,
+        received_at=None
+    ):
+        return self.owned_tokens.add(
+            commitment,
+            sender_cert_id=sender_cert_id,
+            tx_digest=tx_digest,
+            received_at=received_at
+        )
+
+    def add_owned_tokens(self, entries):
+        """
+        entries: (commitment, sender_cert_id, tx_digest, received_at) tuples
+        """
+        return self.owned_tokens.add_many(entries)
+
+    def persist(self, proof_state=None):
+        """
+        Write buffered serials, certificate cache hits and the proof
+        state (or the given staged one) to the WalletDB.
+        """
+        if self.db is None:
+            return
+
+        from wallet.wallet_db import RECEIVE_PROOF_STATE
+
+        if hasattr(self.seen_serials, "flush"):
+            self.seen_serials.flush()
+        self.cert_cache.flush()
+
+        if proof_state is None:
+            proof_state = self.proof_state
+        if proof_state is not None:
+            self.db.save_proof_state(RECEIVE_PROOF_STATE, proof_state)
+
+
+class _Output:
+    """
+    Received commitment as ProofState expects it; the receiver does not
+    know the blinding factor.
+    """
+
+    def __init__(self, C):
+        self.C = C
+        self.r = 0
+
+
+class _StagedAcceptance:
+    """
+    Changes collected by ReceiverWalletState.changes().
+    """
+
+    def __init__(self, receiver: ReceiverWalletState):
+        self._receiver = receiver
+        self.serials = []
+        self.tokens = []
+        self.proof_state = None
+
+        # A plain set cannot forget just a rolled-back write, so note
+        # which serials it did not hold yet
+        self._forget = getattr(receiver.seen_serials, "forget", None)
+        self._new_serials = []
+
+    def add_serials(self, serial_keys):
+        seen = self._receiver.seen_serials
+
+        for key in serial_keys:
+            if self._forget is None and key not in seen:
+                self._new_serials.append(key)
+            seen.add(key)
+            self.serials.append(key)
+
+    def add_owned_tokens(self, entries):
+        """
+        entries: (commitment, sender_cert_id, tx_digest, received_at) tuples
+        """
+        self.tokens += self._receiver.owned_tokens.prepare_many(
+            entries,
+            skip=[t.digest for t in self.tokens]
+        )
+
+    def add_outputs(self, commitments):
+        """
+        Fold output commitments into a staged copy of the proof state.
+        """
+        live = self._receiver.proof_state
+        if live is None:
+            return
+
+        if self.proof_state is None:
+            self.proof_state = copy.copy(live)
+
+        self.proof_state.update_from_spend(
+            input_tokens=[],          # receiver consumes nothing
+            output_tokens=[_Output(C) for C in commitments]
+        )
+
+    def forget_serials(self):
+        if self._forget is not None:
+            self._forget(self.serials)
+        else:
+            for key in self._new_serials:
+                self._receiver.seen_serials.discard(key)
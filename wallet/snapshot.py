@@ -0,0 +1,286 @@
+# wallet/snapshot.py
+
+import hashlib
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from crypto.curve import (
+    ORDER,
+    compress_point,
+    decompress_point,
+    point_from_bytes,
+)
+from crypto.hash import serialize_point_fixed
+from crypto.state.proof_state import ProofState
+from crypto.zkp.recursive import RecursiveInvariantProof
+from models.token import Token
+from models.token_state import TokenState
+from wallet.pending_store import PendingSpend, PendingStore
+from wallet.token_store import TokenStore
+
+
+# ==========================================================
+# Snapshot format (all integers big-endian)
+#
+#   magic        (8)   b"CBDCSNAP"
+#   version      (2)
+#   flags        (2)   bit 0: points compressed (33) else x||y (64)
+#
+#   has_state    (1)
+#   [C_in P | C_out P | r_in 32 | r_out 32]
+#
+#   n_tokens     (4)
+#   per token:   serial 32 | commitment P | expiry 8 | v 8 |
+#                r 32 | s 32 | state 1 | sig_len 2 | signature
+#                (sig_len 0xFFFF = no signature)
+#
+#   n_pending    (4)
+#   per entry:   serial P | proof.A P | proof.z 32 | timestamp 8
+#
+#   n_seen       (4)
+#   per serial:  key 64
+#
+#   sha256       (32)  over everything above
+#
+# P is 33 or 64 bytes depending on the flag. Scalars are fixed
+# 32-byte values reduced mod ORDER where they are blinding totals.
+# ==========================================================
+
+SNAPSHOT_MAGIC = b"CBDCSNAP"
+SNAPSHOT_VERSION = 1
+
+FLAG_COMPRESSED = 0x0001
+
+_HEADER = struct.Struct(">8sHH")
+_COUNT = struct.Struct(">I")
+_TOKEN_FIXED = struct.Struct(">QQ")     # expiry, v
+_TOKEN_TAIL = struct.Struct(">BH")      # state, sig_len
+_U64 = struct.Struct(">Q")
+
+_NO_SIGNATURE = 0xFFFF
+
+
+@dataclass
+class WalletSnapshot:
+    proof_state: Optional[ProofState]
+    token_store: TokenStore
+    pending_store: PendingStore
+    seen_serials: set = field(default_factory=set)
+
+
+def _scalar(x: int) -> bytes:
+    return x.to_bytes(32, "big")
+
+
+def write_snapshot(
+    path: str,
+    proof_state: Optional[ProofState] = None,
+    token_store: Optional[TokenStore] = None,
+    pending_store: Optional[PendingStore] = None,
+    seen_serials: Iterable = (),
+    compressed: bool = False
+):
+    """
+    Atomically write a versioned, checksummed wallet snapshot.
+
+    Points are stored as x||y by default. compressed=True saves only
+    about 12% of the file (most of a token record is scalars), but
+    every point then costs a modular square root to load, making
+    restore roughly ten times slower. Use it only where file size
+    matters more than cold-start time.
+    """
+    enc = compress_point if compressed else serialize_point_fixed
+    out = bytearray()
+
+    out += _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        FLAG_COMPRESSED if compressed else 0
+    )
+
+    # Proof state
+    if proof_state is None:
+        out.append(0)
+    else:
+        out.append(1)
+        out += enc(proof_state.C_in_total)
+        out += enc(proof_state.C_out_total)
+        out += _scalar(proof_state.r_in_total % ORDER)
+        out += _scalar(proof_state.r_out_total % ORDER)
+
+    # Tokens
+    tokens = list(token_store.all_tokens().values()) if token_store else []
+    out += _COUNT.pack(len(tokens))
+
+    for token, state in tokens:
+        if state == TokenState.RESERVED:
+            # Reservations do not outlive the process
+            state = TokenState.UNSPENT
+
+        out += _scalar(token.serial)
+        out += enc(token.commitment)
+        out += _TOKEN_FIXED.pack(token.expiry, token.v)
+        out += _scalar(token.r)
+        out += _scalar(token.s)
+
+        sig = token.signature
+        out += _TOKEN_TAIL.pack(
+            state.value,
+            _NO_SIGNATURE if sig is None else len(sig)
+        )
+        if sig is not None:
+            out += sig
+
+    # Pending spends
+    pending = pending_store.list_pending() if pending_store else []
+    out += _COUNT.pack(len(pending))
+
+    for p in pending:
+        out += enc(p.serial)
+        out += enc(p.proof.A)
+        out += _scalar(p.proof.z)
+        out += _U64.pack(p.timestamp)
+
+    # Seen serials (already 64-byte keys)
+    seen = list(seen_serials)
+    out += _COUNT.pack(len(seen))
+    for key in seen:
+        if len(key) != 64:
+            raise ValueError("Seen serial keys must be 64 bytes")
+        out += key
+
+    out += hashlib.sha256(out).digest()
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(out)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> WalletSnapshot:
+    """
+    Load a snapshot with a single read and rebuild wallet state from it.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if len(data) < _HEADER.size + 32:
+        raise ValueError("Truncated snapshot")
+
+    if hashlib.sha256(memoryview(data)[:-32]).digest() != data[-32:]:
+        raise ValueError("Snapshot checksum mismatch")
+
+    buf = memoryview(data)[:-32]
+
+    magic, version, flags = _HEADER.unpack_from(buf, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a wallet snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    if flags & FLAG_COMPRESSED:
+        dec, psize = decompress_point, 33
+    else:
+        dec, psize = point_from_bytes, 64
+
+    off = _HEADER.size
+
+    def scalar(o):
+        return int.from_bytes(buf[o:o + 32], "big")
+
+    # Proof state
+    proof_state = None
+    has_state = buf[off]
+    off += 1
+
+    if has_state:
+        proof_state = ProofState(
+            C_in_total=dec(buf[off:off + psize]),
+            C_out_total=dec(buf[off + psize:off + 2 * psize]),
+            r_in_total=scalar(off + 2 * psize),
+            r_out_total=scalar(off + 2 * psize + 32)
+        )
+        off += 2 * psize + 64
+
+    # Tokens
+    (n_tokens,) = _COUNT.unpack_from(buf, off)
+    off += _COUNT.size
+
+    entries = []
+    for _ in range(n_tokens):
+        serial = scalar(off)
+        off += 32
+        commitment = dec(buf[off:off + psize])
+        off += psize
+        expiry, v = _TOKEN_FIXED.unpack_from(buf, off)
+        off += _TOKEN_FIXED.size
+        r = scalar(off)
+        s = scalar(off + 32)
+        off += 64
+        state, sig_len = _TOKEN_TAIL.unpack_from(buf, off)
+        off += _TOKEN_TAIL.size
+
+        signature = None
+        if sig_len != _NO_SIGNATURE:
+            signature = bytes(buf[off:off + sig_len])
+            off += sig_len
+
+        entries.append((
+            Token(
+                serial=serial,
+                commitment=commitment,
+                expiry=expiry,
+                signature=signature,
+                v=v,
+                r=r,
+                s=s
+            ),
+            TokenState(state)
+        ))
+
+    token_store = TokenStore()
+    token_store.bulk_load(entries)
+
+    # Pending spends
+    (n_pending,) = _COUNT.unpack_from(buf, off)
+    off += _COUNT.size
+
+    spends = []
+    for _ in range(n_pending):
+        # Kept encoded; decoded by LazyPoint on first use
+        serial = bytes(buf[off:off + psize])
+        A = bytes(buf[off + psize:off + 2 * psize])
+        off += 2 * psize
+        z = scalar(off)
+        off += 32
+        (timestamp,) = _U64.unpack_from(buf, off)
+        off += _U64.size
+
+        spends.append(
+            PendingSpend(serial, RecursiveInvariantProof(A, z), timestamp)
+        )
+
+    pending_store = PendingStore()
+    pending_store.bulk_load(spends)
+
+    # Seen serials
+    (n_seen,) = _COUNT.unpack_from(buf, off)
+    off += _COUNT.size
+
+    seen = {bytes(buf[o:o + 64]) for o in range(off, off + 64 * n_seen, 64)}
+    off += 64 * n_seen
+
+    if off != len(buf):
+        raise ValueError("Trailing bytes in snapshot")
+
+    return WalletSnapshot(
+        proof_state=proof_state,
+        token_store=token_store,
+        pending_store=pending_store,
+        seen_serials=seen
+    )
@@ -10,14 +10,25 @@ from crypto.hash import (
 SPEND_TRANSCRIPT_VERSION = b"offline-cbdc-spend-v1"
 
 
+def _proof_fields(obj):
+    """
+    Public field names of a proof object. Slotted proofs keep lazy
+    points in "_<name>" slots, which are reported under <name>.
+    """
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__.keys()
+
+    return [name.lstrip("_") for name in type(obj).__slots__]
+
+
 def _serialize_proof(obj) -> bytes:
     """
-    Deterministically serialize a proof object by hashing its __dict__.
+    Deterministically serialize a proof object by hashing its fields.
     """
     items = []
 
-    for k in sorted(obj.__dict__.keys()):
-        v = obj.__dict__[k]
+    for k in sorted(_proof_fields(obj)):
+        v = getattr(obj, k)
 
         if isinstance(v, int):
             items.append(serialize_int(v))
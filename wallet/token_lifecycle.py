@@ -1,6 +1,8 @@
-from typing import List, Tuple
+import copy
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 from models.token import Token
-from models.token_state import TokenState
 from wallet.token_store import TokenStore
 
 from crypto.state.proof_state import ProofState
@@ -21,15 +23,57 @@ from crypto.curve import random_scalar, ORDER
 from crypto.hash import sha256_int, serialize_point
 
 
+def split_into_notes(amount: int) -> List[int]:
+    """
+    Split an amount into ALLOWED_DENOMINATIONS notes, largest first.
+    Greedy is optimal for this (canonical) denomination set.
+    """
+    from crypto.zkp.mint import ALLOWED_DENOMINATIONS
+
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+
+    notes = []
+    for d in sorted(ALLOWED_DENOMINATIONS, reverse=True):
+        n, amount = divmod(amount, d)
+        notes.extend([d] * n)
+
+    return notes
+
+
+def _prepare_note(v: int):
+    """
+    Commitment and mint proof for one note (runs in a worker process).
+    """
+    from crypto.commitment import commit
+    from crypto.zkp.mint import prove_minting
+
+    r = random_scalar()
+    C = commit(v, r)
+    return v, r, C, prove_minting(v, r, C)
+
+
 class TokenLifecycle:
     """
     Handles token minting, consumption, and derivation during offline spending.
+
+    spend() is safe to call from several threads on one wallet. Inputs
+    are reserved up front so no two spends can take the same token;
+    ownership and value proofs are generated without any lock held, and
+    only the commit phase (proof-state update and store writes) runs
+    under the commit lock.
     """
 
     def __init__(self, store: TokenStore, proof_state: ProofState):
         self.store = store
         self.proof_state = proof_state
 
+        # Serializes the commit phase of concurrent spends
+        self._commit_lock = threading.Lock()
+
+        # Persistent wallets share the store's WalletDB
+        self.db = getattr(store, "db", None)
+
     # ==================================================
     # STEP 6.2 — WALLET MINT FLOW
     # ==================================================
@@ -66,6 +110,60 @@ class TokenLifecycle:
         self.store.add_token(wallet_token)
         return wallet_token
 
+    def mint_many(
+        self,
+        amount: int,
+        expiry: int,
+        bank_public_key,
+        bank_mint_batch_fn,
+        max_workers: Optional[int] = None
+    ) -> List[Token]:
+        """
+        Top up `amount` as a batch of notes.
+
+        Commitments and mint proofs are generated in parallel on a
+        process pool, sent to the bank in one request
+        (bank_mint_batch_fn([(C, proof), ...]) -> bank tokens, in order),
+        and the signed tokens are stored in one transaction.
+        """
+        notes = split_into_notes(amount)
+
+        if len(notes) == 1 or max_workers == 1:
+            prepared = [_prepare_note(v) for v in notes]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                prepared = list(pool.map(_prepare_note, notes))
+
+        bank_tokens = bank_mint_batch_fn([(C, proof) for _, _, C, proof in prepared])
+
+        if len(bank_tokens) != len(prepared):
+            raise ValueError("Bank returned the wrong number of tokens")
+
+        wallet_tokens = []
+
+        for (v, r, C, _), bank_token in zip(prepared, bank_tokens):
+            if bank_token.commitment != C:
+                raise ValueError("Bank token does not match submitted commitment")
+
+            if not bank_token.verify_bank_signature(bank_public_key):
+                raise ValueError("Invalid bank signature on minted token")
+
+            wallet_tokens.append(Token(
+                serial=bank_token.serial,
+                commitment=bank_token.commitment,
+                expiry=bank_token.expiry,
+                signature=bank_token.signature,
+                v=v,
+                r=r,
+                s=bank_token.serial
+            ))
+
+        with self.store.changes() as changes:
+            for token in wallet_tokens:
+                changes.add_token(token)
+
+        return wallet_tokens
+
     # ==================================================
     # STEP 7 — OFFLINE SPEND (ATOMIC + CORRECT)
     # ==================================================
@@ -83,22 +181,33 @@ class TokenLifecycle:
         RecursiveInvariantProof
     ]:
 
+        if len(input_serials) != 1:
+            raise NotImplementedError("Prototype supports single-input spends")
+
         # ==================================================
-        # PHASE 1 — COMPUTE (NO STATE MUTATION)
+        # PHASE 0 — RESERVE INPUTS (optimistic lock per token)
         # ==================================================
 
-        input_tokens = []
+        input_tokens = self.store.reserve(input_serials)
 
-        for serial in input_serials:
-            state = self.store.get_token_state(serial)
-            if state != TokenState.UNSPENT:
-                raise ValueError(f"Token {serial} is not spendable")
+        try:
+            result = self._spend_reserved(input_tokens, v_out, v_change, expiry)
+        except BaseException:
+            self.store.release(input_serials)
+            raise
 
-            token, _ = self.store._tokens[serial]
-            input_tokens.append(token)
+        return result
 
-        if len(input_tokens) != 1:
-            raise NotImplementedError("Prototype supports single-input spends")
+    def _spend_reserved(
+        self,
+        input_tokens: List[Token],
+        v_out: int,
+        v_change: int,
+        expiry: int
+    ):
+        # ==================================================
+        # PHASE 1 — COMPUTE (NO LOCK, NO STATE MUTATION)
+        # ==================================================
 
         t_in = input_tokens[0]
 
@@ -183,20 +292,41 @@ class TokenLifecycle:
         ]
 
         # ==================================================
-        # PHASE 2 — COMMIT
+        # PHASE 2 — COMMIT (serialized, one atomic transaction)
         # ==================================================
 
-        self.proof_state.update_from_spend(
-            input_tokens=input_wrapped,
-            output_tokens=output_wrapped
-        )
-
-        recursive_proof = prove_recursive_invariant(self.proof_state)
-
-        self.store.mark_spent(t_in.serial)
-
-        for t in derived_tokens:
-            self.store.add_token(t)
+        # The recursive proof covers the cumulative proof state, so it
+        # belongs to the commit: it must see every earlier spend.
+        with self._commit_lock:
+            for t in derived_tokens:
+                if self.store.get_token(t.serial) is not None:
+                    raise ValueError("Derived token serial already exists in store")
+
+            # Work on a copy so a failed commit leaves the live state untouched
+            new_state = copy.copy(self.proof_state)
+            new_state.update_from_spend(
+                input_tokens=input_wrapped,
+                output_tokens=output_wrapped
+            )
+
+            recursive_proof = prove_recursive_invariant(new_state)
+
+            # Store rows and proof state commit together; memory
+            # follows only once they have
+            with self.store.changes() as changes:
+                changes.mark_spent(t_in.serial)
+
+                for t in derived_tokens:
+                    changes.add_token(t)
+
+                if self.db is not None:
+                    from wallet.wallet_db import SPEND_PROOF_STATE
+                    self.db.save_proof_state(SPEND_PROOF_STATE, new_state)
+
+            self.proof_state.C_in_total = new_state.C_in_total
+            self.proof_state.C_out_total = new_state.C_out_total
+            self.proof_state.r_in_total = new_state.r_in_total
+            self.proof_state.r_out_total = new_state.r_out_total
 
         return (
             derived_tokens,
@@ -1,81 +1,385 @@
 # wallet/token_store.py
 
-from typing import Dict, List
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 from models.token import Token
 from models.token_state import TokenState
 
 
+def _expiry_of(entry: Tuple[int, int]) -> int:
+    return entry[0]
+
+
 class TokenStore:
     """
     Local wallet storage for Digital Rupee tokens.
     Tracks tokens and their lifecycle state.
+
+    Secondary indexes cover UNSPENT tokens only:
+    - a set of unspent serials
+    - (expiry, serial) pairs sorted by expiry
+    - value -> (expiry, serial) pairs sorted by expiry
+
+    With a WalletDB, tokens are loaded from it on startup and every
+    state change is written through.
+
+    All methods are thread-safe. reserve() takes tokens out of the
+    spendable set for an in-flight spend (RESERVED); the spend then
+    either commits with mark_spent() or hands them back with release().
+    Reservations are in-memory only and never written to the WalletDB,
+    so a crash simply returns reserved tokens to UNSPENT.
     """
 
-    def __init__(self):
+    def __init__(self, seen_serials=None, db=None):
         # Maps token serial -> (Token, TokenState)
         self._tokens: Dict[int, tuple[Token, TokenState]] = {}
-        self.seen_serials = set()
+
+        # Set-like; pass a SerialStore to persist across restarts
+        self.seen_serials = seen_serials if seen_serials is not None else set()
+
+        self._unspent = set()
+        self._by_expiry: List[Tuple[int, int]] = []
+        self._by_value: Dict[int, List[Tuple[int, int]]] = {}
+
+        self._lock = threading.RLock()
+
+        self.db = db
+        if db is not None:
+            for token, state in db.load_tokens():
+                self._tokens[token.serial] = (token, state)
+                if state == TokenState.UNSPENT:
+                    self._index(token)
+
+    # --------------------------------------------------
+    # Index maintenance
+    # --------------------------------------------------
+
+    def _index(self, token: Token):
+        entry = (token.expiry, token.serial)
+
+        self._unspent.add(token.serial)
+        insort(self._by_expiry, entry)
+        insort(self._by_value.setdefault(token.v, []), entry)
+
+    def _unindex(self, token: Token):
+        entry = (token.expiry, token.serial)
+
+        self._unspent.discard(token.serial)
+
+        i = bisect_left(self._by_expiry, entry)
+        if i < len(self._by_expiry) and self._by_expiry[i] == entry:
+            del self._by_expiry[i]
+
+        bucket = self._by_value.get(token.v)
+        if bucket is not None:
+            i = bisect_left(bucket, entry)
+            if i < len(bucket) and bucket[i] == entry:
+                del bucket[i]
+            if not bucket:
+                del self._by_value[token.v]
+
+    def bulk_load(self, entries):
+        """
+        Load (Token, TokenState) pairs into an empty store, building the
+        indexes with one sort instead of one insertion per token.
+        Not written through to a WalletDB.
+        """
+        with self._lock:
+            if self._tokens:
+                raise ValueError("bulk_load requires an empty store")
+
+            for token, state in entries:
+                self._tokens[token.serial] = (token, state)
+
+            unspent = sorted(
+                (token.expiry, serial, token.v)
+                for serial, (token, state) in self._tokens.items()
+                if state == TokenState.UNSPENT
+            )
+
+            for expiry, serial, v in unspent:
+                self._unspent.add(serial)
+                self._by_expiry.append((expiry, serial))
+                self._by_value.setdefault(v, []).append((expiry, serial))
+
+    # --------------------------------------------------
+    # Lifecycle transitions
+    # --------------------------------------------------
 
     def add_token(self, token: Token):
         """
         Add a newly received token to the wallet as UNSPENT.
         """
-        if token.serial in self._tokens:
-            raise ValueError("Token with this serial already exists in store")
+        with self._lock:
+            if token.serial in self._tokens:
+                raise ValueError("Token with this serial already exists in store")
+
+            if self.db is not None:
+                self.db.save_token(token, TokenState.UNSPENT)
+
+            self._tokens[token.serial] = (token, TokenState.UNSPENT)
+            self._index(token)
+
+    @contextmanager
+    def changes(self):
+        """
+        Stage several transitions as one unit:
+
+            with store.changes() as changes:
+                changes.mark_spent(serial)
+                changes.add_token(token)
+
+        With a WalletDB every row is written in one transaction (other
+        writes made inside the block join it), and the in-memory state
+        changes only once that transaction has committed. If the block
+        raises, both are left as they were.
+
+        Raises ValueError if the calling thread already has a WalletDB
+        transaction open: it would commit after memory is updated.
+        """
+        if self.db is not None and self.db.in_transaction:
+            raise ValueError("changes() must not run inside an open WalletDB transaction")
+
+        with self._lock:
+            staged = _StagedChanges(self)
+
+            if self.db is not None:
+                with self.db.transaction():
+                    yield staged
+            else:
+                yield staged
+
+            for serial in staged.spent:
+                token = self._tokens[serial][0]
+                self._tokens[serial] = (token, TokenState.SPENT)
+                self._unindex(token)
+
+            for token in staged.added:
+                self._tokens[token.serial] = (token, TokenState.UNSPENT)
+                self._index(token)
+
+    def reserve(self, serials: List[int]) -> List[Token]:
+        """
+        Atomically move UNSPENT tokens to RESERVED for an in-flight spend.
+        Either every serial is reserved or none is.
+        """
+        with self._lock:
+            tokens = []
+
+            for serial in serials:
+                entry = self._tokens.get(serial)
+                if entry is None or entry[1] != TokenState.UNSPENT:
+                    raise ValueError(f"Token {serial} is not spendable")
+                tokens.append(entry[0])
+
+            if len(set(serials)) != len(serials):
+                raise ValueError("Duplicate input serial")
+
+            for token in tokens:
+                self._tokens[token.serial] = (token, TokenState.RESERVED)
+                self._unindex(token)
+
+            return tokens
+
+    def release(self, serials: List[int]):
+        """
+        Return RESERVED tokens to UNSPENT after an abandoned spend.
+        Tokens no longer RESERVED are left as they are.
+        """
+        with self._lock:
+            for serial in serials:
+                entry = self._tokens.get(serial)
+                if entry is None or entry[1] != TokenState.RESERVED:
+                    continue
 
-        self._tokens[token.serial] = (token, TokenState.UNSPENT)
+                token = entry[0]
+                self._tokens[serial] = (token, TokenState.UNSPENT)
+                self._index(token)
 
     def mark_spent(self, serial: int):
         """
-        Mark a token as SPENT after it has been consumed.
+        Mark an UNSPENT or RESERVED token as SPENT after it has been consumed.
         """
-        if serial not in self._tokens:
-            raise KeyError("Token not found in store")
+        with self._lock:
+            if serial not in self._tokens:
+                raise KeyError("Token not found in store")
 
-        token, state = self._tokens[serial]
+            token, state = self._tokens[serial]
 
-        if state != TokenState.UNSPENT:
-            raise ValueError("Only UNSPENT tokens can be marked as SPENT")
+            if state not in (TokenState.UNSPENT, TokenState.RESERVED):
+                raise ValueError("Only UNSPENT tokens can be marked as SPENT")
+
+            if self.db is not None:
+                self.db.set_token_state(serial, TokenState.SPENT)
 
-        self._tokens[serial] = (token, TokenState.SPENT)
+            self._tokens[serial] = (token, TokenState.SPENT)
+            self._unindex(token)
 
     def mark_expired(self, serial: int):
         """
         Mark a token as EXPIRED.
+
+        RESERVED tokens belong to an in-flight spend and are rejected;
+        release() them first.
         """
-        if serial not in self._tokens:
-            raise KeyError("Token not found in store")
+        with self._lock:
+            if serial not in self._tokens:
+                raise KeyError("Token not found in store")
+
+            token, state = self._tokens[serial]
 
-        token, state = self._tokens[serial]
+            if state == TokenState.SPENT:
+                return  # spent tokens stay spent
+
+            if state == TokenState.RESERVED:
+                raise ValueError("Reserved tokens cannot be marked as EXPIRED")
+
+            if self.db is not None:
+                self.db.set_token_state(serial, TokenState.EXPIRED)
+
+            self._tokens[serial] = (token, TokenState.EXPIRED)
+            self._unindex(token)
+
+    def expire_until(self, current_time: int) -> List[int]:
+        """
+        Move every UNSPENT token with expiry <= current_time to EXPIRED
+        in one pass over the expiry index. Returns the expired serials.
+        """
+        with self._lock:
+            cut = bisect_right(self._by_expiry, current_time, key=_expiry_of)
+            expired = self._by_expiry[:cut]
 
-        if state == TokenState.SPENT:
-            return  # spent tokens stay spent
+            if self.db is not None:
+                with self.db.transaction():
+                    self.db.set_token_states(
+                        (serial for _, serial in expired),
+                        TokenState.EXPIRED
+                    )
 
-        self._tokens[serial] = (token, TokenState.EXPIRED)
+            del self._by_expiry[:cut]
+
+            for _, serial in expired:
+                token, _ = self._tokens[serial]
+                self._tokens[serial] = (token, TokenState.EXPIRED)
+                self._unspent.discard(serial)
+
+                bucket = self._by_value[token.v]
+                del bucket[bisect_left(bucket, (token.expiry, serial))]
+                if not bucket:
+                    del self._by_value[token.v]
+
+            return [serial for _, serial in expired]
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
 
     def get_unspent_tokens(self, current_time: int) -> List[Token]:
         """
-        Return all tokens that are UNSPENT and not expired.
+        Return all tokens that are UNSPENT and not expired,
+        soonest-expiring first.
         """
-        unspent = []
+        with self._lock:
+            start = bisect_right(self._by_expiry, current_time, key=_expiry_of)
 
-        for token, state in self._tokens.values():
-            if state == TokenState.UNSPENT and not token.is_expired(current_time):
-                unspent.append(token)
+            return [
+                self._tokens[serial][0]
+                for _, serial in self._by_expiry[start:]
+            ]
 
-        return unspent
+    def get_spendable_by_value(
+        self,
+        v: int,
+        current_time: int,
+        limit: Optional[int] = None
+    ) -> List[Token]:
+        """
+        Return spendable tokens of exactly value v, soonest-expiring first.
+        """
+        with self._lock:
+            bucket = self._by_value.get(v, [])
+            start = bisect_right(bucket, current_time, key=_expiry_of)
+            end = len(bucket) if limit is None else start + limit
+
+            return [self._tokens[serial][0] for _, serial in bucket[start:end]]
+
+    def count_spendable_by_value(self, v: int, current_time: int) -> int:
+        """
+        Number of spendable tokens of value v, without materializing them.
+        """
+        with self._lock:
+            bucket = self._by_value.get(v, [])
+            return len(bucket) - bisect_right(bucket, current_time, key=_expiry_of)
+
+    def unspent_values(self) -> List[int]:
+        """
+        Distinct values held by at least one UNSPENT token, ascending.
+        """
+        with self._lock:
+            return sorted(self._by_value)
+
+    def count_unspent(self) -> int:
+        with self._lock:
+            return len(self._unspent)
 
     def get_token_state(self, serial: int) -> TokenState:
         """
         Get the lifecycle state of a token.
         """
-        if serial not in self._tokens:
-            raise KeyError("Token not found in store")
+        with self._lock:
+            if serial not in self._tokens:
+                raise KeyError("Token not found in store")
+
+            return self._tokens[serial][1]
 
-        return self._tokens[serial][1]
+    def get_token(self, serial: int) -> Optional[Token]:
+        with self._lock:
+            entry = self._tokens.get(serial)
+            return None if entry is None else entry[0]
 
     def all_tokens(self):
         """
         Return all tokens with their states (for debugging / reconciliation prep).
+        Read-only live view; no copy is made, so do not iterate it while
+        other threads change the store.
         """
-        return dict(self._tokens)
+        return MappingProxyType(self._tokens)
+
+
+class _StagedChanges:
+    """
+    Transitions collected by TokenStore.changes(); checked and written
+    to the WalletDB as they are staged, applied in memory on commit.
+    """
+
+    def __init__(self, store: TokenStore):
+        self._store = store
+        self.spent: List[int] = []
+        self.added: List[Token] = []
+        self._added_serials = set()
+
+    def mark_spent(self, serial: int):
+        entry = self._store._tokens.get(serial)
+        if entry is None:
+            raise KeyError("Token not found in store")
+
+        if entry[1] not in (TokenState.UNSPENT, TokenState.RESERVED) or serial in self.spent:
+            raise ValueError("Only UNSPENT tokens can be marked as SPENT")
+
+        if self._store.db is not None:
+            self._store.db.set_token_state(serial, TokenState.SPENT)
+
+        self.spent.append(serial)
+
+    def add_token(self, token: Token):
+        if token.serial in self._store._tokens or token.serial in self._added_serials:
+            raise ValueError("Token with this serial already exists in store")
+
+        if self._store.db is not None:
+            self._store.db.save_token(token, TokenState.UNSPENT)
+
+        self.added.append(token)
+        self._added_serials.add(token.serial)
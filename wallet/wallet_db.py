@@ -0,0 +1,394 @@
+# wallet/wallet_db.py
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from crypto.curve import ORDER, point_from_bytes
+from crypto.hash import serialize_point_fixed
+from crypto.lazy_point import point_encoding
+from crypto.state.proof_state import ProofState
+from models.token import Token
+from models.token_state import TokenState
+from storage.serial_store import SerialStore
+
+
+SCHEMA_VERSION = 1
+
+# Names of the proof-state rows kept by a wallet
+SPEND_PROOF_STATE = "spend"
+RECEIVE_PROOF_STATE = "receive"
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    serial      BLOB PRIMARY KEY,
+    commitment  BLOB NOT NULL,
+    expiry      INTEGER NOT NULL,
+    signature   BLOB,
+    v           INTEGER NOT NULL,
+    r           BLOB NOT NULL,
+    s           BLOB NOT NULL,
+    state       INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS proof_state (
+    name        TEXT PRIMARY KEY,
+    C_in_total  BLOB NOT NULL,
+    C_out_total BLOB NOT NULL,
+    r_in_total  BLOB NOT NULL,
+    r_out_total BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pending (
+    serial      BLOB PRIMARY KEY,
+    proof       BLOB NOT NULL,
+    timestamp   INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS received_tokens (
+    commitment      BLOB PRIMARY KEY,
+    sender_cert_id  BLOB,
+    tx_digest       BLOB,
+    received_at     INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS device_certificates (
+    digest      BLOB PRIMARY KEY,
+    certificate BLOB NOT NULL,
+    last_used   INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _scalar(x: int) -> bytes:
+    return x.to_bytes(32, "big")
+
+
+def _int(b: bytes) -> int:
+    return int.from_bytes(b, "big")
+
+
+class WalletDB:
+    """
+    Crash-safe persistent wallet storage on SQLite.
+
+    Holds tokens with their lifecycle state, proof states, pending
+    spends, received commitments and (via seen_serials()) seen serials,
+    all in one database so that a spend or an acceptance commits as a
+    single transaction.
+
+    WAL journal with synchronous=NORMAL: a commit is a WAL append, so
+    spends do not wait on an fsync, and a crash never leaves a torn
+    transaction behind.
+
+    The connection is shared between threads. A transaction belongs to
+    the thread that opened it: writes from other threads wait for it
+    to commit or roll back instead of joining it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        self._conn = sqlite3.connect(
+            path,
+            isolation_level=None,       # explicit BEGIN / COMMIT
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        # Held by the thread whose transaction is open, BEGIN to COMMIT
+        self._lock = threading.RLock()
+        self._depth = 0
+
+        with self.transaction():
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+            if version == 0:
+                for stmt in _SCHEMA.split(";"):
+                    if stmt.strip():
+                        self._conn.execute(stmt)
+            elif version != SCHEMA_VERSION:
+                raise ValueError(f"Unsupported wallet schema version {version}")
+
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._conn
+
+    # --------------------------------------------------
+    # Transactions
+    # --------------------------------------------------
+
+    @contextmanager
+    def transaction(self):
+        """
+        Atomic unit of work. Nested uses on the same thread join the
+        outermost transaction; other threads block until it has ended.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    @property
+    def in_transaction(self) -> bool:
+        """
+        Whether the calling thread has a transaction open, i.e. whether
+        a transaction() it enters now would join instead of commit.
+        """
+        if not self._lock.acquire(blocking=False):
+            return False        # open on another thread
+        try:
+            return self._depth > 0
+        finally:
+            self._lock.release()
+
+    def _execute(self, sql: str, params=()):
+        """
+        Write statement: runs inside the caller's transaction, or in
+        one of its own.
+        """
+        with self.transaction():
+            return self._conn.execute(sql, params)
+
+    def _executemany(self, sql: str, rows):
+        with self.transaction():
+            return self._conn.executemany(sql, rows)
+
+    # --------------------------------------------------
+    # Tokens
+    # --------------------------------------------------
+
+    def save_token(self, token: Token, state: TokenState):
+        self._execute(
+            "INSERT OR REPLACE INTO tokens "
+            "(serial, commitment, expiry, signature, v, r, s, state) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                _scalar(token.serial),
+                serialize_point_fixed(token.commitment),
+                token.expiry,
+                token.signature,
+                token.v,
+                _scalar(token.r),
+                _scalar(token.s),
+                state.value,
+            )
+        )
+
+    def set_token_state(self, serial: int, state: TokenState):
+        self._execute(
+            "UPDATE tokens SET state = ? WHERE serial = ?",
+            (state.value, _scalar(serial))
+        )
+
+    def set_token_states(self, serials, state: TokenState):
+        self._executemany(
+            "UPDATE tokens SET state = ? WHERE serial = ?",
+            ((state.value, _scalar(s)) for s in serials)
+        )
+
+    def load_tokens(self) -> Iterator[Tuple[Token, TokenState]]:
+        rows = self._conn.execute(
+            "SELECT serial, commitment, expiry, signature, v, r, s, state "
+            "FROM tokens"
+        )
+
+        for serial, C, expiry, signature, v, r, s, state in rows:
+            token = Token(
+                serial=_int(serial),
+                commitment=point_from_bytes(C),
+                expiry=expiry,
+                signature=signature,
+                v=v,
+                r=_int(r),
+                s=_int(s)
+            )
+            yield token, TokenState(state)
+
+    # --------------------------------------------------
+    # Proof state
+    # --------------------------------------------------
+
+    def save_proof_state(self, name: str, state: ProofState):
+        """
+        Blinding totals are stored reduced mod ORDER, which is all
+        prove_recursive_invariant() depends on.
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO proof_state "
+            "(name, C_in_total, C_out_total, r_in_total, r_out_total) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                name,
+                serialize_point_fixed(state.C_in_total),
+                serialize_point_fixed(state.C_out_total),
+                _scalar(state.r_in_total % ORDER),
+                _scalar(state.r_out_total % ORDER),
+            )
+        )
+
+    def load_proof_state(self, name: str) -> Optional[ProofState]:
+        row = self._conn.execute(
+            "SELECT C_in_total, C_out_total, r_in_total, r_out_total "
+            "FROM proof_state WHERE name = ?",
+            (name,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        C_in, C_out, r_in, r_out = row
+        return ProofState(
+            C_in_total=point_from_bytes(C_in),
+            C_out_total=point_from_bytes(C_out),
+            r_in_total=_int(r_in),
+            r_out_total=_int(r_out)
+        )
+
+    # --------------------------------------------------
+    # Pending spends
+    # --------------------------------------------------
+
+    def add_pending(self, serial_key: bytes, proof: bytes, timestamp: int):
+        try:
+            self._execute(
+                "INSERT INTO pending (serial, proof, timestamp) VALUES (?, ?, ?)",
+                (serial_key, proof, timestamp)
+            )
+        except sqlite3.IntegrityError:
+            raise ValueError("Spend already recorded as pending") from None
+
+    def remove_pending(self, serial_key: bytes):
+        self._execute("DELETE FROM pending WHERE serial = ?", (serial_key,))
+
+    def remove_pending_many(self, serial_keys):
+        self._executemany(
+            "DELETE FROM pending WHERE serial = ?",
+            ((k,) for k in serial_keys)
+        )
+
+    def iter_pending(self) -> Iterator[Tuple[bytes, bytes, int]]:
+        """
+        Stream (serial_key, proof_bytes, timestamp) rows in serial order.
+        """
+        yield from self._conn.execute(
+            "SELECT serial, proof, timestamp FROM pending ORDER BY serial"
+        )
+
+    def count_pending(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    # --------------------------------------------------
+    # Receiver side
+    # --------------------------------------------------
+
+    def add_received(self, token):
+        """
+        token: wallet.received_store.ReceivedToken
+        """
+        self.add_received_many([token])
+
+    def add_received_many(self, tokens):
+        self._executemany(
+            "INSERT OR IGNORE INTO received_tokens "
+            "(commitment, sender_cert_id, tx_digest, received_at) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                (
+                    point_encoding(t, "commitment"),
+                    t.sender_cert_id,
+                    t.tx_digest,
+                    t.received_at,
+                )
+                for t in tokens
+            )
+        )
+
+    def remove_received(self, commitment_key: bytes):
+        self._execute(
+            "DELETE FROM received_tokens WHERE commitment = ?",
+            (commitment_key,)
+        )
+
+    def load_received(self) -> Iterator[Tuple[bytes, bytes, bytes, int]]:
+        """
+        Stream (commitment_key, sender_cert_id, tx_digest, received_at) rows.
+        Commitments stay encoded; ReceivedToken decodes them on use.
+        """
+        yield from self._conn.execute(
+            "SELECT commitment, sender_cert_id, tx_digest, received_at "
+            "FROM received_tokens"
+        )
+
+    # --------------------------------------------------
+    # Certificate cache
+    # --------------------------------------------------
+
+    def save_certificate(self, digest: bytes, certificate: bytes, last_used: int):
+        self._execute(
+            "INSERT OR REPLACE INTO device_certificates "
+            "(digest, certificate, last_used) VALUES (?, ?, ?)",
+            (digest, certificate, last_used)
+        )
+
+    def touch_certificates(self, rows):
+        """
+        rows: (digest, last_used) pairs
+        """
+        self._executemany(
+            "UPDATE device_certificates SET last_used = ? WHERE digest = ?",
+            ((last_used, digest) for digest, last_used in rows)
+        )
+
+    def remove_certificates(self, digests):
+        self._executemany(
+            "DELETE FROM device_certificates WHERE digest = ?",
+            ((d,) for d in digests)
+        )
+
+    def load_certificates(self) -> Iterator[Tuple[bytes, bytes, int]]:
+        """
+        Stream (digest, encoded certificate, last_used) rows,
+        least recently used first.
+        """
+        yield from self._conn.execute(
+            "SELECT digest, certificate, last_used "
+            "FROM device_certificates ORDER BY last_used"
+        )
+
+    def seen_serials(self, batch_size: int = 1) -> SerialStore:
+        """
+        Serial store sharing this database and its transactions.
+        """
+        return SerialStore(
+            connection=self._conn,
+            batch_size=batch_size,
+            table="seen_serials",
+            transaction=self.transaction
+        )
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()